@@ -107,6 +107,8 @@ static char * aq_xpm[] = {
 '''
 
     def Initialize(self):
+        import time
+        start = time.perf_counter()
         import configureGui
         configureGui.RegisterCommands()
         self.appendMenu("Aquarium Configuration", configureGui.AllCommands())
@@ -114,6 +116,7 @@ static char * aq_xpm[] = {
         generateGui.RegisterCommands()
         self.appendMenu("Aquarium Generation", generateGui.AllCommands())
         self.appendMenu("Blue Print Generation", generateGui.AllBluePrintCommands())
+        FreeCAD.Console.PrintLog(f"Aquarium: workbench initialized in {time.perf_counter() - start:.3f}s\n")
 
     def Activated(self):
         return
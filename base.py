@@ -26,17 +26,15 @@ from FreeCAD import Vector, Placement, Rotation
 import Sketcher
 import Part, Arch, ArchCommands, Draft
 import FreeCAD as App
-from utils import make_panel
-from holes import getHole
+from utils import make_panel, set_view
+from holes import getHole, make_drilled_panel
 
 def make_leveling_base(doc):
     grp = doc.addObject('App::DocumentObjectGroup', 'LevelingBase')
     grp.Label = 'LevelingBase'
     b = make_panel(doc, grp, 'BottomBase', 'Computed.LeftCornerX', '-Config.Length/2', 'Computed.UnderGlassBaseLevel', 'Config.Width', 'Config.Length', 'Config.UnderGlassLevelingBaseThickness')
-    base = doc.addObject("Part::Cut", "BaseDrilled")
-    base.Base = b
-    base.Tool = getHole(doc, 'Base')
+    base = make_drilled_panel(doc, 'BaseDrilled', b, getHole(doc, 'Base'))
     grp.removeObject(b)
     grp.addObject(base)
-    base.ViewObject.ShapeColor = (1 / 3, 1 / 3, 0.0)
+    set_view(base, ShapeColor=(1 / 3, 1 / 3, 0.0))
     return grp
@@ -0,0 +1,139 @@
+#****************************************************************************
+# *                                                                          *
+# *   Aquarium                                                               *
+# *   Copyright (c) 2023 LGPL                                                *
+# *                                                                          *
+# *   This program is free software; you can redistribute it and/or modify   *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)     *
+# *   as published by the Free Software Foundation; either version 2 of      *
+# *   the License, or (at your option) any later version.                    *
+# *   for detail see the LICENCE text file.                                  *
+# *                                                                          *
+# *   This program is distributed in the hope that it will be useful,        *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+# *   GNU Library General Public License for more details.                   *
+# *                                                                          *
+# *   You should have received a copy of the GNU Library General Public      *
+# *   License along with this program; if not, write to the Free Software    *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+# *   USA                                                                    *
+# *                                                                          *
+#****************************************************************************
+
+# Generates many aquarium variants at once, each one in its own FreeCADCmd
+# process so a stuck recompute can be killed without losing the others.
+#
+#   python3 batch.py jobs.json -o out -j 4 --timeout 900
+#
+# jobs.json is a list of configurations as read by generate.py, an optional
+# "name" key names the output files (job index otherwise).
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+WORKER = """import os, sys
+sys.path.insert(0, {here!r})
+try:
+    {call}
+except BaseException:
+    import traceback
+    traceback.print_exc()
+    sys.stdout.flush()
+    os._exit(1)
+sys.stdout.flush()
+os._exit(0)
+"""
+
+
+def job_name(index, job):
+    return str(job.get('name', f'job{index:03d}'))
+
+
+def run_job(index, job, output, freecad, timeout, formats):
+    name = job_name(index, job)
+    config = {k: v for k, v in job.items() if k != 'name'}
+    base = os.path.join(output, name)
+    with open(base + '.json', 'w') as f:
+        json.dump(config, f, indent=1)
+    args = [base + '.json']
+    outputs = []
+    if 'fcstd' in formats:
+        args += ['-o', base + '.FCStd']
+        outputs.append(base + '.FCStd')
+    if 'step' in formats:
+        args += ['--step', base + '.step']
+        outputs.append(base + '.step')
+    if 'bom' in formats:
+        args += ['--bom', base + '.bom.json']
+        outputs.append(base + '.bom.json')
+    result = {'name': name, 'outputs': outputs}
+    result.update(run_freecad(f'import generate; generate.main({args!r})', base + '.log', freecad, timeout))
+    return result
+
+
+def run_freecad(call, log, freecad='FreeCADCmd', timeout=None):
+    """Run the python statement call in a FreeCADCmd process writing to log, returns status and time."""
+    start = time.perf_counter()
+    result = dict()
+    try:
+        with open(log, 'w') as f:
+            p = subprocess.run([freecad, '-c', WORKER.format(here=HERE, call=call)], stdout=f, stderr=subprocess.STDOUT, timeout=timeout)
+        result['status'] = 'ok' if p.returncode == 0 else 'failed'
+        result['returncode'] = p.returncode
+    except subprocess.TimeoutExpired:
+        result['status'] = 'timeout'
+    except OSError as e:
+        result['status'] = 'failed'
+        result['error'] = str(e)
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def run_batch(jobs, output, workers=None, timeout=None, freecad='FreeCADCmd', formats=('fcstd', 'step', 'bom')):
+    """Run every job with at most workers FreeCADCmd processes, returns one summary per job in input order."""
+    os.makedirs(output, exist_ok=True)
+    names = [job_name(i, j) for i, j in enumerate(jobs)]
+    if len(set(names)) != len(names):
+        raise ValueError('job names must be unique')
+    if workers is None:
+        workers = os.cpu_count() or 1
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_job, i, j, output, freecad, timeout, formats) for i, j in enumerate(jobs)]
+        results = []
+        for f in futures:
+            r = f.result()
+            print(f"{r['name']}: {r['status']} in {r['seconds']:.1f}s", flush=True)
+            results.append(r)
+    summary = {'seconds': round(time.perf_counter() - start, 3), 'workers': workers, 'jobs': results}
+    with open(os.path.join(output, 'summary.json'), 'w') as f:
+        json.dump(summary, f, indent=1)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='batch', description='Generate many aquarium variants with FreeCADCmd')
+    parser.add_argument('jobs', help='JSON list of configurations')
+    parser.add_argument('-o', '--output', default='batch', help='Output folder')
+    parser.add_argument('-j', '--workers', type=int, help='Concurrent FreeCADCmd processes, number of CPUs by default')
+    parser.add_argument('--timeout', type=float, help='Seconds before a job is killed')
+    parser.add_argument('--freecad', default='FreeCADCmd', help='FreeCADCmd executable')
+    parser.add_argument('--formats', default='fcstd,step,bom', help='Outputs among fcstd, step and bom')
+    args = parser.parse_args(argv)
+    with open(args.jobs) as f:
+        jobs = json.load(f)
+    summary = run_batch(jobs, args.output, args.workers, args.timeout, args.freecad, args.formats.split(','))
+    ok = len([r for r in summary['jobs'] if r['status'] == 'ok'])
+    print(f"{ok}/{len(summary['jobs'])} jobs done in {summary['seconds']:.1f}s")
+    return 0 if ok == len(summary['jobs']) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
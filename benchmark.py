@@ -0,0 +1,397 @@
+#****************************************************************************
+# *                                                                          *
+# *   Aquarium                                                               *
+# *   Copyright (c) 2023 LGPL                                                *
+# *                                                                          *
+# *   This program is free software; you can redistribute it and/or modify   *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)     *
+# *   as published by the Free Software Foundation; either version 2 of      *
+# *   the License, or (at your option) any later version.                    *
+# *   for detail see the LICENCE text file.                                  *
+# *                                                                          *
+# *   This program is distributed in the hope that it will be useful,        *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+# *   GNU Library General Public License for more details.                   *
+# *                                                                          *
+# *   You should have received a copy of the GNU Library General Public      *
+# *   License along with this program; if not, write to the Free Software    *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+# *   USA                                                                    *
+# *                                                                          *
+#****************************************************************************
+
+# Timings of the generators on fresh documents, run headless from this folder:
+#
+#   FreeCADCmd benchmark.py
+#
+# The size grid is saved to benchmark.json, or to $AQUARIUM_BENCHMARK, to
+# compare commits. Each size runs in its own FreeCADCmd process, $AQUARIUM_FREECAD
+# if set, so its peak memory is not hidden by the cases before it.
+import itertools
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from math import pi
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import FreeCAD as App
+from FreeCAD import Vector, Placement, Rotation
+import Part
+import Sketcher
+from batch import run_freecad
+from config import GetConfiguration
+from generate import PIPELINE, step_function
+from utils import set_view
+from weir import create_weir
+
+WIDTHS = (600, 1200, 2400, 3600)
+
+# Parameters driving the number of objects, tried one at a time from the defaults
+GRID = {
+    'Width': (600, 1200, 2400, 3600),
+    'Length': (400, 600, 900),
+    'BeamsStandCount': (2, 5, 10),
+    'BulkHeadNumber': (2, 6, 10),
+    'NozzlesRows': (1, 3, 6),
+    }
+
+
+def create_weir_body(doc):
+    """The PartDesign feature tree the weir was built with before WeirPlate, only kept as the reference of bench_weir."""
+    placemnt = Placement(Vector(0, 0, 0), Rotation (0.7071067811865476, 0, 0, 0.7071067811865475))
+    Weir = doc.addObject('PartDesign::Body', 'Weir')
+    Weir.Group = []
+    Weir.setExpression('.Placement.Base.x', 'Computed.LeftCornerX')
+    Weir.setExpression('.Placement.Base.y', 'Config.Length/2-Config.SidesGlassThickness-Computed.WeirDepth')
+    Weir.setExpression('.Placement.Base.z', '(Computed.GlassLevel+Config.BottomGlassThickness)*1 mm')
+    main_face_profile = doc.addObject('Sketcher::SketchObject', 'main_face_profile')
+    b = main_face_profile.addGeometry(Part.LineSegment(Vector (100.0, 0.0, 0.0), Vector (700.0, 0.0, 0.0)))
+    r = main_face_profile.addGeometry(Part.LineSegment(Vector (700.0, 0.0, 0.0), Vector (700.0, 400.0, 0.0)))
+    t = main_face_profile.addGeometry(Part.LineSegment(Vector (700.0, 400.0, 0.0), Vector (100.0, 400.0, 0.0)))
+    l = main_face_profile.addGeometry(Part.LineSegment(Vector (100.0, 400.0, 0.0), Vector (100.0, 0.0, 0.0)))
+    main_face_profile.addConstraint(Sketcher.Constraint('DistanceX', -2, 1, l, 1, 100.00))
+    main_face_profile.setExpression('Constraints[0]', 'Computed.WeirMargin')
+    main_face_profile.addConstraint(Sketcher.Constraint('DistanceX', -2, 1, r, 2, 700.00))
+    main_face_profile.setExpression('Constraints[1]', 'Computed.WeirWidth+Computed.WeirMargin')
+    main_face_profile.addConstraint(Sketcher.Constraint('DistanceY', -1, 1, r, 2, 400.00))
+    main_face_profile.setExpression('Constraints[2]', 'Computed.RealGlassHeight')
+    main_face_profile.addConstraint(Sketcher.Constraint('Coincident', b, 2, r, 1))
+    main_face_profile.addConstraint(Sketcher.Constraint('Coincident', r, 2, t, 1))
+    main_face_profile.addConstraint(Sketcher.Constraint('Coincident', t, 2, l, 1))
+    main_face_profile.addConstraint(Sketcher.Constraint('Coincident', l, 2, b, 1))
+    main_face_profile.addConstraint(Sketcher.Constraint('Horizontal', b))
+    main_face_profile.addConstraint(Sketcher.Constraint('Horizontal', t))
+    main_face_profile.addConstraint(Sketcher.Constraint('Vertical', l))
+    main_face_profile.addConstraint(Sketcher.Constraint('Vertical', r))
+    main_face_profile.addConstraint(Sketcher.Constraint('PointOnObject', b, 1, -1))
+    main_face_profile.MapMode = 'FlatFace'
+    main_face_profile.Placement = placemnt
+    main_face_profile.Visibility = False
+    set_view(main_face_profile, Visibility=False)
+    Weir.addObject(main_face_profile)
+    main_face = doc.addObject('PartDesign::Pad', 'main_face')
+    main_face.Direction = Vector(0.00, -1.00, -0.00)
+    main_face.setExpression('Length', 'Config.WeirWallThickness')
+    main_face.Length = 4.0
+    main_face.Placement = placemnt
+    main_face.Profile = (main_face_profile, [])
+    main_face.ReferenceAxis = (main_face_profile, ['N_Axis'])
+    main_face.Visibility = False
+    Weir.addObject(main_face)
+    set_view(main_face, ShapeColor=(0.20, 0.20, 0.20, 0.00), Visibility=False)
+    slot_profile = doc.addObject('Sketcher::SketchObject', 'slot_profile')
+    geo0 = slot_profile.addGeometry(Part.ArcOfCircle(Part.Circle(Vector(12.50, 445.00, 0.00), Vector (0.0, 0.0, 1.0), 1.50), 0, pi))
+    geo1 = slot_profile.addGeometry(Part.ArcOfCircle(Part.Circle(Vector(12.50, 400.00, 0.00), Vector (0.0, 0.0, 1.0), 1.50), pi, 2 * pi))
+    geo2 = slot_profile.addGeometry(Part.LineSegment(Vector (11.0, 445.0, 0.0), Vector (11.0, 400.0, 0.0)))
+    geo3 = slot_profile.addGeometry(Part.LineSegment(Vector (14.0, 400.0, 0.0), Vector (14.0, 445.0, 0.0)))
+    slot_profile.addConstraint(Sketcher.Constraint('Tangent', geo0, 2, geo2, 1))
+    slot_profile.addConstraint(Sketcher.Constraint('Tangent', geo2, 2, geo1, 1))
+    slot_profile.addConstraint(Sketcher.Constraint('Tangent', geo1, 2, geo3, 1))
+    slot_profile.addConstraint(Sketcher.Constraint('Tangent', geo3, 2, geo0, 1))
+    slot_profile.addConstraint(Sketcher.Constraint('Equal', geo0, geo1))
+    slot_profile.addConstraint(Sketcher.Constraint('Vertical', geo2))
+    slot_profile.addConstraint(Sketcher.Constraint('Diameter', geo0, 3.0))
+    slot_profile.addConstraint(Sketcher.Constraint('DistanceY', geo1, 3, 400.00))
+    slot_profile.addConstraint(Sketcher.Constraint('DistanceY', geo0, 3, 445.00))
+    slot_profile.addConstraint(Sketcher.Constraint('DistanceX', geo0, 3, 12.50))
+    slot_profile.setExpression('Constraints[6]', 'Config.WeirSlotWidth')
+    slot_profile.setExpression('Constraints[7]', 'Config.WaterHeightWeir')
+    slot_profile.setExpression('Constraints[8]', 'Computed.RealGlassHeight-Config.SidesGlassThickness-Config.WeirSlotWidth*0.5')
+    slot_profile.setExpression('Constraints[9]', '2*Config.SidesGlassThickness+Config.BraceWidth+Config.WeirSlotWidth*0.5')
+    slot_profile.MapMode = 'FlatFace'
+    slot_profile.Placement = placemnt
+    slot_profile.Visibility = False
+    set_view(slot_profile, Visibility=False)
+    Weir.addObject(slot_profile)
+    one_slot = doc.addObject('PartDesign::Pocket', 'one_slot')
+    one_slot.BaseFeature = main_face
+    one_slot.Direction = Vector(-0.00, 1.00, 0.00)
+    one_slot.Midplane = True
+    one_slot.Placement = placemnt
+    one_slot.Profile = (slot_profile, [])
+    one_slot.ReferenceAxis = (slot_profile, ['N_Axis'])
+    one_slot.Type = 'ThroughAll'
+    one_slot.Visibility = False
+    set_view(one_slot, ShapeColor=(0.20, 0.20, 0.20, 0.00), Visibility=False)
+    Weir.addObject(one_slot)
+    all_slots = doc.addObject('PartDesign::LinearPattern', 'all_slots')
+    all_slots.BaseFeature = one_slot
+    all_slots.Direction = (slot_profile, ['H_Axis'])
+    all_len = 'Computed.WeirInsideWidth-Config.WeirSlotWidth'
+    all_slots.setExpression('Length', all_len)
+    all_slots.setExpression('Occurrences', '(' + all_len + ')/(2*Config.WeirSlotWidth)')
+    all_slots.Length = 781.0
+    all_slots.Occurrences = 130
+    all_slots.Originals = [one_slot]
+    all_slots.Placement = placemnt
+    all_slots.Visibility = False
+    set_view(all_slots, ShapeColor=(0.20, 0.20, 0.20, 0.00), Visibility=False)
+    Weir.addObject(all_slots)
+    hole_reinforcement = doc.addObject('Sketcher::SketchObject', 'hole_reinforcement')
+    geo0 = hole_reinforcement.addGeometry(Part.Circle(Vector(112.00, 428.50, 0.00), Vector (0.0, 0.0, 1.0), 19.00))
+    geo1 = hole_reinforcement.addGeometry(Part.Circle(Vector(112.00, 428.50, 0.00), Vector (0.0, 0.0, 1.0), 14.00))
+    hole_reinforcement.addConstraint(Sketcher.Constraint('Diameter', geo0, 38.0))
+    hole_reinforcement.addConstraint(Sketcher.Constraint('DistanceY', -1, 1, geo0, 3, 428.50))
+    hole_reinforcement.addConstraint(Sketcher.Constraint('DistanceX', geo0, 3, 112.00))
+    hole_reinforcement.addConstraint(Sketcher.Constraint('Coincident', geo1, 3, geo0, 3))
+    hole_reinforcement.addConstraint(Sketcher.Constraint('Diameter', geo1, 28.0))
+    hole_reinforcement.setExpression('Constraints[0]', 'Config.BulkHeadDiameter+5')
+    center_bh = 'Computed.RealGlassHeight-Config.BulkHeadDiameter/2-Config.SidesGlassThickness-Config.WeirSlotWidth*1.5'
+    hole_reinforcement.setExpression('Constraints[1]', center_bh)
+    hole_reinforcement.setExpression('Constraints[2]', 'Computed.BulkHeadSpace/2+Config.BraceWidth+2*Config.SidesGlassThickness')
+    hole_reinforcement.setExpression('Constraints[4]', 'Config.BulkHeadDiameter-5')
+    hole_reinforcement.MapMode = 'FlatFace'
+    hole_reinforcement.Placement = placemnt
+    hole_reinforcement.Visibility = False
+    set_view(hole_reinforcement, Visibility=False)
+    Weir.addObject(hole_reinforcement)
+    Bulk_Head_Reinforced = doc.addObject('PartDesign::Pad', 'Bulk_Head_Reinforced')
+    Bulk_Head_Reinforced.BaseFeature = all_slots
+    Bulk_Head_Reinforced.Direction = Vector(0.00, -1.00, -0.00)
+    Bulk_Head_Reinforced.setExpression('Length', 'Config.WeirWallThickness')
+    Bulk_Head_Reinforced.Length = 4.0
+    Bulk_Head_Reinforced.Placement = placemnt
+    Bulk_Head_Reinforced.Profile = (hole_reinforcement, [])
+    Bulk_Head_Reinforced.ReferenceAxis = (hole_reinforcement, ['N_Axis'])
+    Bulk_Head_Reinforced.Visibility = False
+    set_view(Bulk_Head_Reinforced, ShapeColor=(0.20, 0.20, 0.20, 0.00), Visibility=False)
+    Weir.addObject(Bulk_Head_Reinforced)
+    all_holes_reinforced = doc.addObject('PartDesign::LinearPattern', 'all_holes_reinforced')
+    all_holes_reinforced.BaseFeature = Bulk_Head_Reinforced
+    all_holes_reinforced.Direction = (hole_reinforcement, ['H_Axis'])
+    all_holes_reinforced.setExpression('Length', '(Config.BulkHeadNumber-1)*Computed.BulkHeadSpace')
+    all_holes_reinforced.setExpression('Occurrences', 'Config.BulkHeadNumber')
+    all_holes_reinforced.Length = 428.57142857142856
+    all_holes_reinforced.Occurrences = 6
+    all_holes_reinforced.Originals = [Bulk_Head_Reinforced]
+    all_holes_reinforced.Placement = placemnt
+    all_holes_reinforced.Visibility = False
+    set_view(all_holes_reinforced, ShapeColor=(0.20, 0.20, 0.20, 0.00), Visibility=False)
+    Weir.addObject(all_holes_reinforced)
+    bulk_head_hole = doc.addObject('Sketcher::SketchObject', 'bulk_head_hole')
+    geo0 = bulk_head_hole.addGeometry(Part.ArcOfCircle(Part.Circle(Vector(112.00, 428.50, 0.00), Vector (0.0, 0.0, 1.0), 16.50), 4.742696650350782, 7.823673964008179))
+    geo1 = bulk_head_hole.addGeometry(Part.ArcOfCircle(Part.Circle(Vector(112.00, 428.50, 0.00), Vector (0.0, 0.0, 1.0), 15.50), 4.744651624150203, 7.821718990208744))
+    geo2 = bulk_head_hole.addGeometry(Part.LineSegment(Vector (112.5, 412.0075774975293, 0.0), Vector (112.5, 413.00757749752927, 0.0)))
+    geo3 = bulk_head_hole.addGeometry(Part.LineSegment(Vector (111.5, 444.99242250247073, 0.0), Vector (111.5, 443.99242250247073, 0.0)))
+    geo4 = bulk_head_hole.addGeometry(Part.Point(Vector(112.00, 428.50, 0.00)))
+    bulk_head_hole.toggleConstruction(geo4)
+    geo5 = bulk_head_hole.addGeometry(Part.LineSegment(Vector (112.5, 443.99242250247056, 0.0), Vector (112.5, 444.99242250247056, 0.0)))
+    geo6 = bulk_head_hole.addGeometry(Part.LineSegment(Vector (111.49999999999845, 413.0075774975294, 0.0), Vector (111.49999999999845, 412.0075774975294, 0.0)))
+    geo7 = bulk_head_hole.addGeometry(Part.ArcOfCircle(Part.Circle(Vector(112.00, 428.50, 0.00), Vector (0.0, 0.0, 1.0), 16.50), 1.601103996761398, 4.682081310418408))
+    geo8 = bulk_head_hole.addGeometry(Part.ArcOfCircle(Part.Circle(Vector(112.00, 428.50, 0.00), Vector (0.0, 0.0, 1.0), 15.50), 1.6030589705603855, 4.680126336618976))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('Diameter', geo0, 33.0))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('Vertical', geo2))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('Vertical', geo3))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('Symmetric', geo3, 1, geo2, 1, geo4, 1))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('DistanceX', geo3, 1, geo5, 2, 1.00))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('PointOnObject', geo7, 2, geo3))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('Coincident', geo2, 2, geo1, 1))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('Coincident', geo6, 1, geo8, 2))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('Equal', geo0, geo7))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('Coincident', geo0, 3, geo7, 3))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('PointOnObject', geo7, 1, geo3))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('Equal', geo1, geo8))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('Coincident', geo1, 2, geo5, 1))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('Coincident', geo8, 1, geo3, 2))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('Coincident', geo1, 3, geo8, 3))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('Vertical', geo5))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('Vertical', geo6))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('Coincident', geo7, 2, geo6, 2))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('DistanceX', geo6, 1, geo1, 1, 1.00))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('Coincident', geo0, 1, geo2, 1))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('DistanceX', geo0, 3, 112.00))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('Coincident', geo5, 2, geo0, 2))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('DistanceY', geo5, 1, geo5, 2, 1.00))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('Coincident', geo4, 1, geo1, 3))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('Coincident', geo1, 3, geo0, 3))
+    bulk_head_hole.addConstraint(Sketcher.Constraint('DistanceY', -1, 1, geo4, 1, 428.50))
+    bulk_head_hole.setExpression('Constraints[0]', 'Config.BulkHeadDiameter')
+    bulk_head_hole.setExpression('Constraints[20]', 'Computed.BulkHeadSpace/2+Config.BraceWidth+2*Config.SidesGlassThickness')
+    bulk_head_hole.setExpression('Constraints[25]', center_bh)
+    bulk_head_hole.MapMode = 'FlatFace'
+    bulk_head_hole.Placement = placemnt
+    bulk_head_hole.Visibility = False
+    set_view(bulk_head_hole, Visibility=False)
+    Weir.addObject(bulk_head_hole)
+    detachable_hole = doc.addObject('PartDesign::Pocket', 'detachable_hole')
+    detachable_hole.BaseFeature = all_holes_reinforced
+    detachable_hole.Direction = Vector(-0.00, 1.00, 0.00)
+    detachable_hole.Midplane = True
+    detachable_hole.Placement = placemnt
+    detachable_hole.Profile = (bulk_head_hole, [])
+    detachable_hole.ReferenceAxis = (bulk_head_hole, ['N_Axis'])
+    detachable_hole.Type = 'ThroughAll'
+    detachable_hole.Visibility = False
+    set_view(detachable_hole, ShapeColor=(0.20, 0.20, 0.20, 0.00), Visibility=False)
+    Weir.addObject(detachable_hole)
+    bulk_heads_detachable = doc.addObject('PartDesign::LinearPattern', 'bulk_heads_detachable')
+    bulk_heads_detachable.BaseFeature = detachable_hole
+    bulk_heads_detachable.Direction = (bulk_head_hole, ['H_Axis'])
+    bulk_heads_detachable.setExpression('Length', '(Config.BulkHeadNumber-1)*Computed.BulkHeadSpace')
+    bulk_heads_detachable.setExpression('Occurrences', 'Config.BulkHeadNumber')
+    bulk_heads_detachable.Length = 428
+    bulk_heads_detachable.Occurrences = 6
+    bulk_heads_detachable.Originals = [detachable_hole]
+    bulk_heads_detachable.Placement = placemnt
+    bulk_heads_detachable.Refine = True
+    set_view(bulk_heads_detachable, ShapeColor=(0.20, 0.20, 0.20, 0.00))
+    Weir.addObject(bulk_heads_detachable)
+    return Weir
+
+
+def new_document(name, config):
+    doc = App.newDocument(name)
+    conf = GetConfiguration(doc)
+    for type, values in config.items():
+        conf.configRepository[type].update(values)
+    doc.recompute()
+    return doc
+
+
+def timed(doc, build):
+    start = time.perf_counter()
+    obj = build(doc)
+    doc.recompute()
+    return obj, time.perf_counter() - start
+
+
+def bench_weir(widths=WIDTHS):
+    """Weir recompute time and volume, PartDesign feature tree against WeirPlate."""
+    results = []
+    for width in widths:
+        row = {'Width': width}
+        for label, build in (('Body', create_weir_body), ('Plate', create_weir)):
+            doc = new_document(f'Bench{label}{width}', {'Config': {'Width': width}})
+            obj, elapsed = timed(doc, build)
+            row[label] = elapsed
+            row[f'{label}Volume'] = obj.Shape.Volume
+            if label == 'Plate':
+                row['Slots'] = obj.SlotCount
+            App.closeDocument(doc.Name)
+        results.append(row)
+    print(f"{'Width':>6} {'Slots':>6} {'Body s':>9} {'Plate s':>9} {'Speedup':>8} {'Volume diff':>12}")
+    for r in results:
+        diff = abs(r['BodyVolume'] - r['PlateVolume']) / r['BodyVolume']
+        print(f"{r['Width']:>6} {r['Slots']:>6} {r['Body']:>9.3f} {r['Plate']:>9.3f} {r['Body'] / r['Plate']:>8.1f} {diff:>12.2e}")
+    return results
+
+
+def size_grid(grid=GRID, product=False):
+    """Config overrides to benchmark, every combination with product, else one parameter at a time."""
+    if product:
+        names = list(grid)
+        return [dict(zip(names, values)) for values in itertools.product(*[grid[n] for n in names])]
+    return [{name: value} for name, values in grid.items() for value in values]
+
+
+def face_count(obj):
+    shape = Part.getShape(obj)
+    return 0 if shape.isNull() else len(shape.Faces)
+
+
+def peak_rss():
+    # kB on Linux, the peak of the whole process
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def bench_case(name, config, steps=PIPELINE):
+    doc = new_document(name, {'Config': config})
+    case = {'config': config, 'steps': dict()}
+    start = time.perf_counter()
+    for step in steps:
+        objects = len(doc.Objects)
+        obj, elapsed = timed(doc, step_function(step))
+        case['steps'][step[0]] = {
+            'seconds': elapsed,
+            'objects': len(doc.Objects) - objects,
+            'faces': face_count(obj),
+            }
+    case['generate'] = time.perf_counter() - start
+    for o in doc.Objects:
+        o.touch()
+    start = time.perf_counter()
+    doc.recompute()
+    case['recompute'] = time.perf_counter() - start
+    case['objects'] = len(doc.Objects)
+    case['faces'] = sum([s['faces'] for s in case['steps'].values()])
+    case['peak_rss'] = peak_rss()
+    App.closeDocument(doc.Name)
+    return case
+
+
+def run_case(name, config, output):
+    """bench_case written to output as JSON, the entry point of the per case processes."""
+    with open(output, 'w') as f:
+        json.dump(bench_case(name, config), f)
+
+
+def revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ''
+
+
+def bench_sizes(grid=GRID, product=False, output='benchmark.json', freecad=os.environ.get('AQUARIUM_FREECAD', 'FreeCADCmd')):
+    """Generation and full recompute of every generator over the size grid, saved as JSON."""
+    cases = []
+    temp = tempfile.mkdtemp(prefix='aquarium-bench-')
+    try:
+        for i, config in enumerate(size_grid(grid, product)):
+            name = f'BenchSize{i}'
+            path = os.path.join(temp, f'{name}.json')
+            log = os.path.join(temp, f'{name}.log')
+            status = run_freecad(f'import benchmark; benchmark.run_case({name!r}, {config!r}, {path!r})', log, freecad)
+            if status['status'] != 'ok':
+                with open(log) as f:
+                    print(f.read())
+                print(f"{json.dumps(config):<28} {status['status']}")
+                cases.append({'config': config, 'status': status['status']})
+                continue
+            with open(path) as f:
+                case = json.load(f)
+            cases.append(case)
+            print(f"{json.dumps(config):<28} {case['generate']:>8.2f}s {case['recompute']:>8.2f}s {case['objects']:>6} objects {case['faces']:>8} faces {case['peak_rss'] // 1024:>6} MB")
+    finally:
+        shutil.rmtree(temp, ignore_errors=True)
+    result = {
+        'revision': revision(),
+        'freecad': '.'.join(App.Version()[:3]),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'cases': cases,
+        }
+    if output:
+        with open(output, 'w') as f:
+            json.dump(result, f, indent=1)
+    return result
+
+
+if __name__ == '__main__':
+    bench_weir()
+    bench_sizes(output=os.environ.get('AQUARIUM_BENCHMARK', 'benchmark.json'))
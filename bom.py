@@ -0,0 +1,305 @@
+#****************************************************************************
+# *                                                                          *
+# *   Aquarium                                                               *
+# *   Copyright (c) 2023 LGPL                                                *
+# *                                                                          *
+# *   This program is free software; you can redistribute it and/or modify   *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)     *
+# *   as published by the Free Software Foundation; either version 2 of      *
+# *   the License, or (at your option) any later version.                    *
+# *   for detail see the LICENCE text file.                                  *
+# *                                                                          *
+# *   This program is distributed in the hope that it will be useful,        *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+# *   GNU Library General Public License for more details.                   *
+# *                                                                          *
+# *   You should have received a copy of the GNU Library General Public      *
+# *   License along with this program; if not, write to the Free Software    *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+# *   USA                                                                    *
+# *                                                                          *
+#****************************************************************************
+
+# Bill of materials straight from the configuration: every beam, panel, glass,
+# fastener, flange, pipe and hole with its quantity and size, evaluated with the
+# same formulas as the model but without building any geometry.
+#
+#   python3 bom.py tank.json --format csv -o tank.csv
+#
+# cross_check() compares the result with a generated document.
+import argparse
+import csv
+import json
+import sys
+from collections import namedtuple
+from config import DefaultsComputed, DefaultValues, InvalidConfigException, document_layout, flange_layout, load_config
+from computed import ComputedEvaluator
+from panels import panel_table
+from clearance import flange_positions, nozzle_positions
+
+# source is (document object, solid index) to compare with, None when not checked
+Item = namedtuple('Item', ['group', 'name', 'material', 'quantity', 'length', 'width', 'height', 'diameter', 'x', 'y', 'source'])
+
+FIELDS = Item._fields[:-1]
+TOLERANCE = 1e-3
+# Fasteners made by utils.make_supports: 8 positions, top and bottom
+SUPPORTS = 16
+_evaluators = dict()
+
+
+def computed_values(values, flanges):
+    # FlangeCount is written in the sheet by the flange generator, fixed here
+    evaluator = _evaluators.get(flanges)
+    if evaluator is None:
+        definitions = [(n, str(flanges) if n == 'FlangeCount' else v, d) for n, v, d in DefaultsComputed()]
+        evaluator = ComputedEvaluator(definitions)
+        _evaluators[flanges] = evaluator
+    return evaluator(values)
+
+
+def item(group, name, material, quantity, length=None, width=None, height=None, diameter=None, x=None, y=None, source=None):
+    return Item(group, name, material, quantity, length, width, height, diameter, x, y, source)
+
+
+def count(value):
+    return int(round(value))
+
+
+def table_items(group, table, material, values):
+    for index, (name, position, size) in enumerate(panel_table(table)(values)):
+        yield item(group, name, material, 1, *size, source=(table, index))
+
+
+def stand_structure(cfg, cmp, cut45=True):
+    rhs = f"RHS {cfg['MetalProfileWidth']:g}x{cfg['MetalProfileHeight']:g}x{cfg['MetalProfileWallThickness']:g}"
+    section = (cfg['MetalProfileWidth'], cfg['MetalProfileHeight'])
+    if cut45:
+        yield item('StandStructure', 'TopBeamWidth45', rhs, 2, cmp['BeamsSizeWidth45'], *section)
+        yield item('StandStructure', 'TopBeamLength45', rhs, 2, cmp['BeamsSizeLength'], *section)
+    else:
+        yield item('StandStructure', 'TopBeamWidth', rhs, 2, cmp['BeamsSizeWidth'], *section)
+        yield item('StandStructure', 'TopBeamLength', rhs, 2, cmp['BeamsSizeLength'], *section)
+    yield item('StandStructure', 'Column', rhs, 4, cmp['ColumnsSizeHeight'], *section)
+    yield item('StandStructure', 'SumpBeamWidth', rhs, 2, cmp['BeamsSumpSizeWidth'], *section)
+    yield item('StandStructure', 'SumpBeamLength', rhs, 2, cmp['BeamsSumpSizeLength'], *section)
+    beams = count(cfg['BeamsStandCount'])
+    if beams > 0:
+        yield item('StandStructure', 'BaseReinforcement', rhs, beams, cmp['BeamsSizeMiddle'], *section)
+        yield item('StandStructure', 'SumpReinforcement', rhs, beams, cmp['BeamsSizeMiddle'], *section)
+    yield from fasteners('StandStructure', 'PanelMount', cfg, cmp, cfg['PanelMountThickness'])
+
+
+def fasteners(group, name, cfg, cmp, thickness):
+    holes = count(cfg['PanelMountHoleCountVertical']) * count(cfg['PanelMountHoleCountHorizontal'])
+    yield item(group, name, f"Plate {thickness:g}", SUPPORTS, cmp['PanelFastenerSizeHorizontal'], cmp['PanelFastenerSizeVertical'], thickness)
+    yield item(group, f'{name}Hole', '', SUPPORTS * holes, diameter=cfg['PanelMountHoleDiameter'])
+
+
+def stand_panels(cfg, cmp, values):
+    yield from table_items('StandPanels', 'StandCovers', f"Panel {cfg['PanelThickness']:g}", values)
+    yield from fasteners('StandPanels', 'ScrewBlock', cfg, cmp, cfg['PanelBlockThickness'])
+
+
+def drilled(full, cmp, layout):
+    # (name, type, x, y) of every hole through the bottom glass and the leveling base
+    return flange_positions(full['Config'], cmp, layout) + nozzle_positions(cmp)
+
+
+def leveling_base(full, cmp, layout):
+    cfg = full['Config']
+    yield item('LevelingBase', 'BaseDrilled', f"Base {cfg['UnderGlassLevelingBaseThickness']:g}", 1, cfg['Width'], cfg['Length'], cfg['UnderGlassLevelingBaseThickness'], source=('BaseDrilled', None))
+    for name, type, x, y in drilled(full, cmp, layout):
+        yield item('LevelingBase', f'{name}Hole', '', 1, diameter=full[f'ConfigPipes{type}']['FlangeFreeDiameterBottom'], x=x, y=y, source=('HolesBase', None))
+
+
+def glasses(full, cmp, layout, values, cut45=False):
+    cfg = full['Config']
+    sides = f"Glass {cfg['SidesGlassThickness']:g}"
+    yield item('Glasses', 'BottomGlassDrilled', f"Glass {cfg['BottomGlassThickness']:g}", 1, cfg['Width'], cfg['Length'], cfg['BottomGlassThickness'], source=('BottomGlassDrilled', None))
+    for name, type, x, y in drilled(full, cmp, layout):
+        yield item('Glasses', f'{name}Hole', '', 1, diameter=full[f'ConfigPipes{type}']['FlangeDiameter'], x=x, y=y, source=('HolesGlass', None))
+    if cut45:
+        for name, length in (('LeftGlass', 'Length'), ('RightGlass', 'Length'), ('BackGlass', 'Width'), ('FrontGlass', 'Width')):
+            yield item('Glasses', name, sides + ' mitered', 1, cfg[length], cfg['SidesGlassThickness'], cmp['RealGlassHeight'], source=(name, None))
+    else:
+        yield from table_items('Glasses', 'SidesGlass', sides, values)
+    for table in ('GlassBracesBottom', 'GlassBracesTop', 'GlassBracesWeirFrame'):
+        yield from table_items('Glasses', table, sides, values)
+
+
+def weir(cfg, cmp):
+    yield item('Weir', 'Weir', f"Plate {cfg['WeirWallThickness']:g}", 1, cmp['WeirWidth'], cfg['WeirWallThickness'], cmp['RealGlassHeight'], source=('Weir', None))
+    slot = cmp['WeirInsideWidth'] - cfg['WeirSlotWidth']
+    # Rounded ends, centered from Config.WaterHeightWeir to under the top brace
+    slot_length = cmp['RealGlassHeight'] - cfg['SidesGlassThickness'] + cfg['WeirSlotWidth'] * 0.5 - cfg['WaterHeightWeir']
+    yield item('Weir', 'WeirSlot', '', count(slot / (2 * cfg['WeirSlotWidth'])), slot_length, cfg['WeirSlotWidth'])
+    yield item('Weir', 'BulkHead', '', count(cfg['BulkHeadNumber']), diameter=cfg['BulkHeadDiameter'])
+
+
+def flanges(full, cmp, layout):
+    for name, type, x, y in flange_positions(full['Config'], cmp, layout):
+        yield item('Flanges', name, f'Flange {type}', 1, diameter=full[f'ConfigPipes{type}']['FlangeDiameter'], x=x, y=y)
+
+
+def pipes(full, cmp, layout, levels):
+    for index, ((name, type, x, y), level) in enumerate(zip(flange_positions(full['Config'], cmp, layout), levels)):
+        p = full[f'ConfigPipes{type}']
+        base = p['FlangeFreeHeightTop'] - p['FlangePipeLengthInside']
+        length = full['Config'][level] + cmp['WaterLevelDeepest'] - (base + cmp['FlangesZ'])
+        yield item('Pipes', f'PipesWeir{type}_{index}', f"Pipe {p['PipeDiameter']:g}", 1, length, diameter=p['PipeDiameter'], x=x, y=y)
+
+
+def closed_loop(full, cmp):
+    p = full['ConfigPipesNozzleClosedLoop']
+    yield item('ClosedLoop', 'Nozzle', 'Flange NozzleClosedLoop', len(nozzle_positions(cmp)), diameter=p['FlangeDiameter'])
+
+
+def canopy(cfg, cmp):
+    rec = f"REC {cfg['CanopyProfileWidth']:g}x{cfg['CanopyProfileHeight']:g}"
+    section = (cfg['CanopyProfileWidth'], cfg['CanopyProfileHeight'])
+    yield item('CanopyStructure', 'CanopyBeamLeft2Right', rec, 2, cmp['BeamCanopyLeft2RightLength'], *section)
+    yield item('CanopyStructure', 'CanopyBeamFront2Back', rec, count(cmp['CanopyBeamsX']), cmp['BeamCanopyFront2BackLength'], *section)
+    yield item('CanopyStructure', 'CanopyColumn', rec, 4, cmp['CanopyColumnHeight'], *section)
+
+
+def items(values=None, layout=None, steps=None, cut45=True, glass_cut45=False):
+    """Generate the Items of the steps (generate.PIPELINE names, every one by default) for {sheet: {alias: value}}.
+
+    layout is the list of (type, level) of the weir flanges, config.flange_layout() by default."""
+    full = DefaultValues()
+    for sheet, v in (values or dict()).items():
+        if sheet not in full:
+            raise InvalidConfigException(f'Unknown sheet {sheet}')
+        for name in v:
+            if name not in full[sheet]:
+                raise InvalidConfigException(f'Unknown parameter {sheet}.{name}')
+        full[sheet].update(v)
+    if layout is None:
+        layout = flange_layout()
+    types = [t for t, _ in layout]
+    cmp = computed_values(full, len(layout))
+    cfg = full['Config']
+    sheets = {'Config': cfg, 'Computed': cmp}
+    generators = [
+        ('StandStructure', lambda: stand_structure(cfg, cmp, cut45)),
+        ('StandPanels', lambda: stand_panels(cfg, cmp, sheets)),
+        ('LevelingBase', lambda: leveling_base(full, cmp, types)),
+        ('Glasses', lambda: glasses(full, cmp, types, sheets, glass_cut45)),
+        ('Weir', lambda: weir(cfg, cmp)),
+        ('Flanges', lambda: flanges(full, cmp, types)),
+        ('Pipes', lambda: pipes(full, cmp, types, [l for _, l in layout])),
+        ('ClosedLoop', lambda: closed_loop(full, cmp)),
+        ('CanopyStructure', lambda: canopy(cfg, cmp)),
+        ('CanopyPanels', lambda: table_items('CanopyPanels', 'CanopyPanels', f"Panel {cfg['PanelThickness']:g}", sheets)),
+        ]
+    for name, generator in generators:
+        if steps is None or name in steps:
+            for i in generator():
+                if i.quantity > 0:
+                    yield i
+
+
+def _row(i):
+    return [round(v, 3) if isinstance(v, float) else v for v in i[:-1]]
+
+
+def write_csv(rows, file):
+    writer = csv.writer(file)
+    writer.writerow(FIELDS)
+    for i in rows:
+        writer.writerow(_row(i))
+
+
+def write_json(rows, file):
+    # One object per line inside the array, written as the items come
+    file.write('[')
+    separator = '\n'
+    for i in rows:
+        file.write(separator + json.dumps(dict(zip(FIELDS, _row(i)))))
+        separator = ',\n'
+    file.write('\n]\n')
+
+
+def _size(shape):
+    box = shape.BoundBox
+    return sorted([box.XLength, box.YLength, box.ZLength])
+
+
+def cross_check(doc, rows):
+    """Differences between the items and the document: panel sizes and hole positions. Empty when they agree."""
+    from holes import circles
+    problems = []
+    holes = dict()
+    for i in rows:
+        if i.source is None:
+            continue
+        name, index = i.source
+        obj = doc.getObject(name)
+        if obj is None:
+            problems.append(f'{i.name}: {name} not in the document')
+            continue
+        if i.diameter is not None:
+            holes.setdefault(name, []).append((i.x, i.y, i.diameter / 2))
+            continue
+        shape = obj.Shape if index is None else obj.Shape.Solids[index]
+        expected = sorted([i.length, i.width, i.height])
+        if any(abs(a - b) > TOLERANCE for a, b in zip(_size(shape), expected)):
+            problems.append(f'{i.name}: {", ".join([f"{v:g}" for v in expected])} expected, {name} measures {", ".join([f"{v:g}" for v in _size(shape)])}')
+    for name, expected in holes.items():
+        found = circles(doc.getObject(name))
+        for x, y, r in expected:
+            match = [c for c in found if abs(c[0] - x) < TOLERANCE and abs(c[1] - y) < TOLERANCE and abs(c[2] - r) < TOLERANCE]
+            if match:
+                found.remove(match[0])
+            else:
+                problems.append(f'{name}: no hole of diameter {2 * r:g} at ({x:g}, {y:g})')
+        for x, y, r in found:
+            problems.append(f'{name}: unexpected hole of diameter {2 * r:g} at ({x:g}, {y:g})')
+    return problems
+
+
+def document_options(doc):
+    """items() arguments matching how doc was built: flange layout, mitered beams and glass."""
+    return {
+        'layout': document_layout(doc) or flange_layout(),
+        'cut45': any(o.Name.startswith('beam45cut') for o in doc.Objects),
+        'glass_cut45': doc.getObject('LeftGlass') is not None,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='bom', description='Bill of materials from an aquarium configuration')
+    parser.add_argument('config', nargs='?', help='JSON or TOML configuration')
+    parser.add_argument('--format', choices=('csv', 'json'), default='csv')
+    parser.add_argument('-o', '--output', help='Output file, standard output by default')
+    parser.add_argument('--only', help='Comma separated groups, as generate.py --only')
+    parser.add_argument('-d', '--document', help='FCStd document to check the items against, needs FreeCAD')
+    args = parser.parse_args(argv)
+    values = load_config(args.config) if args.config else dict()
+    doc = None
+    options = dict()
+    if args.document:
+        import FreeCAD as App
+        from config import GetConfiguration
+        doc = App.openDocument(args.document)
+        for type, repository in GetConfiguration(doc).configRepository.items():
+            values.setdefault(type, dict()).update({k: getattr(repository[k], 'Value', repository[k]) for k in repository})
+        options = document_options(doc)
+    steps = set(args.only.split(',')) if args.only else None
+    file = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        (write_csv if args.format == 'csv' else write_json)(items(values, steps=steps, **options), file)
+    finally:
+        if args.output:
+            file.close()
+    if doc is not None:
+        problems = cross_check(doc, items(values, steps=steps, **options))
+        for p in problems:
+            print(p, file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -26,73 +26,45 @@ from FreeCAD import Vector, Placement, Rotation
 import Sketcher
 import Part, Arch, ArchCommands, Draft
 import FreeCAD as App
+from utils import make_instance, set_position
 
-def make_canopy(doc):
+def make_canopy(doc, links = True):
     grp = doc.addObject('App::DocumentObjectGroup','CanopyStructure')
     w = grp.evalExpression('Config.CanopyProfileWidth')
     h = grp.evalExpression('Config.CanopyProfileHeight')
     profile = Arch.makeProfile([0, 'REC', 'CanopyProfile', 'R', w, h])
     profile.setExpression('Width', 'Config.CanopyProfileWidth')
     profile.setExpression('Height', 'Config.CanopyProfileHeight')
+    def repeat(source, x, y, z):
+        s = make_instance(doc, source, 'Structure', links)
+        set_position(s, x, y, z)
+        grp.addObject(s)
+        return s
     s = Arch.makeStructure(profile,height=1)
     s.Placement = Placement(Vector(0,1,0),Rotation(0,90,0))
-    s.setExpression('.Placement.Base.x', 'Computed.LeftCornerX+Config.CanopyProfileWidth')
-    s.setExpression('.Placement.Base.y', 'Computed.BackCornerY-Config.CanopyProfileHeight/2')
-    s.setExpression('.Placement.Base.z', 'Computed.CanopyBeamsLevel')
-    s.setExpression('Height', 'Computed.BeamCanopyLeft2RightLength')
-    s.IfcType = "Beam"
-    grp.addObject(s)
-    s = Arch.makeStructure(profile,height=1)
-    s.Placement = Placement(Vector(0,1,0),Rotation(0,90,0))
-    s.setExpression('.Placement.Base.x', 'Computed.LeftCornerX+Config.CanopyProfileWidth')
-    s.setExpression('.Placement.Base.y', 'Computed.FrontCornerY+Config.CanopyProfileHeight/2')
-    s.setExpression('.Placement.Base.z', 'Computed.CanopyBeamsLevel')
+    set_position(s, 'Computed.LeftCornerX+Config.CanopyProfileWidth', 'Computed.BackCornerY-Config.CanopyProfileHeight/2', 'Computed.CanopyBeamsLevel')
     s.setExpression('Height', 'Computed.BeamCanopyLeft2RightLength')
     s.IfcType = "Beam"
     grp.addObject(s)
+    repeat(s, 'Computed.LeftCornerX+Config.CanopyProfileWidth', 'Computed.FrontCornerY+Config.CanopyProfileHeight/2', 'Computed.CanopyBeamsLevel')
     s = Arch.makeStructure(profile,height=1)
     s.Placement = Placement(Vector(0,1,0),Rotation(90,-90,0))
-    s.setExpression('.Placement.Base.x', 'Computed.LeftCornerX+Config.CanopyProfileHeight/2')
-    s.setExpression('.Placement.Base.y', 'Computed.BackCornerY-Config.CanopyProfileHeight')
-    s.setExpression('.Placement.Base.z', 'Computed.CanopyBeamsLevel')
+    set_position(s, 'Computed.LeftCornerX+Config.CanopyProfileHeight/2', 'Computed.BackCornerY-Config.CanopyProfileHeight', 'Computed.CanopyBeamsLevel')
     s.setExpression('Height', 'Computed.BeamCanopyFront2BackLength')
     s.IfcType = "Beam"
-    sb = Draft.make_ortho_array(s, v_x=App.Vector(10, 0, 0), v_y=App.Vector(0, 10, 0), v_z=App.Vector(0, 0, 10), n_x=1, n_y=1, n_z=1, use_link=False)
+    sb = Draft.make_ortho_array(s, v_x=App.Vector(10, 0, 0), v_y=App.Vector(0, 10, 0), v_z=App.Vector(0, 0, 10), n_x=1, n_y=1, n_z=1, use_link=links)
     sb.setExpression('.IntervalX.x', 'Computed.CanopySpacingX')
     sb.setExpression('NumberX', 'Computed.CanopyBeamsX')
     grp.addObject(sb)
     s = Arch.makeStructure(profile,height=1)
     s.Placement = Placement(Vector(0,0,1),Rotation(0,0,0))
-    s.setExpression('.Placement.Base.x', 'Computed.LeftCornerX+Config.CanopyProfileWidth/2')
-    s.setExpression('.Placement.Base.y', 'Computed.FrontCornerY+Config.CanopyProfileHeight/2')
-    s.setExpression('.Placement.Base.z', 'Computed.CanopyLevel')
-    s.setExpression('Height', 'Computed.CanopyColumnHeight')
-    s.IfcType = "Column"
-    grp.addObject(s)
-    s = Arch.makeStructure(profile,height=1)
-    s.Placement = Placement(Vector(0,0,1),Rotation(0,0,0))
-    s.setExpression('.Placement.Base.x', 'Computed.RightCornerX-Config.CanopyProfileWidth/2')
-    s.setExpression('.Placement.Base.y', 'Computed.FrontCornerY+Config.CanopyProfileHeight/2')
-    s.setExpression('.Placement.Base.z', 'Computed.CanopyLevel')
-    s.setExpression('Height', 'Computed.CanopyColumnHeight')
-    s.IfcType = "Column"
-    grp.addObject(s)
-    s = Arch.makeStructure(profile,height=1)
-    s.Placement = Placement(Vector(0,0,1),Rotation(0,0,0))
-    s.setExpression('.Placement.Base.x', 'Computed.LeftCornerX+Config.CanopyProfileWidth/2')
-    s.setExpression('.Placement.Base.y', 'Computed.BackCornerY-Config.CanopyProfileHeight/2')
-    s.setExpression('.Placement.Base.z', 'Computed.CanopyLevel')
-    s.setExpression('Height', 'Computed.CanopyColumnHeight')
-    s.IfcType = "Column"
-    grp.addObject(s)
-    s = Arch.makeStructure(profile,height=1)
-    s.Placement = Placement(Vector(0,0,1),Rotation(0,0,0))
-    s.setExpression('.Placement.Base.x', 'Computed.RightCornerX-Config.CanopyProfileWidth/2')
-    s.setExpression('.Placement.Base.y', 'Computed.BackCornerY-Config.CanopyProfileHeight/2')
-    s.setExpression('.Placement.Base.z', 'Computed.CanopyLevel')
+    set_position(s, 'Computed.LeftCornerX+Config.CanopyProfileWidth/2', 'Computed.FrontCornerY+Config.CanopyProfileHeight/2', 'Computed.CanopyLevel')
     s.setExpression('Height', 'Computed.CanopyColumnHeight')
     s.IfcType = "Column"
     grp.addObject(s)
+    repeat(s, 'Computed.RightCornerX-Config.CanopyProfileWidth/2', 'Computed.FrontCornerY+Config.CanopyProfileHeight/2', 'Computed.CanopyLevel')
+    repeat(s, 'Computed.LeftCornerX+Config.CanopyProfileWidth/2', 'Computed.BackCornerY-Config.CanopyProfileHeight/2', 'Computed.CanopyLevel')
+    repeat(s, 'Computed.RightCornerX-Config.CanopyProfileWidth/2', 'Computed.BackCornerY-Config.CanopyProfileHeight/2', 'Computed.CanopyLevel')
     return grp
 
 
@@ -0,0 +1,156 @@
+#****************************************************************************
+# *                                                                          *
+# *   Aquarium                                                               *
+# *   Copyright (c) 2023 LGPL                                                *
+# *                                                                          *
+# *   This program is free software; you can redistribute it and/or modify   *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)     *
+# *   as published by the Free Software Foundation; either version 2 of      *
+# *   the License, or (at your option) any later version.                    *
+# *   for detail see the LICENCE text file.                                  *
+# *                                                                          *
+# *   This program is distributed in the hope that it will be useful,        *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+# *   GNU Library General Public License for more details.                   *
+# *                                                                          *
+# *   You should have received a copy of the GNU Library General Public      *
+# *   License along with this program; if not, write to the Free Software    *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+# *   USA                                                                    *
+# *                                                                          *
+#****************************************************************************
+
+# Checks flanges, nozzles, weir glass and stand beams for collisions using
+# only the configuration values, before any geometry is built.
+# Everything is tested in plan view (XY), z only decides if two parts can meet.
+from collections import namedtuple
+from config import DefaultValues, flange_layout
+from computed import evaluate
+
+Clash = namedtuple('Clash', ['severity', 'first', 'second', 'message'])
+Rect = namedtuple('Rect', ['name', 'x0', 'y0', 'x1', 'y1'])
+Circle = namedtuple('Circle', ['name', 'x', 'y', 'r'])
+
+TOLERANCE = 1e-6
+
+
+def circle_rect_overlap(c, r):
+    dx = max(r.x0 - c.x, 0, c.x - r.x1)
+    dy = max(r.y0 - c.y, 0, c.y - r.y1)
+    return dx * dx + dy * dy < (c.r - TOLERANCE) ** 2
+
+
+def circle_inside_rect(c, r):
+    return c.x - c.r >= r.x0 - TOLERANCE and c.x + c.r <= r.x1 + TOLERANCE and c.y - c.r >= r.y0 - TOLERANCE and c.y + c.r <= r.y1 + TOLERANCE
+
+
+def circles_overlap(a, b):
+    return (a.x - b.x) ** 2 + (a.y - b.y) ** 2 < (a.r + b.r - TOLERANCE) ** 2
+
+
+def stand_beams(cfg, cmp):
+    mph = cfg['MetalProfileHeight']
+    mpw = cfg['MetalProfileWidth']
+    left, right = cmp['LeftCornerX'], cmp['RightCornerX']
+    front, back = cmp['FrontCornerY'], cmp['BackCornerY']
+    beams = [
+        Rect('FrontBeam', left, front, right, front + mph),
+        Rect('BackBeam', left, back - mph, right, back),
+        Rect('LeftBeam', left, front, left + mph, back),
+        Rect('RightBeam', right - mph, front, right, back),
+        Rect('FrontLeftColumn', left, front, left + mpw, front + mph),
+        Rect('FrontRightColumn', right - mpw, front, right, front + mph),
+        Rect('BackLeftColumn', left, back - mph, left + mpw, back),
+        Rect('BackRightColumn', right - mpw, back - mph, right, back),
+    ]
+    spacing = cmp['StandBeamSpacing']
+    for k in range(int(round(cfg['BeamsStandCount']))):
+        if cmp['BeamsDir'] > 0:
+            y = front + spacing + mph / 2 + k * spacing
+            x = left + mph
+            beams.append(Rect(f'BaseReinforcement{k}', x, y - mph / 2, x + cmp['BeamsSizeMiddle'], y + mph / 2))
+        else:
+            x = left + spacing + mph / 2 + k * spacing
+            y = front + mph
+            beams.append(Rect(f'BaseReinforcement{k}', x - mph / 2, y, x + mph / 2, y + cmp['BeamsSizeMiddle']))
+    return beams
+
+
+def flange_positions(cfg, cmp, flanges):
+    offset = (cmp['WeirInsideWidth'] - cmp['FlangesMaxDiameter']) / max(len(flanges) - 1, 1)
+    return [(f'Flange{type}_{i}', type, cmp['StartPipes'] + i * offset, cmp['FlangesY']) for i, type in enumerate(flanges)]
+
+
+def nozzle_positions(cmp):
+    nx = int(round(cmp['NozzlesNumberX']))
+    ny = int(round(cmp['NozzlesNumberY']))
+    return [(f'Nozzle_{i}_{j}', 'NozzleClosedLoop', cmp['NozzlesBaseX'] + i * cmp['NozzlesSpacingX'], cmp['NozzlesBaseY'] + j * cmp['NozzlesSpacingY'])
+            for i in range(nx) for j in range(ny)]
+
+
+def check(values, flanges=None):
+    """List of Clash found for the given {sheet: {alias: value}} configuration, missing values taken from the defaults.
+
+    flanges is the type of each weir flange from left to right, the types of flange_layout() by default."""
+    if flanges is None:
+        flanges = [type for type, level in flange_layout()]
+    full = DefaultValues()
+    for sheet, v in values.items():
+        full[sheet].update(v)
+    cmp = evaluate(full)
+    cfg = full['Config']
+    clashes = []
+    sgt = cfg['SidesGlassThickness']
+    left, right = cmp['LeftCornerX'], cmp['RightCornerX']
+    front, back = cmp['FrontCornerY'], cmp['BackCornerY']
+    weir_front = back - sgt - cmp['WeirDepth']
+    weir = Rect('Weir', left + 2 * sgt + cfg['BraceWidth'], weir_front + sgt, right - 2 * sgt - cfg['BraceWidth'], back - sgt)
+    weir_wall = Rect('WeirGlass', left + sgt + cfg['BraceWidth'], weir_front, right - sgt - cfg['BraceWidth'], weir_front + sgt)
+    tank = Rect('Tank', left + sgt, front + sgt, right - sgt, weir_front)
+    beams = stand_beams(cfg, cmp)
+    # The tail keep-out only reaches the beams when it is deeper than the leveling base
+    def tail_reaches_beams(pipes):
+        return pipes['FlangeFreeHeightBottom'] > cfg['UnderGlassLevelingBaseThickness'] + TOLERANCE
+
+    def check_structure(name, pipes, x, y):
+        pipe = Circle(f'{name}Pipe', x, y, pipes['PipeDiameter'] / 2)
+        tail = Circle(f'{name}Tail', x, y, pipes['FlangeFreeDiameterBottom'] / 2)
+        for b in beams:
+            if circle_rect_overlap(pipe, b):
+                clashes.append(Clash('error', pipe.name, b.name, f'pipe of {name} crosses {b.name}'))
+            elif tail_reaches_beams(pipes) and circle_rect_overlap(tail, b):
+                clashes.append(Clash('warning', tail.name, b.name, f'free space under {name} hits {b.name}'))
+
+    heads = []
+    for name, type, x, y in flange_positions(cfg, cmp, flanges):
+        pipes = full[f'ConfigPipes{type}']
+        head = Circle(f'{name}Head', x, y, pipes['FlangeFreeDiameterTop'] / 2)
+        neck = Circle(f'{name}Neck', x, y, pipes['FlangeDiameter'] / 2)
+        if not circle_inside_rect(neck, weir):
+            clashes.append(Clash('error', neck.name, weir.name, f'{name} does not fit inside the weir'))
+        elif not circle_inside_rect(head, weir):
+            clashes.append(Clash('warning', head.name, weir.name, f'free space around {name} crosses the weir glass'))
+        heads.append(head)
+        check_structure(name, pipes, x, y)
+    nozzles = full['ConfigPipesNozzleClosedLoop']
+    for name, type, x, y in nozzle_positions(cmp):
+        head = Circle(f'{name}Head', x, y, nozzles['FlangeFreeDiameterTop'] / 2)
+        neck = Circle(f'{name}Neck', x, y, nozzles['FlangeDiameter'] / 2)
+        if circle_rect_overlap(neck, weir_wall) or circle_rect_overlap(neck, weir):
+            clashes.append(Clash('error', neck.name, weir_wall.name, f'{name} collides with the weir'))
+        elif not circle_inside_rect(neck, tank):
+            clashes.append(Clash('error', neck.name, tank.name, f'{name} is outside the tank'))
+        elif not circle_inside_rect(head, tank):
+            clashes.append(Clash('warning', head.name, tank.name, f'free space around {name} crosses the glass'))
+        heads.append(head)
+        check_structure(name, nozzles, x, y)
+    for i in range(len(heads)):
+        for j in range(i + 1, len(heads)):
+            if circles_overlap(heads[i], heads[j]):
+                clashes.append(Clash('warning', heads[i].name, heads[j].name, f'free space of {heads[i].name} and {heads[j].name} overlap'))
+    return clashes
+
+
+def errors(clashes):
+    return [c for c in clashes if c.severity == 'error']
@@ -0,0 +1,356 @@
+#****************************************************************************
+# *                                                                          *
+# *   Aquarium                                                               *
+# *   Copyright (c) 2023 LGPL                                                *
+# *                                                                          *
+# *   This program is free software; you can redistribute it and/or modify   *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)     *
+# *   as published by the Free Software Foundation; either version 2 of      *
+# *   the License, or (at your option) any later version.                    *
+# *   for detail see the LICENCE text file.                                  *
+# *                                                                          *
+# *   This program is distributed in the hope that it will be useful,        *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+# *   GNU Library General Public License for more details.                   *
+# *                                                                          *
+# *   You should have received a copy of the GNU Library General Public      *
+# *   License along with this program; if not, write to the Free Software    *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+# *   USA                                                                    *
+# *                                                                          *
+#****************************************************************************
+
+# Evaluates the formulas of the Computed sheet without FreeCAD.
+# The spreadsheet expressions are parsed once, ordered by their dependencies
+# and compiled into a single Python function.
+import math
+import re
+from config import DefaultsComputed, DefaultValues
+
+
+class FormulaError(Exception):
+
+    def __init__(self, val):
+        Exception.__init__(self, val)
+
+
+class Dialect():
+    """How conditionals and functions are written in the generated code."""
+
+    def __init__(self, conditional, functions, namespace):
+        self.conditional = conditional
+        self.functions = functions
+        self.namespace = namespace
+
+
+def _fmod(a, b):
+    return math.fmod(a, b)
+
+
+SCALAR = Dialect(
+    '({1} if {0} else {2})',
+    {
+        'abs': 'abs',
+        'min': 'min',
+        'max': 'max',
+        'sqrt': '_sqrt',
+        'floor': '_floor',
+        'ceil': '_ceil',
+        'round': 'round',
+        'trunc': '_trunc',
+        'mod': '_fmod',
+        'pow': 'pow',
+    },
+    {
+        '_sqrt': math.sqrt,
+        '_floor': math.floor,
+        '_ceil': math.ceil,
+        '_trunc': math.trunc,
+        '_fmod': _fmod,
+    })
+
+UNITS = {'mm': 1.0, 'cm': 10.0, 'dm': 100.0, 'm': 1000.0}
+
+_token = re.compile(r'\s*(?:(\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?)|([A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)|(>=|<=|==|!=|[-+*/^%?:;,()<>]))')
+
+
+def tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _token.match(text, pos)
+        if match is None:
+            raise FormulaError(f"Unexpected character in '{text}' at {pos}")
+        num, ident, op = match.groups()
+        if num is not None:
+            tokens.append(('num', float(num)))
+        elif ident is not None:
+            tokens.append(('ident', ident))
+        else:
+            tokens.append(('op', op))
+        pos = match.end()
+    return tokens
+
+
+class Parser():
+    # conditional < comparison < additive < multiplicative < unary < power
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.pos = 0
+
+    def peek(self):
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return (None, None)
+
+    def take(self, op=None):
+        tok = self.peek()
+        if op is not None and tok != ('op', op):
+            raise FormulaError(f"Expected '{op}' in '{self.text}'")
+        self.pos += 1
+        return tok
+
+    def parse(self):
+        node = self.conditional()
+        if self.pos != len(self.tokens):
+            raise FormulaError(f"Unexpected '{self.peek()[1]}' in '{self.text}'")
+        return node
+
+    def conditional(self):
+        cond = self.comparison()
+        if self.peek() == ('op', '?'):
+            self.take()
+            a = self.conditional()
+            self.take(':')
+            b = self.conditional()
+            return ('if', cond, a, b)
+        return cond
+
+    def comparison(self):
+        a = self.additive()
+        tok = self.peek()
+        if tok[0] == 'op' and tok[1] in ('<', '>', '<=', '>=', '==', '!='):
+            self.take()
+            return ('bin', tok[1], a, self.additive())
+        return a
+
+    def additive(self):
+        a = self.multiplicative()
+        while self.peek() in (('op', '+'), ('op', '-')):
+            op = self.take()[1]
+            a = ('bin', op, a, self.multiplicative())
+        return a
+
+    def multiplicative(self):
+        a = self.unary()
+        while self.peek() in (('op', '*'), ('op', '/'), ('op', '%')):
+            op = self.take()[1]
+            a = ('bin', op, a, self.unary())
+        return a
+
+    def unary(self):
+        tok = self.peek()
+        if tok == ('op', '-'):
+            self.take()
+            return ('neg', self.unary())
+        if tok == ('op', '+'):
+            self.take()
+            return self.unary()
+        return self.power()
+
+    def power(self):
+        a = self.primary()
+        if self.peek() == ('op', '^'):
+            self.take()
+            return ('bin', '^', a, self.unary())
+        return a
+
+    def primary(self):
+        kind, value = self.take()
+        if kind == 'num':
+            unit = self.peek()
+            if unit[0] == 'ident' and unit[1] in UNITS:
+                self.take()
+                value *= UNITS[unit[1]]
+            return ('num', value)
+        if kind == 'ident':
+            if self.peek() == ('op', '('):
+                self.take()
+                args = [self.conditional()]
+                while self.peek() in (('op', ';'), ('op', ',')):
+                    self.take()
+                    args.append(self.conditional())
+                self.take(')')
+                return ('call', value, args)
+            if '.' in value:
+                sheet, name = value.split('.', 1)
+                return ('ref', sheet, name)
+            return ('ref', None, value)
+        if (kind, value) == ('op', '('):
+            node = self.conditional()
+            self.take(')')
+            return node
+        raise FormulaError(f"Unexpected '{value}' in '{self.text}'")
+
+
+def parse(text):
+    if text.startswith('='):
+        text = text[1:]
+    return Parser(text).parse()
+
+
+def references(node, refs=None):
+    """Set of (sheet, alias) referenced by a parsed formula, sheet is None for local aliases."""
+    if refs is None:
+        refs = set()
+    if node[0] == 'ref':
+        refs.add((node[1], node[2]))
+    elif node[0] == 'call':
+        for a in node[2]:
+            references(a, refs)
+    else:
+        for a in node[1:]:
+            if isinstance(a, tuple):
+                references(a, refs)
+    return refs
+
+
+def _variable(sheet, name):
+    if sheet is None:
+        return f'c_{name}'
+    return f'i_{sheet}_{name}'
+
+
+def generate(node, dialect, local):
+    kind = node[0]
+    if kind == 'num':
+        return repr(node[1])
+    if kind == 'ref':
+        if node[1] == local:
+            return _variable(None, node[2])
+        return _variable(node[1], node[2])
+    if kind == 'neg':
+        return f'(-{generate(node[1], dialect, local)})'
+    if kind == 'bin':
+        op = '**' if node[1] == '^' else node[1]
+        a = generate(node[2], dialect, local)
+        b = generate(node[3], dialect, local)
+        if op == '%':
+            return f"{dialect.functions['mod']}({a}, {b})"
+        return f'({a} {op} {b})'
+    if kind == 'if':
+        return dialect.conditional.format(*[generate(a, dialect, local) for a in node[1:]])
+    if kind == 'call':
+        fn = dialect.functions.get(node[1].lower())
+        if fn is None:
+            raise FormulaError(f'Unknown function {node[1]}')
+        return f"{fn}({', '.join([generate(a, dialect, local) for a in node[2]])})"
+    raise FormulaError(f'Unknown node {kind}')
+
+
+class ComputedEvaluator():
+    """Compiled evaluator for a Computed sheet, ordered as a DAG of its aliases."""
+
+    def __init__(self, definitions=None, dialect=SCALAR, sheet='Computed'):
+        if definitions is None:
+            definitions = DefaultsComputed()
+        self.sheet = sheet
+        self.dialect = dialect
+        self.formulas = dict()
+        self.dependencies = dict()
+        self.references = dict()
+        self.inputs = set()
+        trees = dict()
+        for name, value, descr in definitions:
+            text = str(value)
+            self.formulas[name] = text
+            if text.startswith('='):
+                trees[name] = parse(text)
+            else:
+                try:
+                    trees[name] = ('num', float(text))
+                except ValueError:
+                    raise FormulaError(f'{name}: {text} is not a formula or a number')
+        for name, tree in trees.items():
+            deps = set()
+            refs = set()
+            for sheet, alias in references(tree):
+                if sheet is None or sheet == self.sheet:
+                    if alias not in trees:
+                        raise FormulaError(f'{name} references unknown {self.sheet}.{alias}')
+                    deps.add(alias)
+                    refs.add((self.sheet, alias))
+                else:
+                    self.inputs.add((sheet, alias))
+                    refs.add((sheet, alias))
+            self.dependencies[name] = deps
+            self.references[name] = refs
+        self.order = self.__sort()
+        self.__function = self.__compile(trees)
+
+    def __sort(self):
+        order = []
+        state = dict()
+
+        def visit(name, path):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise FormulaError('Circular reference: ' + ' -> '.join(path + [name]))
+            state[name] = 'visiting'
+            for d in sorted(self.dependencies[name]):
+                visit(d, path + [name])
+            state[name] = 'done'
+            order.append(name)
+
+        for name in self.dependencies:
+            visit(name, [])
+        return order
+
+    def __compile(self, trees):
+        lines = ['def evaluate(values):']
+        for sheet in sorted({s for s, _ in self.inputs}):
+            lines.append(f'    s = values[{sheet!r}]')
+            for s, alias in sorted(self.inputs):
+                if s == sheet:
+                    lines.append(f'    {_variable(s, alias)} = s[{alias!r}]')
+        for name in self.order:
+            lines.append(f'    {_variable(None, name)} = {generate(trees[name], self.dialect, self.sheet)}')
+        lines.append('    return {' + ', '.join([f'{n!r}: {_variable(None, n)}' for n in self.order]) + '}')
+        namespace = dict(self.dialect.namespace)
+        exec(compile('\n'.join(lines), f'<{self.sheet}>', 'exec'), namespace)
+        return namespace['evaluate']
+
+    def dependents(self, changed):
+        """Aliases of this sheet affected by the given (sheet, alias) pairs, in evaluation order."""
+        changed = set(changed)
+        dirty = set()
+        for name in self.order:
+            if (self.sheet, name) in changed or self.dependencies[name] & dirty or self.references[name] & changed:
+                dirty.add(name)
+        return [n for n in self.order if n in dirty]
+
+    def __call__(self, values):
+        try:
+            return self.__function(values)
+        except KeyError as e:
+            raise FormulaError(f'Missing value {e.args[0]}')
+
+
+_evaluator = None
+
+
+def evaluate(values=None):
+    """Computed values for the given Config values, missing ones taken from the defaults."""
+    global _evaluator
+    if _evaluator is None:
+        _evaluator = ComputedEvaluator()
+    merged = DefaultValues()
+    if values is not None:
+        for sheet, v in values.items():
+            merged.setdefault(sheet, dict()).update(v)
+    return _evaluator(merged)
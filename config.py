@@ -22,7 +22,9 @@
 #****************************************************************************
 
 # import FreeCAD as App
-from collections.abc import MutableMapping, Iterator
+import json
+import re
+from collections.abc import MutableMapping
 
 
 class InvalidConfigException(Exception):
@@ -83,10 +85,29 @@ class ConfigRepository(MutableMapping):
         if self.__sheet == None:
             # print(f"Adding sheel {name}")
             self.__sheet = doc.addObject('Spreadsheet::Sheet', name)
-            
+        self.__writing = False
+        self.__index()
+
+    def __index(self):
+        # One pass over the sheet: alias -> cell and the rows already taken in column A
+        self.__cells = dict()
+        self.__rows = set()
+        for cell in self.__sheet.getUsedCells():
+            match = re.fullmatch(r'A(\d+)', cell)
+            if match is None:
+                continue
+            self.__rows.add(int(match.group(1)))
+            alias = self.__sheet.getAlias(cell)
+            if alias:
+                self.__cells[alias] = cell
+        self.__next_row = 1
+
     def recompute(self):
         self.__sheet.recompute()
 
+    def writing(self):
+        return self.__writing
+
     def getCellAlias(self, cell):
         return self.__sheet.getAlias(cell)
 
@@ -94,56 +115,60 @@ class ConfigRepository(MutableMapping):
         return self.__sheet.getContents(cell)
 
     def __getitem__(self, key):
-        cell = self.__sheet.getCellFromAlias(key)
+        cell = self.__cells.get(key)
         if cell is None:
             raise KeyError(key)
         return self.__sheet.get(cell)
 
     def __setitem__(self, key, value):
-        cell = self.__sheet.getCellFromAlias(key)
-        if cell is None:
-            line = self.__allocate_cell()
-            cell = f'A{line}'
-            self.__sheet.setAlias(cell, key)
-        self.__sheet.set(cell, str(value))
+        self.__write(key, value)
+
+    def __write(self, key, value):
+        self.__writing = True
+        try:
+            cell = self.__cells.get(key)
+            if cell is None:
+                line = self.__allocate_cell()
+                cell = f'A{line}'
+                self.__sheet.setAlias(cell, key)
+                self.__cells[key] = cell
+            self.__sheet.set(cell, str(value))
+        finally:
+            self.__writing = False
+
+    def update(self, mapping=(), **kwargs):
+        values = dict(mapping, **kwargs)
+        for key, value in values.items():
+            self.__write(key, value)
+        if len(values) > 0:
+            self.recompute()
 
     def __delitem__(self, key):
-        cell = self.__sheet.getCellFromAlias(key)
+        cell = self.__cells.pop(key, None)
         if cell is None:
             return
-        self.__sheet.clear(cell)
+        self.__writing = True
+        try:
+            self.__sheet.clear(cell)
+        finally:
+            self.__writing = False
+        line = int(cell[1:])
+        self.__rows.discard(line)
+        self.__next_row = min(self.__next_row, line)
 
     def __allocate_cell(self):
-        index = 1
-        while '' != self.getCell(f'A{index}'):
+        index = self.__next_row
+        while index in self.__rows:
             index += 1
+        self.__rows.add(index)
+        self.__next_row = index + 1
         return index
 
     def __len__(self):
-        return len(self.__sheet.getUsedCells())
-    
-    def __iter__(self):
-
-        class IterConfigRepository(Iterator):
-
-            def __init__(self, cr, used):
-                self.__index = 0
-                self.__conf = cr
-                self.__used = used
+        return len(self.__cells)
 
-            def __next__(self):
-                try:
-                    if self.__index > len(self.__used):
-                        raise StopIteration
-                    cell = self.__used[self.__index]
-                    val = self.__conf.getCellAlias(cell)
-                except:
-                    raise StopIteration
-                self.__index += 1
-                return val
-
-        usedCells = self.__sheet.getUsedCells()
-        return IterConfigRepository(self, usedCells)
+    def __iter__(self):
+        return iter(list(self.__cells))
 
 
 class ConfDefs(dict):
@@ -219,6 +244,7 @@ def DefaultsConfig(categories):
     defcon.addNum('CanopyBeams2Top', 100, 0, 100, 1, 'Free space from top of canopy column to top of beams (slightly smaller than groove space)', mm, 'canopy')
     defcon.addNum('CanopyExtraBeams', 2, 0, 10, 1, 'Number of beams to hang lights and other stuff, zero to disable', num, 'canopy')
     defcon.addNum('PanelThickness', 5, 1, 30, 1, 'Thickness of external panel', mm, 'structure')
+    defcon.addNum('DetailLevel', 1, 0, 1, 1, 'Level of detail, 0 shows plain weir and panels while iterating, 1 cuts every slot and hole', num, 'visual')
     return defcon
 
 
@@ -288,71 +314,154 @@ class config_sheet():
         self._sheet.recompute()
 
 
+def DefaultsComputed():
+    # name, value or formula evaluated by the Computed sheet, description
+    return [
+        ('BeamsDir', '=Config.Width>Config.Length?0:1', None),
+        ('PanelFastenerSizeVertical', '=Config.PanelMountHoleBorderSpacing*2+Config.PanelMountHoleSpacing*(Config.PanelMountHoleCountVertical-1)', None),
+        ('PanelFastenerSizeHorizontal', '=Config.PanelMountHoleBorderSpacing*2+Config.PanelMountHoleSpacing*(Config.PanelMountHoleCountHorizontal-1)', None),
+        ('SumpBeamsLevel', '=Config.Sump2FloorSpaceForBroom+Config.MetalProfileWidth/2', 'Level of center of sump beams'),
+        ('WaterLevelDeepest', '=Config.StandVisibleHeight-Config.HideExtraBottom-Config.SidesGlassThickness', 'Level of the base glass'),
+        ('GlassLevel', '=WaterLevelDeepest-Config.BottomGlassThickness', 'Level of the deepest water inside glass (pipes can go deeper)'),
+        ('UnderGlassBaseLevel', '=GlassLevel-Config.UnderGlassLevelingBaseThickness', 'Level of the base that distribute que weigth to the structure'),
+        ('BeamsLevel', '=UnderGlassBaseLevel-Config.MetalProfileWidth/2', 'Level of center of sump beams'),
+        ('SumpBoardLevel', '=Config.Sump2FloorSpaceForBroom+Config.MetalProfileWidth', 'Level of sump base board'),
+        ('RealGlassHeight', '=Config.VisibleHeightGlass+Config.HideExtraTop+Config.HideExtraBottom+3*Config.SidesGlassThickness', 'Real height of glass panels'),
+        ('RightCornerX', '=+Config.Width/2', 'Coordinate of corner'),
+        ('LeftCornerX', '=-Config.Width/2', 'Coordinate of corner'),
+        ('FrontCornerY', '=-Config.Length/2', 'Coordinate of corner'),
+        ('BackCornerY', '=+Config.Length/2', 'Coordinate of corner'),
+        ('BeamsSumpSizeWidth', '=Config.Width-2*Config.MetalProfileWidth', 'Length of beams in the width size'),
+        ('BeamsSumpSizeLength', '=Config.Length-2*Config.MetalProfileHeight', 'Length of beams in the length size'),
+        ('BeamsSizeWidth', '=Config.Width-Config.MetalProfileWidth', 'Length of beams in the width size'),
+        ('BeamsSizeWidth45', '=Config.Width', 'Length of beams in the width size'),
+        ('BeamsSizeLength', '=Config.Length', 'Length of beams in the length size'),
+        ('BeamsSizeMiddle', '=min(Config.Width;Config.Length)-Config.MetalProfileWidth', 'Length of beams in the width size'),
+        ('SumpBeamSpacing', '=((BeamsDir>0?Config.Length:Config.Width)-Config.MetalProfileHeight)/max(1;Config.BeamsSumpCount+1)', None),
+        ('StandBeamSpacing', '=((BeamsDir>0?Config.Length:Config.Width)-Config.MetalProfileHeight)/max(1;Config.BeamsStandCount+1)', None),
+        ('NozzlesStart', '=abs(StandBeamSpacing) * (Config.NozzlesSkipBefore + 0.5)+Config.MetalProfileHeight/2', None),
+        ('NozzlesEnd', '=abs(StandBeamSpacing) * (Config.NozzlesSkipAfter + 0.5)', None),
+        ('NozzlesCount', '=1+((BeamsDir>0?Config.Length:Config.Width) - NozzlesStart - NozzlesEnd) / max(1; abs(StandBeamSpacing*Config.NozzlesEveryXBeamSpace))', None),
+        ('NozzlesSpacingRows', '=(BeamsDir>0?Config.Width:Config.Length-WeirDepth)/max(Config.NozzlesRows;1)', None),
+        ('NozzlesSpacingY', '=BeamsDir>0?StandBeamSpacing*Config.NozzlesEveryXBeamSpace:NozzlesSpacingRows', None),
+        ('NozzlesSpacingX', '=BeamsDir>0?NozzlesSpacingRows:StandBeamSpacing*Config.NozzlesEveryXBeamSpace', None),
+        ('NozzlesNumberY', '=BeamsDir>0?NozzlesCount:Config.NozzlesRows', None),
+        ('NozzlesNumberX', '=BeamsDir>0?Config.NozzlesRows:NozzlesCount', None),
+        ('NozzlesBaseX', '=LeftCornerX+(BeamsDir>0?NozzlesSpacingRows:StandBeamSpacing)/2+(BeamsDir>0?0:Config.MetalProfileHeight/2)', None),
+        ('NozzlesBaseY', '=FrontCornerY+(BeamsDir>0?StandBeamSpacing:NozzlesSpacingRows)/2+(BeamsDir>0?Config.MetalProfileHeight/2:0)', None),
+        ('ColumnsSizeHeight', '=UnderGlassBaseLevel-Config.MetalProfileWidth', 'Length of columns'),
+        ('FlangesNeckHeight', '=Config.SidesGlassThickness+Config.BottomGlassThickness', None),
+        ('FlangesFreeByHeadDrain', '=ConfigPipesDrain.FlangeFreeDiameterTop/2+Config.SidesGlassThickness', None),
+        ('FlangesFreeByPipeDrain', '=ConfigPipesDrain.PipeDiameter/2+Config.MetalProfileHeight', None),
+        ('FlangesFreeByTailDrain', '=ConfigPipesDrain.FlangeFreeDiameterBottom/2', None),
+        ('FlangesFreeByHeadReturn', '=ConfigPipesReturn.FlangeFreeDiameterTop/2+Config.SidesGlassThickness', None),
+        ('FlangesFreeByPipeReturn', '=ConfigPipesReturn.PipeDiameter/2+Config.MetalProfileHeight', None),
+        ('FlangesFreeByTailReturn', '=ConfigPipesReturn.FlangeFreeDiameterBottom/2', None),
+        ('WeirCenter', '=max(FlangesFreeByHeadDrain;FlangesFreeByPipeDrain;FlangesFreeByTailDrain;FlangesFreeByHeadReturn;FlangesFreeByPipeReturn;FlangesFreeByTailReturn)', None),
+        ('FlangesMaxDiameter', '=max(ConfigPipesDrain.FlangeFreeDiameterTop;ConfigPipesDrain.FlangeFreeDiameterBottom;ConfigPipesReturn.FlangeFreeDiameterTop;ConfigPipesReturn.FlangeFreeDiameterBottom)', None),
+        ('WeirDepth', '=2*(WeirCenter)', None),
+        ('FlangesY', '=Config.Length/2-WeirCenter-Config.SidesGlassThickness', 'Center of flanges, Y'),
+        ('FlangesZ', '=GlassLevel+FlangesNeckHeight', 'Center of flanges, Z'),
+        ('WeirMargin', '=Config.BraceWidth+Config.SidesGlassThickness', None),
+        ('WeirWidth', '=Config.Width-2*WeirMargin', None),
+        ('WeirInsideWidth', '=WeirWidth-2*Config.SidesGlassThickness', None),
+        ('StartPipes', '=LeftCornerX+(Config.BraceWidth+2*Config.SidesGlassThickness+FlangesMaxDiameter/2)', None),
+        ('BulkHeadSpace', '=WeirInsideWidth/(Config.BulkHeadNumber)', None),
+        ('FlangeCount', '0', None),
+        ('WeirFlangeOffset', '=(WeirInsideWidth-FlangesMaxDiameter)/max(FlangeCount-1;1)', None),
+        ('BeamCanopyFront2BackLength', '=Config.Length-2*Config.CanopyProfileHeight', None),
+        ('BeamCanopyLeft2RightLength', '=Config.Width-2*Config.CanopyProfileWidth', None),
+        ('CanopyPanelLevel', '=Config.StandVisibleHeight+Config.VisibleHeightGlass', 'Level of the canopy'),
+        ('CanopyPanelHeight', '=Config.CanopyHeight', 'Level of the canopy'),
+        ('CanopyLevel', '=CanopyPanelLevel+Config.HideExtraTop+2*Config.SidesGlassThickness', 'Level of the canopy'),
+        ('CanopyBeamsLevel', '=CanopyPanelLevel+Config.CanopyHeight-Config.CanopyBeams2Top', 'Level of the canopy beams'),
+        ('CanopySpacingX', '=(Config.Width - Config.CanopyProfileHeight) / max(1; Config.CanopyExtraBeams + 1)', None),
+        ('CanopyBeamsX', '=Config.CanopyExtraBeams+2', None),
+        ('CanopyColumnHeight', '=Config.CanopyHeight-Config.HideExtraTop-2*Config.SidesGlassThickness', None),
+    ]
+
+
+def DefaultValues():
+    values = dict()
+    for x in [ DefaultsConfig(dict()), DefaultsPipesDrain(dict()), DefautsPipesReturn(dict()), DefaultsClosedLoop(dict()) ]:
+        values[x.type()] = {k: x[k].default for k in x}
+    return values
+
+
+# Water level of each drain of a Bean Animal overflow, from left to right
+BEAN_ANIMAL = [
+    ('Drain', 'BeanAnimalMainDrainLevel'),
+    ('Drain', 'BeanAnimalEmergencyDrainLevel'),
+    ('Drain', 'BeanAnimalEmergencyDrainLevel'),
+    ('Drain', 'BeanAnimalAuxiliaryDrainLevel'),
+    ]
+
+
+def flange_layout(drains=BEAN_ANIMAL, returns=2):
+    """(type, level) of every weir flange from left to right, the returns split around the drains."""
+    ret = ('Return', 'ReturnWaterLevel')
+    return [ret] * (returns - returns // 2) + list(drains) + [ret] * (returns // 2)
+
+
+def document_layout(doc):
+    """flange_layout() of the flanges built in doc, None when it has none.
+
+    The types come from the Flange<type>_<index> parts in index order, the
+    levels from the Config alias in the length of the matching weir pipe."""
+    grp = doc.getObject('Flanges')
+    if grp is None:
+        return None
+    flanges = []
+    for o in grp.Group:
+        match = re.fullmatch(r'Flange(Drain|Return)_(\d+)', o.Name)
+        if match:
+            flanges.append((int(match.group(2)), match.group(1)))
+    if len(flanges) == 0:
+        return None
+    defaults = dict(flange_layout())
+    layout = []
+    for i, (index, type) in enumerate(sorted(flanges)):
+        level = defaults[type]
+        pipe = doc.getObject(f'PipesWeir{type}_{i}')
+        for o in pipe.Group if pipe is not None else []:
+            lengths = [expr for path, expr in o.ExpressionEngine if path.lstrip('.') == 'Length']
+            found = re.search(r'\bConfig\.(\w+)', lengths[0]) if lengths else None
+            if found:
+                level = found.group(1)
+        layout.append((type, level))
+    return layout
+
+
+def load_config(path):
+    if path.endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:
+            # Python < 3.11, as bundled with many FreeCAD 0.21 builds
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise InvalidConfigException(f'{path}: TOML needs Python 3.11 or the tomli package, use JSON otherwise')
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    else:
+        with open(path) as f:
+            data = json.load(f)
+    values = dict()
+    for key, value in data.items():
+        if isinstance(value, dict):
+            values.setdefault(key, dict()).update(value)
+        else:
+            values.setdefault('Config', dict())[key] = value
+    return values
+
+
 def MakeComputed(doc):
     if hasattr(doc, 'Computed'):
         return
     s = config_sheet(doc, 'Computed')
-    s.add('BeamsDir', '=Config.Width>Config.Length?0:1')
-    s.add('PanelFastenerSizeVertical', '=Config.PanelMountHoleBorderSpacing*2+Config.PanelMountHoleSpacing*(Config.PanelMountHoleCountVertical-1)')
-    s.add('PanelFastenerSizeHorizontal', '=Config.PanelMountHoleBorderSpacing*2+Config.PanelMountHoleSpacing*(Config.PanelMountHoleCountHorizontal-1)')
-    s.add('SumpBeamsLevel', '=Config.Sump2FloorSpaceForBroom+Config.MetalProfileWidth/2', 'Level of center of sump beams')
-    s.add('WaterLevelDeepest', '=Config.StandVisibleHeight-Config.HideExtraBottom-Config.SidesGlassThickness', 'Level of the base glass')
-    s.add('GlassLevel', '=WaterLevelDeepest-Config.BottomGlassThickness', 'Level of the deepest water inside glass (pipes can go deeper)')
-    s.add('UnderGlassBaseLevel', '=GlassLevel-Config.UnderGlassLevelingBaseThickness', 'Level of the base that distribute que weigth to the structure')
-    s.add('BeamsLevel', '=UnderGlassBaseLevel-Config.MetalProfileWidth/2', 'Level of center of sump beams')
-    s.add('SumpBoardLevel', '=Config.Sump2FloorSpaceForBroom+Config.MetalProfileWidth', 'Level of sump base board')
-    s.add('RealGlassHeight', '=Config.VisibleHeightGlass+Config.HideExtraTop+Config.HideExtraBottom+3*Config.SidesGlassThickness', 'Real height of glass panels')
-    s.add('RightCornerX', '=+Config.Width/2', 'Coordinate of corner')
-    s.add('LeftCornerX', '=-Config.Width/2', 'Coordinate of corner')
-    s.add('FrontCornerY', '=-Config.Length/2', 'Coordinate of corner')
-    s.add('BackCornerY', '=+Config.Length/2', 'Coordinate of corner')
-    s.add('BeamsSumpSizeWidth', '=Config.Width-2*Config.MetalProfileWidth', 'Length of beams in the width size')
-    s.add('BeamsSumpSizeLength', '=Config.Length-2*Config.MetalProfileHeight', 'Length of beams in the length size')
-    s.add('BeamsSizeWidth', '=Config.Width-Config.MetalProfileWidth', 'Length of beams in the width size')
-    s.add('BeamsSizeWidth45', '=Config.Width', 'Length of beams in the width size')
-    s.add('BeamsSizeLength', '=Config.Length', 'Length of beams in the length size')
-    s.add('BeamsSizeMiddle', '=min(Config.Width;Config.Length)-Config.MetalProfileWidth', 'Length of beams in the width size')
-    s.add('SumpBeamSpacing', '=((BeamsDir>0?Config.Length:Config.Width)-Config.MetalProfileHeight)/max(1;Config.BeamsSumpCount+1)')
-    s.add('StandBeamSpacing', '=((BeamsDir>0?Config.Length:Config.Width)-Config.MetalProfileHeight)/max(1;Config.BeamsStandCount+1)')
-    s.add('NozzlesStart', '=abs(StandBeamSpacing) * (Config.NozzlesSkipBefore + 0.5)+Config.MetalProfileHeight/2')
-    s.add('NozzlesEnd', '=abs(StandBeamSpacing) * (Config.NozzlesSkipAfter + 0.5)')
-    s.add('NozzlesCount', '=1+((BeamsDir>0?Config.Length:Config.Width) - NozzlesStart - NozzlesEnd) / max(1; abs(StandBeamSpacing*Config.NozzlesEveryXBeamSpace))')
-    s.add('NozzlesSpacingRows', '=(BeamsDir>0?Config.Width:Config.Length-WeirDepth)/max(Config.NozzlesRows;1)')
-    s.add('NozzlesSpacingY', '=BeamsDir>0?StandBeamSpacing*Config.NozzlesEveryXBeamSpace:NozzlesSpacingRows')
-    s.add('NozzlesSpacingX', '=BeamsDir>0?NozzlesSpacingRows:StandBeamSpacing*Config.NozzlesEveryXBeamSpace')
-    s.add('NozzlesNumberY', '=BeamsDir>0?NozzlesCount:Config.NozzlesRows')
-    s.add('NozzlesNumberX', '=BeamsDir>0?Config.NozzlesRows:NozzlesCount')
-    s.add('NozzlesBaseX', '=LeftCornerX+(BeamsDir>0?NozzlesSpacingRows:StandBeamSpacing)/2+(BeamsDir>0?0:Config.MetalProfileHeight/2)')
-    s.add('NozzlesBaseY', '=FrontCornerY+(BeamsDir>0?StandBeamSpacing:NozzlesSpacingRows)/2+(BeamsDir>0?Config.MetalProfileHeight/2:0)')
-    s.add('ColumnsSizeHeight', '=UnderGlassBaseLevel-Config.MetalProfileWidth', 'Length of columns')
-    s.add('FlangesNeckHeight', '=Config.SidesGlassThickness+Config.BottomGlassThickness');
-    s.add('FlangesFreeByHeadDrain', '=ConfigPipesDrain.FlangeFreeDiameterTop/2+Config.SidesGlassThickness');
-    s.add('FlangesFreeByPipeDrain', '=ConfigPipesDrain.PipeDiameter/2+Config.MetalProfileHeight');
-    s.add('FlangesFreeByTailDrain', '=ConfigPipesDrain.FlangeFreeDiameterBottom/2');
-    s.add('FlangesFreeByHeadReturn', '=ConfigPipesReturn.FlangeFreeDiameterTop/2+Config.SidesGlassThickness');
-    s.add('FlangesFreeByPipeReturn', '=ConfigPipesReturn.PipeDiameter/2+Config.MetalProfileHeight');
-    s.add('FlangesFreeByTailReturn', '=ConfigPipesReturn.FlangeFreeDiameterBottom/2');
-    s.add('WeirCenter', '=max(FlangesFreeByHeadDrain;FlangesFreeByPipeDrain;FlangesFreeByTailDrain;FlangesFreeByHeadReturn;FlangesFreeByPipeReturn;FlangesFreeByTailReturn)');
-    s.add('FlangesMaxDiameter', '=max(ConfigPipesDrain.FlangeFreeDiameterTop;ConfigPipesDrain.FlangeFreeDiameterBottom;ConfigPipesReturn.FlangeFreeDiameterTop;ConfigPipesReturn.FlangeFreeDiameterBottom)');
-    s.add('WeirDepth', '=2*(WeirCenter)');
-    s.add('FlangesY', '=Config.Length/2-WeirCenter-Config.SidesGlassThickness', 'Center of flanges, Y')
-    s.add('FlangesZ', '=GlassLevel+FlangesNeckHeight', 'Center of flanges, Z')
-    s.add('WeirMargin', '=Config.BraceWidth+Config.SidesGlassThickness')
-    s.add('WeirWidth', '=Config.Width-2*WeirMargin')
-    s.add('WeirInsideWidth', '=WeirWidth-2*Config.SidesGlassThickness')
-    s.add('StartPipes', '=LeftCornerX+(Config.BraceWidth+2*Config.SidesGlassThickness+FlangesMaxDiameter/2)')
-    s.add('BulkHeadSpace', '=WeirInsideWidth/(Config.BulkHeadNumber)')
-    s.add('FlangeCount', '0')
-    s.add('WeirFlangeOffset', '=(WeirInsideWidth-FlangesMaxDiameter)/max(FlangeCount-1;1)')
-    s.add('BeamCanopyFront2BackLength', '=Config.Length-2*Config.CanopyProfileHeight')
-    s.add('BeamCanopyLeft2RightLength', '=Config.Width-2*Config.CanopyProfileWidth')
-    s.add('CanopyPanelLevel', '=Config.StandVisibleHeight+Config.VisibleHeightGlass', 'Level of the canopy')
-    s.add('CanopyPanelHeight', '=Config.CanopyHeight', 'Level of the canopy')
-    s.add('CanopyLevel', '=CanopyPanelLevel+Config.HideExtraTop+2*Config.SidesGlassThickness', 'Level of the canopy')
-    s.add('CanopyBeamsLevel', '=CanopyPanelLevel+Config.CanopyHeight-Config.CanopyBeams2Top', 'Level of the canopy beams')
-    s.add('CanopySpacingX', '=(Config.Width - Config.CanopyProfileHeight) / max(1; Config.CanopyExtraBeams + 1)')
-    s.add('CanopyBeamsX', '=Config.CanopyExtraBeams+2')
-    s.add('CanopyColumnHeight', '=Config.CanopyHeight-Config.HideExtraTop-2*Config.SidesGlassThickness');
+    for name, value, descr in DefaultsComputed():
+        s.add(name, value, descr)
     s.recompute()
 
 
@@ -365,22 +474,74 @@ class Configuration():
             self.defsConfigs[x.type()] = x
         self.categories = categories
         self.configRepository = dict()
+        self.dirty = set()
         self.SetDefaults(doc)
 
-    def SetDefaults(self, doc):
-        for type in self.defsConfigs:
+    def SetDefaults(self, doc, types=None):
+        if types is None:
+            types = self.defsConfigs
+        for type in types:
             c = ConfigRepository(doc, type)
-            for k in self.defsConfigs[type]:
-                c.setdefault(k, self.defsConfigs[type][k].default)
+            defs = self.defsConfigs[type]
+            c.update({k: defs[k].default for k in defs if k not in c})
             self.configRepository[type] = c
-        self.recompute()
+
+    def invalidate(self, type):
+        repo = self.configRepository.get(type)
+        if repo is not None and not repo.writing():
+            self.dirty.add(type)
+
+    def revalidate(self, doc):
+        if len(self.dirty) > 0:
+            self.SetDefaults(doc, list(self.dirty))
+            self.dirty.clear()
+
+    def values(self):
+        return {type: dict(repo) for type, repo in self.configRepository.items()}
 
     def recompute(self):
         for v in self.configRepository.values():
             v.recompute()
 
 
+class ConfigurationObserver():
+    """Drop or invalidate cached configurations when their sheets change outside the repository."""
+
+    def slotChangedObject(self, obj, prop):
+        if prop != 'cells':
+            return
+        conf = _configurations.get(obj.Document.Name)
+        if conf is not None:
+            conf.invalidate(obj.Name)
+
+    def slotDeletedObject(self, obj):
+        conf = _configurations.get(obj.Document.Name)
+        if conf is not None and obj.Name in conf.configRepository:
+            del _configurations[obj.Document.Name]
+
+    def slotDeletedDocument(self, doc):
+        _configurations.pop(doc.Name, None)
+
+
+_configurations = dict()
+_observer = None
+
+
+def _watch_documents():
+    global _observer
+    if _observer is None:
+        import FreeCAD as App
+        _observer = ConfigurationObserver()
+        App.addDocumentObserver(_observer)
+
+
 def GetConfiguration(doc):
-    conf = Configuration(doc)
+    conf = _configurations.get(doc.Name)
+    if conf is None:
+        _watch_documents()
+        conf = Configuration(doc)
+        _configurations[doc.Name] = conf
+    else:
+        conf.revalidate(doc)
     MakeComputed(doc)
     return conf
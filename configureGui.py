@@ -27,8 +27,10 @@ from FreeCAD import Units
 import FreeCAD as App
 import FreeCADGui
 from PySide import QtCore
-from PySide.QtGui import QWidget, QVBoxLayout, QLabel, QDoubleSpinBox, QSpinBox, QCheckBox
-from config import GetConfiguration, ConfigValueBool, ConfigValueNumeric
+from PySide.QtGui import QWidget, QVBoxLayout, QLabel, QDoubleSpinBox, QSpinBox, QCheckBox, QMessageBox
+from config import GetConfiguration, ConfigValueBool, ConfigValueNumeric, document_layout
+from recompute import partial_recompute, touched_objects
+import clearance
 
 
 class Quantity(QWidget):
@@ -114,17 +116,39 @@ class ConfigDialog():
 
     def accept(self):
         updated = []
+        changes = dict()
         for type, name in self.form.variables:
             currVal = self.config.configRepository[type][name]
             newVal = self.form.value(type, name)
             if(currVal != newVal):
-                self.config.configRepository[type][name] = newVal
+                changes.setdefault(type, dict())[name] = newVal
                 updated.append((name, type, currVal, newVal))
                 print(f"Updating {type}:{name} from {currVal} to {newVal}")
+        if len(changes) > 0 and not self.check(changes):
+            return
+        touched = touched_objects(App.ActiveDocument)
+        for type in changes:
+            self.config.configRepository[type].update(changes[type])
         if len(updated) > 0:
-            App.ActiveDocument.recompute()
+            partial_recompute(App.ActiveDocument, [(type, name) for name, type, _, _ in updated], touched)
         FreeCADGui.Control.closeDialog()
 
+    def check(self, changes):
+        values = self.config.values()
+        for type in changes:
+            values[type].update(changes[type])
+        # The flanges already built, the default layout is what a new one would get
+        layout = document_layout(App.ActiveDocument)
+        clashes = clearance.check(values, flanges=None if layout is None else [type for type, level in layout])
+        for c in clashes:
+            print(f"{c.severity}: {c.message}")
+        errors = clearance.errors(clashes)
+        if len(errors) == 0:
+            return True
+        text = '\n'.join([c.message for c in errors])
+        answer = QMessageBox.warning(None, 'Inconsistent configuration', f'{text}\n\nApply anyway?', QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        return answer == QMessageBox.Yes
+
     def reject(self):
         print("Cancel")
         FreeCADGui.Control.closeDialog()
@@ -0,0 +1,221 @@
+#****************************************************************************
+# *                                                                          *
+# *   Aquarium                                                               *
+# *   Copyright (c) 2023 LGPL                                                *
+# *                                                                          *
+# *   This program is free software; you can redistribute it and/or modify   *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)     *
+# *   as published by the Free Software Foundation; either version 2 of      *
+# *   the License, or (at your option) any later version.                    *
+# *   for detail see the LICENCE text file.                                  *
+# *                                                                          *
+# *   This program is distributed in the hope that it will be useful,        *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+# *   GNU Library General Public License for more details.                   *
+# *                                                                          *
+# *   You should have received a copy of the GNU Library General Public      *
+# *   License along with this program; if not, write to the Free Software    *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+# *   USA                                                                    *
+# *                                                                          *
+#****************************************************************************
+
+# Cutting plan of the metal profiles: the pieces of the bill of materials are
+# packed into stock bars (1D bin packing), each cut losing the saw kerf.
+#
+#   python3 cutting.py tank.json --stock 6000 --kerf 3 --tanks 4
+#
+# Best fit decreasing is used for large lists, an exact branch and bound for
+# small ones (or when it finishes within its node budget).
+import argparse
+import json
+import sys
+from bisect import bisect_left, insort
+from collections import namedtuple
+from math import ceil
+from config import load_config
+import bom
+
+Bar = namedtuple('Bar', ['pieces', 'used', 'waste'])
+Plan = namedtuple('Plan', ['material', 'stock', 'kerf', 'bars', 'exact'])
+
+PROFILES = ('RHS', 'REC')
+EXACT_PIECES = 20
+EXACT_NODES = 200000
+
+
+def profile_pieces(rows, tanks=1):
+    """{material: [(name, length)]} of the profile items, repeated for the given number of tanks."""
+    pieces = dict()
+    for i in rows:
+        if i.material.split(' ')[0] in PROFILES:
+            pieces.setdefault(i.material, []).extend([(i.name, i.length)] * (i.quantity * tanks))
+    return pieces
+
+
+def _check(pieces, stock):
+    for name, length in pieces:
+        if length > stock:
+            raise ValueError(f'{name} of {length:g} longer than the {stock:g} bars')
+
+
+def _bars(bins, stock, kerf):
+    # A bar of k pieces loses k-1 kerfs, the last piece takes the end of the bar
+    bars = []
+    for b in bins:
+        used = sum([l for _, l in b]) + kerf * (len(b) - 1)
+        bars.append(Bar(b, used, stock - used))
+    return bars
+
+
+def first_fit_decreasing(pieces, stock, kerf=0):
+    _check(pieces, stock)
+    bins = []
+    free = []
+    for name, length in sorted(pieces, key=lambda p: -p[1]):
+        need = length + kerf
+        for i in range(len(bins)):
+            if free[i] >= need:
+                bins[i].append((name, length))
+                free[i] -= need
+                break
+        else:
+            bins.append([(name, length)])
+            free.append(stock + kerf - need)
+    return _bars(bins, stock, kerf)
+
+
+def best_fit_decreasing(pieces, stock, kerf=0):
+    """Each piece, longest first, goes to the bar it leaves the shortest offcut, O(n log n)."""
+    _check(pieces, stock)
+    bins = []
+    # (free length, bar index) sorted, capacity counts one kerf per piece
+    free = []
+    for name, length in sorted(pieces, key=lambda p: -p[1]):
+        need = length + kerf
+        k = bisect_left(free, (need - 1e-9, -1))
+        if k < len(free):
+            room, index = free.pop(k)
+            bins[index].append((name, length))
+            insort(free, (room - need, index))
+        else:
+            bins.append([(name, length)])
+            insort(free, (stock + kerf - need, len(bins) - 1))
+    return _bars(bins, stock, kerf)
+
+
+def lower_bound(pieces, stock, kerf=0):
+    return ceil(sum([l + kerf for _, l in pieces]) / (stock + kerf) - 1e-9)
+
+
+def exact(pieces, stock, kerf=0, nodes=EXACT_NODES):
+    """Fewest bars by branch and bound, (bars, proven) with proven False when the node budget ran out."""
+    best = best_fit_decreasing(pieces, stock, kerf)
+    bound = lower_bound(pieces, stock, kerf)
+    if len(best) <= bound:
+        return best, True
+    order = sorted(pieces, key=lambda p: -p[1])
+    needs = [l + kerf for _, l in order]
+    capacity = stock + kerf
+    best_count = len(best)
+    best_assign = None
+    assign = [0] * len(order)
+    free = []
+    budget = [nodes]
+
+    def search(i):
+        nonlocal best_count, best_assign
+        if budget[0] <= 0:
+            return
+        budget[0] -= 1
+        if i == len(order):
+            best_count = len(free)
+            best_assign = list(assign)
+            return
+        # Remaining pieces need at least this many more bars
+        rest = sum(needs[i:]) - sum(free)
+        if len(free) + max(0, ceil(rest / capacity - 1e-9)) >= best_count:
+            return
+        tried = set()
+        for b in range(len(free)):
+            # Bars with the same free length are interchangeable
+            if free[b] >= needs[i] - 1e-9 and free[b] not in tried:
+                tried.add(free[b])
+                free[b] -= needs[i]
+                assign[i] = b
+                search(i + 1)
+                free[b] += needs[i]
+                if best_count <= bound:
+                    return
+        if len(free) + 1 < best_count:
+            free.append(capacity - needs[i])
+            assign[i] = len(free) - 1
+            search(i + 1)
+            free.pop()
+
+    search(0)
+    if best_assign is None:
+        return best, budget[0] > 0
+    bins = [[] for _ in range(best_count)]
+    for piece, b in zip(order, best_assign):
+        bins[b].append(piece)
+    return _bars(bins, stock, kerf), budget[0] > 0
+
+
+def cutting_plan(rows, stock=6000, kerf=3, tanks=1, method='auto'):
+    """Plan of every profile material of the bill of materials rows.
+
+    method is 'ffd', 'bfd', 'exact', or 'auto' for exact up to EXACT_PIECES pieces."""
+    plans = []
+    for material, pieces in profile_pieces(rows, tanks).items():
+        proven = False
+        if method == 'exact' or (method == 'auto' and len(pieces) <= EXACT_PIECES):
+            bars, proven = exact(pieces, stock, kerf)
+        elif method == 'ffd':
+            bars = first_fit_decreasing(pieces, stock, kerf)
+        else:
+            bars = best_fit_decreasing(pieces, stock, kerf)
+        if not proven:
+            proven = len(bars) <= lower_bound(pieces, stock, kerf)
+        bars.sort(key=lambda b: b.waste)
+        plans.append(Plan(material, stock, kerf, bars, proven))
+    return plans
+
+
+def report(plans):
+    lines = []
+    for p in plans:
+        waste = sum([b.waste for b in p.bars])
+        used = sum([b.used for b in p.bars])
+        optimal = ', optimal' if p.exact else ''
+        lines.append(f"{p.material}: {len(p.bars)} bars of {p.stock:g}, {waste:g} waste ({100 * used / (len(p.bars) * p.stock):.1f}% used{optimal})")
+        for i, b in enumerate(p.bars):
+            cuts = ' + '.join([f'{l:g} {n}' for n, l in b.pieces])
+            lines.append(f"  {i + 1:>3}: {cuts} | {b.waste:g} left")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='cutting', description='Cutting plan of the metal profiles')
+    parser.add_argument('configs', nargs='*', help='JSON or TOML configurations, one per tank model')
+    parser.add_argument('--stock', type=float, default=6000, help='Length of the stock bars')
+    parser.add_argument('--kerf', type=float, default=3, help='Width of the saw cut')
+    parser.add_argument('--tanks', type=int, default=1, help='Tanks built of each configuration')
+    parser.add_argument('--method', choices=('auto', 'ffd', 'bfd', 'exact'), default='auto')
+    parser.add_argument('--format', choices=('text', 'json'), default='text')
+    args = parser.parse_args(argv)
+    rows = []
+    for path in args.configs or [None]:
+        rows.extend(bom.items(load_config(path) if path else dict()))
+    plans = cutting_plan(rows, args.stock, args.kerf, args.tanks, args.method)
+    if args.format == 'json':
+        json.dump([{'material': p.material, 'stock': p.stock, 'kerf': p.kerf, 'optimal': p.exact,
+                    'bars': [{'pieces': b.pieces, 'waste': b.waste} for b in p.bars]} for p in plans], sys.stdout, indent=1)
+    else:
+        print(report(plans))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
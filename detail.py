@@ -0,0 +1,61 @@
+#****************************************************************************
+# *                                                                          *
+# *   Aquarium                                                               *
+# *   Copyright (c) 2023 LGPL                                                *
+# *                                                                          *
+# *   This program is free software; you can redistribute it and/or modify   *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)     *
+# *   as published by the Free Software Foundation; either version 2 of      *
+# *   the License, or (at your option) any later version.                    *
+# *   for detail see the LICENCE text file.                                  *
+# *                                                                          *
+# *   This program is distributed in the hope that it will be useful,        *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+# *   GNU Library General Public License for more details.                   *
+# *                                                                          *
+# *   You should have received a copy of the GNU Library General Public      *
+# *   License along with this program; if not, write to the Free Software    *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+# *   USA                                                                    *
+# *                                                                          *
+#****************************************************************************
+
+# Level of detail of the expensive features: weir slots and drilled panels.
+# Config.DetailLevel 0 shows the plain plates, 1 builds every slot and hole.
+# Switching only recomputes the objects bound to it, the tree is left alone.
+from config import GetConfiguration
+from recompute import partial_recompute, touched_objects
+
+PREVIEW = 0
+FULL = 1
+
+
+def add_detail_property(obj):
+    obj.addProperty('App::PropertyBool', 'Detail', 'Detail', 'Build the holes, plain shape otherwise')
+    obj.Detail = True
+    obj.setExpression('Detail', 'Config.DetailLevel > 0')
+
+
+def detail_level(doc):
+    """Read the level straight from the sheet, without building the Configuration."""
+    sheet = getattr(doc, 'Config', None)
+    if sheet is None:
+        return FULL
+    try:
+        return int(sheet.get('DetailLevel'))
+    except (ValueError, TypeError):
+        return FULL
+
+
+def set_detail(doc, level):
+    """Switch the document level of detail, recomputing only what depends on it."""
+    if detail_level(doc) == level:
+        return None
+    touched = touched_objects(doc)
+    GetConfiguration(doc).configRepository['Config'].update({'DetailLevel': level})
+    return partial_recompute(doc, [('Config', 'DetailLevel')], touched)
+
+
+def full_detail(doc):
+    return set_detail(doc, FULL)
@@ -0,0 +1,158 @@
+#****************************************************************************
+# *                                                                          *
+# *   Aquarium                                                               *
+# *   Copyright (c) 2023 LGPL                                                *
+# *                                                                          *
+# *   This program is free software; you can redistribute it and/or modify   *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)     *
+# *   as published by the Free Software Foundation; either version 2 of      *
+# *   the License, or (at your option) any later version.                    *
+# *   for detail see the LICENCE text file.                                  *
+# *                                                                          *
+# *   This program is distributed in the hope that it will be useful,        *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+# *   GNU Library General Public License for more details.                   *
+# *                                                                          *
+# *   You should have received a copy of the GNU Library General Public      *
+# *   License along with this program; if not, write to the Free Software    *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+# *   USA                                                                    *
+# *                                                                          *
+#****************************************************************************
+
+# Generates an aquarium without the GUI, for FreeCADCmd on build servers:
+#
+#   FreeCADCmd -c "import generate; generate.main(['tank.json', '-o', 'tank.FCStd', '--step', 'tank.step'])"
+#   PYTHONPATH=/usr/lib/freecad/lib python3 generate.py tank.toml -o tank.FCStd
+#
+# The configuration maps sheets to values, {"Config": {"Width": 1500}}, keys
+# outside a sheet go to Config. Nothing here imports Qt or FreeCADGui.
+import argparse
+import importlib
+import json
+import os
+import sys
+import FreeCAD as App
+from config import GetConfiguration, InvalidConfigException, load_config
+
+# Name of the generated object, module and function creating it, in build order
+PIPELINE = [
+    ('StandStructure', 'structure', 'makeStandStructure'),
+    ('StandPanels', 'panelsdoors', 'make_stand_cover'),
+    ('LevelingBase', 'base', 'make_leveling_base'),
+    ('Glasses', 'glass', 'make_glass'),
+    ('Weir', 'weir', 'create_weir'),
+    ('Flanges', 'pipes', 'make_flanges'),
+    ('Pipes', 'pipes', 'make_pipes'),
+    ('ClosedLoop', 'pipes', 'make_nozzles'),
+    ('CanopyStructure', 'canopy', 'make_canopy'),
+    ('CanopyPanels', 'panelsdoors', 'make_canopy_cover'),
+    ]
+
+
+def step_function(step):
+    name, module, function = step
+    return getattr(importlib.import_module(module), function)
+
+
+def apply_config(doc, values):
+    conf = GetConfiguration(doc)
+    for type, v in values.items():
+        if type not in conf.configRepository:
+            raise InvalidConfigException(f'Unknown sheet {type}')
+        for name in v:
+            if name not in conf.defsConfigs[type]:
+                raise InvalidConfigException(f'Unknown parameter {type}.{name}')
+        conf.configRepository[type].update(v)
+    return conf
+
+
+def generate(doc, values=None, steps=None):
+    """Run the pipeline on doc, skipping the objects already there. Returns the created objects."""
+    apply_config(doc, values or dict())
+    created = []
+    for step in PIPELINE:
+        if steps is not None and step[0] not in steps:
+            continue
+        if doc.getObject(step[0]) is None:
+            created.append(step_function(step)(doc))
+    doc.recompute()
+    invalid = [o.Name for o in doc.Objects if 'Invalid' in o.State]
+    if invalid:
+        raise RuntimeError('Recompute failed for ' + ', '.join(invalid))
+    return created
+
+
+def export_step(doc, path):
+    import Import
+    from utils import PROTOTYPES
+    objs = [o for o in doc.RootObjects if (hasattr(o, 'Shape') or o.hasExtension('App::GroupExtension')) and o.Name != PROTOTYPES]
+    Import.export(objs, path)
+
+
+def _consumed(obj):
+    # Used as base, tool, array source or link target by another shape
+    return any(p.isDerivedFrom('Part::Feature') or p.isDerivedFrom('App::Link') for p in obj.InList)
+
+
+def measured_bom(doc):
+    """One row per final part of the document, sizes and volume measured on the shapes."""
+    import Part
+    rows = []
+    for o in doc.Objects:
+        if not (o.isDerivedFrom('Part::Feature') or o.isDerivedFrom('App::Link')):
+            continue
+        part = o.getParentGeoFeatureGroup()
+        if _consumed(o) or (part is not None and _consumed(part)):
+            continue
+        shape = Part.getShape(o)
+        if shape.isNull():
+            continue
+        box = shape.BoundBox
+        rows.append({
+            'name': o.Name,
+            'label': o.Label,
+            'type': o.TypeId,
+            'size': sorted([round(box.XLength, 3), round(box.YLength, 3), round(box.ZLength, 3)], reverse=True),
+            'volume': round(shape.Volume, 3),
+            'solids': len(shape.Solids),
+            })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='generate', description='Generate an aquarium without the GUI')
+    parser.add_argument('config', nargs='?', help='JSON or TOML configuration')
+    parser.add_argument('-d', '--document', help='FCStd document to open instead of a new one')
+    parser.add_argument('-o', '--output', help='FCStd file to save')
+    parser.add_argument('--step', help='STEP file to export')
+    parser.add_argument('--bom', help='JSON file with the measured bill of materials')
+    parser.add_argument('--profile', help='JSONL trace of the recompute time of every object, a report is printed')
+    parser.add_argument('--only', help='Comma separated objects to generate: ' + ', '.join([s[0] for s in PIPELINE]))
+    args = parser.parse_args(argv)
+    if args.document:
+        doc = App.openDocument(args.document)
+    else:
+        doc = App.newDocument('Aquarium')
+    values = load_config(args.config) if args.config else dict()
+    steps = set(args.only.split(',')) if args.only else None
+    if args.profile:
+        from profiler import RecomputeProfiler
+        with RecomputeProfiler(args.profile) as profiler:
+            generate(doc, values, steps)
+        print(profiler.report())
+    else:
+        generate(doc, values, steps)
+    if args.output:
+        doc.saveAs(os.path.abspath(args.output))
+    if args.step:
+        export_step(doc, os.path.abspath(args.step))
+    if args.bom:
+        with open(args.bom, 'w') as f:
+            json.dump(measured_bom(doc), f, indent=1)
+    return doc
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
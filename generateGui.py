@@ -26,16 +26,37 @@ from PySide import QtCore
 from PySide import QtGui
 from FreeCAD import Units
 import FreeCAD as App
-from collections import namedtuple
-from structure import makeStandStructure
-from panelsdoors import make_stand_cover, make_canopy_cover
-from canopy import make_canopy
-from pipes import make_pipes, make_nozzles, make_flanges
-from glass import make_glass
-from base import make_leveling_base
-from weir import create_weir
+import importlib
+import time
+from generate import PIPELINE
 from config import GetConfiguration
-import techdraw
+from detail import set_detail, detail_level, PREVIEW, FULL
+
+# Seconds spent importing each generator module, filled on first use
+import_times = dict()
+
+
+def timed_import(module):
+    if module not in import_times:
+        start = time.perf_counter()
+        importlib.import_module(module)
+        import_times[module] = time.perf_counter() - start
+        App.Console.PrintLog(f"Aquarium: imported {module} in {import_times[module]:.3f}s\n")
+    return importlib.import_module(module)
+
+
+class Lazy:
+    """Generator function of a module only imported when the command runs.
+
+    The generator modules pull Arch, Draft and Sketcher, registering the
+    commands must not load them."""
+
+    def __init__(self, module, function):
+        self.module = module
+        self.function = function
+
+    def __call__(self, *args, **kwargs):
+        return getattr(timed_import(self.module), self.function)(*args, **kwargs)
 
 class Generate:
     """Explanation of the command."""
@@ -98,20 +119,89 @@ class Generate:
         """Return True when the command should be active or False when it should be disabled (greyed)."""
         return App.ActiveDocument != None and self.MissingObject()
 
+class SetDetail:
+    """Switch the level of detail of the weir and drilled panels."""
+
+    def __init__(self, name, caption, descr, level):
+        self.name = name
+        self.caption = caption
+        self.descr = descr
+        self.level = level
+
+    def GetResources(self):
+        return {
+                'MenuText': QtCore.QT_TRANSLATE_NOOP(self.name, self.caption),
+                'ToolTip': QtCore.QT_TRANSLATE_NOOP(self.name, self.descr)
+                }
+
+    def Activated(self):
+        set_detail(App.ActiveDocument, self.level)
+
+    def IsActive(self):
+        doc = App.ActiveDocument
+        return doc != None and doc.getObject('Config') != None and detail_level(doc) != self.level
+
+class Profile:
+    """Recompute the whole document and report the time spent in each group."""
+
+    def GetResources(self):
+        return {
+                'MenuText': QtCore.QT_TRANSLATE_NOOP("ProfileRecompute", "Profile Recompute"),
+                'ToolTip': QtCore.QT_TRANSLATE_NOOP("ProfileRecompute", "Recompute everything and report the time per group and object")
+                }
+
+    def Activated(self):
+        from profiler import profile_recompute
+        doc = App.ActiveDocument
+        trace = doc.FileName + '.profile.jsonl' if doc.FileName else None
+        profiler = profile_recompute(doc, trace)
+        App.Console.PrintMessage(profiler.report() + '\n')
+        if trace:
+            App.Console.PrintMessage(f"Trace written to {trace}\n")
+
+    def IsActive(self):
+        return App.ActiveDocument != None
+
+class ExportBluePrints:
+    """Export every blue print page to SVG, DXF and PDF in a chosen folder."""
+
+    def GetResources(self):
+        return {
+                'MenuText': QtCore.QT_TRANSLATE_NOOP("ExportBluePrints", "Export BluePrints"),
+                'ToolTip': QtCore.QT_TRANSLATE_NOOP("ExportBluePrints", "Export the blue print pages, SVG and DXF in parallel background processes")
+                }
+
+    def Activated(self):
+        folder = QtGui.QFileDialog.getExistingDirectory(FreeCADGui.getMainWindow(), "Export BluePrints")
+        if not folder:
+            return
+        techdraw = timed_import('techdraw')
+        doc = App.ActiveDocument
+        techdraw.export_pages(doc, folder)
+        techdraw.export_pdf(doc, folder)
+
+    def IsActive(self):
+        return App.ActiveDocument != None and len(App.ActiveDocument.findObjects('TechDraw::DrawPage')) > 0
+
+class UpdateBluePrints:
+    """Recompute the model and the blue prints, reporting the projection cache use."""
+
+    def GetResources(self):
+        return {
+                'MenuText': QtCore.QT_TRANSLATE_NOOP("UpdateBluePrints", "Update BluePrints"),
+                'ToolTip': QtCore.QT_TRANSLATE_NOOP("UpdateBluePrints", "Recompute, the hidden line views reuse the cached projections of unchanged sources")
+                }
+
+    def Activated(self):
+        projcache = timed_import('projcache')
+        projcache.recompute(App.ActiveDocument)
+
+    def IsActive(self):
+        return App.ActiveDocument != None and len(App.ActiveDocument.findObjects('TechDraw::DrawPage')) > 0
+
 def RegisterCommands():
 
-    objs = [
-        ('StandStructure', makeStandStructure),
-        ('StandPanels', make_stand_cover),
-        ('LevelingBase', make_leveling_base),
-        ('Glasses', make_glass),
-        ('Weir', create_weir),
-        ('Flanges', make_flanges),
-        ('Pipes', make_pipes),
-        ('ClosedLoop', make_nozzles),
-        ('CanopyStructure', make_canopy),
-        ('CanopyPanels',  make_canopy_cover),
-        ]
+    objs = [(name, Lazy(module, function)) for name, module, function in PIPELINE]
     FreeCADGui.addCommand("GenerateAll",            Generate("GenerateAll",         "Everything",      "Generate everything",                     objs))
     FreeCADGui.addCommand("GenerateStructure",      Generate("GenerateStructure",   "Structure",       "Generate the Sump Structure",             objs[0]))
     FreeCADGui.addCommand("GenerateStructurePanels",Generate("GeneratePanels",      "Structure Panels","Generate Sump Panels and Doors",          objs[1]))
@@ -122,15 +212,23 @@ def RegisterCommands():
     FreeCADGui.addCommand("GenerateClosedLoop",     Generate("GenerateClosedLoop",  "ClosedLoop",      "Generate the ClosedLoop",                 objs[7]))
     FreeCADGui.addCommand("GenerateCanopy",         Generate("GenerateCanopy",      "Canopy",          "Generate the Canopy",                     objs[8]))
     FreeCADGui.addCommand("GenerateCanopyPanels",   Generate("GenerateCanopyPanels","Canopy Panels",   "Generate the Canopy Panels",              objs[9]))
+    FreeCADGui.addCommand("PreviewDetail",          SetDetail("PreviewDetail",      "Preview Detail",  "Show plain weir and panels, without slots and holes", PREVIEW))
+    FreeCADGui.addCommand("FullDetail",             SetDetail("FullDetail",         "Full Detail",     "Cut every slot and hole",                 FULL))
+    FreeCADGui.addCommand("ProfileRecompute",       Profile())
     tech_draw = [
-        ('BaseBluePrint',                   techdraw.draw_structure),
-        ('LevelingBaseBluePrint',           techdraw.draw_base),
-        ('GlassPanelBaseBluePrint',         techdraw.draw_bottom_glass),
-        ('GlassPanelsSidesBluePrint',       techdraw.draw_side_glass),
-        ('GlassEuroBraceWeirBaseBluePrint', techdraw.draw_braces_base),
-        ('GlassEuroBraceSuperiorBluePrint', techdraw.draw_braces_top),
-        ('GlassEuroBraceInferiorBluePrint', techdraw.draw_braces_bottom),
+        ('BaseBluePrint',                   Lazy('techdraw', 'draw_structure')),
+        ('LevelingBaseBluePrint',           Lazy('techdraw', 'draw_base')),
+        ('GlassPanelBaseBluePrint',         Lazy('techdraw', 'draw_bottom_glass')),
+        ('GlassPanelsSidesBluePrint',       Lazy('techdraw', 'draw_side_glass')),
+        ('GlassEuroBraceWeirBaseBluePrint', Lazy('techdraw', 'draw_braces_base')),
+        ('GlassEuroBraceSuperiorBluePrint', Lazy('techdraw', 'draw_braces_top')),
+        ('GlassEuroBraceInferiorBluePrint', Lazy('techdraw', 'draw_braces_bottom')),
         ]
+    # Active while any page is missing, draw_all adds all of them at once
+    all_blue_prints = [(tech_draw[0][0], Lazy('techdraw', 'draw_all'))] + [(name, None) for name, _ in tech_draw[1:]]
+    FreeCADGui.addCommand("GenerateAllBluePrints",                  Generate("GenerateAllBluePrints",                  "All BluePrints",                 "Generate every BluePrint with a single recompute", all_blue_prints))
+    FreeCADGui.addCommand("UpdateBluePrints",                       UpdateBluePrints())
+    FreeCADGui.addCommand("ExportBluePrints",                       ExportBluePrints())
     FreeCADGui.addCommand("GenerateBaseBluePrint",                  Generate("GenerateBaseBluePrint",                  "BaseBluePrint",                  "Generate BaseBluePrint",                  tech_draw[0]))
     FreeCADGui.addCommand("GenerateLevelingBaseBluePrint",          Generate("GenerateLevelingBaseBluePrint",          "LevelingBaseBluePrint",          "Generate LevelingBaseBluePrint",          tech_draw[1]))
     FreeCADGui.addCommand("GenerateGlassPanelBaseBluePrint",        Generate("GenerateGlassPanelBaseBluePrint",        "GlassPanelBaseBluePrint",        "Generate GlassPanelBaseBluePrint",        tech_draw[2]))
@@ -152,9 +250,15 @@ def AllCommands():
         "GenerateClosedLoop",
         "GenerateCanopy",
         "GenerateCanopyPanels",
+        "PreviewDetail",
+        "FullDetail",
+        "ProfileRecompute",
     ]
 def AllBluePrintCommands():
     return [
+        "GenerateAllBluePrints",
+        "UpdateBluePrints",
+        "ExportBluePrints",
         "GenerateBaseBluePrint",                  
         "GenerateLevelingBaseBluePrint",                  
         "GenerateGlassPanelBaseBluePrint",        
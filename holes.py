@@ -21,12 +21,118 @@
 #*                                                                          *
 #****************************************************************************
 
+from FreeCAD import Vector
+import Part
+import FreeCAD as App
+from detail import add_detail_property
+
+# Dynamic properties of one grid of holes in a HoleSet, suffixed by its index
+GRID = [
+    ('X', 'App::PropertyDistance', 'Center of the first hole, X'),
+    ('Y', 'App::PropertyDistance', 'Center of the first hole, Y'),
+    ('Radius', 'App::PropertyLength', 'Radius of the holes'),
+    ('NumberX', 'App::PropertyInteger', 'Number of holes along X'),
+    ('NumberY', 'App::PropertyInteger', 'Number of holes along Y'),
+    ('SpacingX', 'App::PropertyDistance', 'Distance between holes along X'),
+    ('SpacingY', 'App::PropertyDistance', 'Distance between holes along Y'),
+]
+
+
+class HoleSet():
+    """Hole centers and radii as plain data, each grid bound to the configuration by expressions."""
+
+    def __init__(self, obj):
+        obj.addProperty('App::PropertyInteger', 'Grids', 'Holes', 'Number of hole grids')
+        obj.setEditorMode('Grids', 1)
+        obj.Proxy = self
+
+    def execute(self, obj):
+        return
+
+    def __getstate__(self):
+        return None
+
+    def __setstate__(self, state):
+        return None
+
+
+def add_holes(holes, x, y, radius, nx='1', ny='1', dx='0', dy='0'):
+    """Add a grid of holes to a HoleSet, every argument is an expression. Returns the grid name."""
+    index = holes.Grids
+    group = f'Hole{index}'
+    for (name, type, descr), expr in zip(GRID, [x, y, radius, nx, ny, dx, dy]):
+        holes.addProperty(type, f'{name}{index}', group, descr)
+        holes.setExpression(f'{name}{index}', expr)
+    holes.Grids = index + 1
+    return group
+
+
+def circles(holes):
+    """(x, y, radius) of every hole of a HoleSet."""
+    result = []
+    for index in range(holes.Grids):
+        def value(name):
+            v = getattr(holes, f'{name}{index}')
+            return getattr(v, 'Value', v)
+        x, y, r = value('X'), value('Y'), value('Radius')
+        for i in range(value('NumberX')):
+            for j in range(value('NumberY')):
+                result.append((x + i * value('SpacingX'), y + j * value('SpacingY'), r))
+    return result
+
+
+def drilled_plate(box, holes):
+    """Box drilled through along Z: one face with circular inner wires, extruded once."""
+    z = box.ZMin
+    outer = Part.makePolygon([Vector(box.XMin, box.YMin, z), Vector(box.XMax, box.YMin, z), Vector(box.XMax, box.YMax, z), Vector(box.XMin, box.YMax, z), Vector(box.XMin, box.YMin, z)])
+    wires = [Part.Wire(Part.Circle(Vector(x, y, z), Vector(0, 0, 1), r).toShape()) for x, y, r in holes]
+    inside = all(box.XMin < x - r and x + r < box.XMax and box.YMin < y - r and y + r < box.YMax for x, y, r in holes)
+    apart = all((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 > (a[2] + b[2]) ** 2 for i, a in enumerate(holes) for b in holes[i + 1:])
+    if inside and apart:
+        face = Part.Face([outer] + wires, 'Part::FaceMakerBullseye')
+    else:
+        # Holes touching each other or the border, still a planar boolean
+        face = Part.Face(outer)
+        if len(wires) > 0:
+            face = face.cut(Part.makeCompound([Part.Face(w) for w in wires]))
+    return face.extrude(Vector(0, 0, box.ZLength))
+
+
+class DrilledPanel():
+    """Panel drilled vertically by every hole of a HoleSet, in a single pass."""
+
+    def __init__(self, obj):
+        obj.addProperty('App::PropertyLink', 'Base', 'Drill', 'Panel to drill')
+        obj.addProperty('App::PropertyLink', 'Holes', 'Drill', 'HoleSet with the holes')
+        add_detail_property(obj)
+        obj.Proxy = self
+
+    def execute(self, obj):
+        box = Part.getShape(obj.Base).BoundBox
+        obj.Shape = drilled_plate(box, circles(obj.Holes) if obj.Detail else [])
+
+    def __getstate__(self):
+        return None
+
+    def __setstate__(self, state):
+        return None
+
+
+def make_drilled_panel(doc, name, base, holes):
+    obj = doc.addObject('Part::FeaturePython', name)
+    DrilledPanel(obj)
+    obj.Base = base
+    obj.Holes = holes
+    if App.GuiUp:
+        obj.ViewObject.Proxy = 0
+        base.ViewObject.Visibility = False
+    return obj
+
+
 def getHole(doc, type):
     name=f'Holes{type}'
     o = doc.getObject(name)
     if o == None:
-        o = doc.addObject('App::Part', name)
-        o.setExpression('.Placement.Base.z', '0 mm')
-        o.Group = doc.addObject("Part::Box","MockHole")
-        o.Visibility = False
+        o = doc.addObject('App::FeaturePython', name)
+        HoleSet(o)
     return o
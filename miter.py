@@ -0,0 +1,103 @@
+#****************************************************************************
+# *                                                                          *
+# *   Aquarium                                                               *
+# *   Copyright (c) 2023 LGPL                                                *
+# *                                                                          *
+# *   This program is free software; you can redistribute it and/or modify   *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)     *
+# *   as published by the Free Software Foundation; either version 2 of      *
+# *   the License, or (at your option) any later version.                    *
+# *   for detail see the LICENCE text file.                                  *
+# *                                                                          *
+# *   This program is distributed in the hope that it will be useful,        *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+# *   GNU Library General Public License for more details.                   *
+# *                                                                          *
+# *   You should have received a copy of the GNU Library General Public      *
+# *   License along with this program; if not, write to the Free Software    *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+# *   USA                                                                    *
+# *                                                                          *
+#****************************************************************************
+
+from math import tan, radians
+from FreeCAD import Vector
+import Part
+import FreeCAD as App
+
+
+def mitered_bar(length, width, height, thickness=0, angle=45, outside='Front'):
+    # Bar along X, both ends cut at angle across Y, the outside face (y=0 for Front,
+    # y=width for Back) keeps the full length. Built face by face, no boolean.
+    slope = tan(radians(angle))
+    if 2 * width * slope >= length:
+        raise ValueError(f'bar of length {length} too short for a {angle} degrees miter on {width}')
+
+    def rectangle(y0, z0, y1, z1):
+        return [(y0, z0), (y1, z0), (y1, z1), (y0, z1)]
+
+    def inset(y):
+        return (y if outside == 'Front' else width - y) * slope
+
+    loops = [rectangle(0, 0, width, height)]
+    if thickness > 0:
+        loops.append(rectangle(thickness, thickness, width - thickness, height - thickness))
+    faces = []
+    start_wires = []
+    end_wires = []
+    for corners in loops:
+        start = [Vector(inset(y), y, z) for y, z in corners]
+        end = [Vector(length - inset(y), y, z) for y, z in corners]
+        for i in range(len(corners)):
+            j = (i + 1) % len(corners)
+            faces.append(Part.Face(Part.makePolygon([start[i], start[j], end[j], end[i], start[i]])))
+        start_wires.append(Part.makePolygon(start + [start[0]]))
+        end_wires.append(Part.makePolygon(end + [end[0]]))
+    faces.append(Part.Face(start_wires, 'Part::FaceMakerBullseye'))
+    faces.append(Part.Face(end_wires, 'Part::FaceMakerBullseye'))
+    shell = Part.Shell(faces)
+    shell.sewShape()
+    solid = Part.Solid(shell)
+    if solid.Volume < 0:
+        solid.reverse()
+    return solid
+
+
+class MiterBar():
+    """Rectangular bar or tube with 45 degrees (or Angle) ends, used for framed corners."""
+
+    def __init__(self, obj):
+        obj.addProperty('App::PropertyLength', 'Length', 'MiterBar', 'Length of the outside face')
+        obj.addProperty('App::PropertyLength', 'Width', 'MiterBar', 'Size across the miter (local Y)')
+        obj.addProperty('App::PropertyLength', 'Height', 'MiterBar', 'Size along local Z')
+        obj.addProperty('App::PropertyLength', 'Thickness', 'MiterBar', 'Wall thickness, zero for a solid bar')
+        obj.addProperty('App::PropertyAngle', 'Angle', 'MiterBar', 'Angle of the end cuts')
+        obj.addProperty('App::PropertyEnumeration', 'Outside', 'MiterBar', 'Face that keeps the full length')
+        obj.Outside = ['Front', 'Back']
+        obj.Angle = 45
+        obj.Proxy = self
+
+    def execute(self, obj):
+        placement = obj.Placement
+        obj.Shape = mitered_bar(obj.Length.Value, obj.Width.Value, obj.Height.Value, obj.Thickness.Value, obj.Angle.Value, obj.Outside)
+        obj.Placement = placement
+
+    def __getstate__(self):
+        return None
+
+    def __setstate__(self, state):
+        return None
+
+
+def make_miter_bar(doc, name, width, height, thickness=None, outside='Front'):
+    obj = doc.addObject('Part::FeaturePython', name)
+    MiterBar(obj)
+    if App.GuiUp:
+        obj.ViewObject.Proxy = 0
+    obj.Outside = outside
+    obj.setExpression('Width', width)
+    obj.setExpression('Height', height)
+    if thickness is not None:
+        obj.setExpression('Thickness', thickness)
+    return obj
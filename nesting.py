@@ -0,0 +1,219 @@
+#****************************************************************************
+# *                                                                          *
+# *   Aquarium                                                               *
+# *   Copyright (c) 2023 LGPL                                                *
+# *                                                                          *
+# *   This program is free software; you can redistribute it and/or modify   *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)     *
+# *   as published by the Free Software Foundation; either version 2 of      *
+# *   the License, or (at your option) any later version.                    *
+# *   for detail see the LICENCE text file.                                  *
+# *                                                                          *
+# *   This program is distributed in the hope that it will be useful,        *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+# *   GNU Library General Public License for more details.                   *
+# *                                                                          *
+# *   You should have received a copy of the GNU Library General Public      *
+# *   License along with this program; if not, write to the Free Software    *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+# *   USA                                                                    *
+# *                                                                          *
+#****************************************************************************
+
+# Sheet layouts of the glass and board parts: the rectangles of the bill of
+# materials are nested into stock sheets, one material and thickness at a time.
+#
+#   python3 nesting.py tank.json --tanks 4 --glass 3210x2250 --board 2440x1220
+#
+# Two placement rules: guillotine (every cut goes through the whole piece left,
+# as glass is scored and snapped) and maxrects (tighter, for routed boards).
+import argparse
+import json
+import sys
+from collections import namedtuple
+from config import load_config
+import bom
+
+Placed = namedtuple('Placed', ['name', 'x', 'y', 'length', 'width', 'rotated'])
+Sheet = namedtuple('Sheet', ['material', 'length', 'width', 'parts'])
+
+# Materials of the bill of materials cut from sheets, and their stock sheet
+SHEETS = {'Glass': (3210, 2250), 'Panel': (2440, 1220), 'Base': (2440, 1220)}
+
+
+def sheet_parts(rows, tanks=1):
+    """{material: [(name, length, width)]} of the sheet items, the thickness dropped from their size."""
+    parts = dict()
+    for i in rows:
+        words = i.material.split(' ')
+        if words[0] not in SHEETS:
+            continue
+        thickness = float(words[1])
+        size = sorted([i.length, i.width, i.height])
+        for k, v in enumerate(size):
+            if abs(v - thickness) < 1e-6:
+                size.pop(k)
+                break
+        else:
+            size.pop(0)
+        parts.setdefault(' '.join(words[:2]), []).extend([(i.name, size[1], size[0])] * (i.quantity * tanks))
+    return parts
+
+
+class MaxRects():
+    """Free space as overlapping maximal rectangles, best short side fit."""
+
+    def __init__(self, length, width):
+        self.free = [(0, 0, length, width)]
+
+    def find(self, l, w, rotate):
+        best = None
+        for fx, fy, fl, fw in self.free:
+            for pl, pw, rotated in ((l, w, False), (w, l, True)) if rotate else ((l, w, False),):
+                if pl <= fl + 1e-9 and pw <= fw + 1e-9:
+                    score = (min(fl - pl, fw - pw), max(fl - pl, fw - pw))
+                    if best is None or score < best[0]:
+                        best = (score, (fx, fy, pl, pw), rotated)
+        return best
+
+    def place(self, key):
+        x, y, l, w = key
+        free = []
+        for f in self.free:
+            fx, fy, fl, fw = f
+            if x >= fx + fl or x + l <= fx or y >= fy + fw or y + w <= fy:
+                free.append(f)
+                continue
+            if x > fx:
+                free.append((fx, fy, x - fx, fw))
+            if x + l < fx + fl:
+                free.append((x + l, fy, fx + fl - x - l, fw))
+            if y > fy:
+                free.append((fx, fy, fl, y - fy))
+            if y + w < fy + fw:
+                free.append((fx, y + w, fl, fy + fw - y - w))
+        # Drop the rectangles inside another one
+        free.sort(key=lambda f: -f[2] * f[3])
+        kept = []
+        for f in free:
+            if not any(k[0] <= f[0] and k[1] <= f[1] and f[0] + f[2] <= k[0] + k[2] and f[1] + f[3] <= k[1] + k[3] for k in kept):
+                kept.append(f)
+        self.free = kept
+        return (x, y)
+
+
+class Guillotine():
+    """Disjoint free rectangles split by edge to edge cuts, best area fit."""
+
+    def __init__(self, length, width):
+        self.free = [(0, 0, length, width)]
+
+    def find(self, l, w, rotate):
+        best = None
+        for index, (fx, fy, fl, fw) in enumerate(self.free):
+            for pl, pw, rotated in ((l, w, False), (w, l, True)) if rotate else ((l, w, False),):
+                if pl <= fl + 1e-9 and pw <= fw + 1e-9:
+                    score = (fl * fw - pl * pw, min(fl - pl, fw - pw))
+                    if best is None or score < best[0]:
+                        best = (score, (index, pl, pw), rotated)
+        return best
+
+    def place(self, key):
+        index, l, w = key
+        fx, fy, fl, fw = self.free.pop(index)
+        # Cut along the shorter leftover so the larger piece stays whole
+        if fl - l < fw - w:
+            pieces = [(fx + l, fy, fl - l, w), (fx, fy + w, fl, fw - w)]
+        else:
+            pieces = [(fx + l, fy, fl - l, fw), (fx, fy + w, l, fw - w)]
+        self.free.extend([p for p in pieces if p[2] > 1e-9 and p[3] > 1e-9])
+        return (fx, fy)
+
+
+METHODS = {'maxrects': MaxRects, 'guillotine': Guillotine}
+
+
+def nest(parts, length, width, kerf=0, method='maxrects', rotate=True, material=''):
+    """Sheets of length x width holding every (name, length, width) part, largest parts first.
+
+    Each part is grown by the kerf, as is the sheet, so neighbours are a kerf apart."""
+    bins = []
+    sheets = []
+    for name, l, w in sorted(parts, key=lambda p: (-max(p[1], p[2]), -p[1] * p[2])):
+        best = None
+        for k, b in enumerate(bins):
+            found = b.find(l + kerf, w + kerf, rotate)
+            if found is not None and (best is None or found[0] < best[1][0]):
+                best = (k, found)
+        if best is None:
+            bins.append(METHODS[method](length + kerf, width + kerf))
+            sheets.append(Sheet(material, length, width, []))
+            found = bins[-1].find(l + kerf, w + kerf, rotate)
+            if found is None:
+                raise ValueError(f'{name} of {l:g}x{w:g} does not fit in a {length:g}x{width:g} sheet')
+            best = (len(bins) - 1, found)
+        k, (score, key, rotated) = best
+        x, y = bins[k].place(key)
+        sheets[k].parts.append(Placed(name, x, y, w if rotated else l, l if rotated else w, rotated))
+    return sheets
+
+
+def utilization(sheets):
+    area = sum([s.length * s.width for s in sheets])
+    used = sum([p.length * p.width for s in sheets for p in s.parts])
+    return used / area if area else 0
+
+
+def nesting_plan(rows, sizes=SHEETS, kerf=0, tanks=1, method='best', rotate=True):
+    """{material: [Sheet]} for the sheet items of the bill of materials rows.
+
+    method 'best' keeps the layout of fewer sheets, the fuller one on a tie."""
+    plans = dict()
+    for material, parts in sheet_parts(rows, tanks).items():
+        length, width = sizes[material.split(' ')[0]]
+        methods = list(METHODS) if method == 'best' else [method]
+        layouts = [nest(parts, length, width, kerf, m, rotate, material) for m in methods]
+        plans[material] = min(layouts, key=lambda s: (len(s), -utilization(s)))
+    return plans
+
+
+def report(plans):
+    lines = []
+    for material, sheets in plans.items():
+        lines.append(f"{material}: {len(sheets)} sheets of {sheets[0].length:g}x{sheets[0].width:g}, {100 * utilization(sheets):.1f}% used")
+        for i, s in enumerate(sheets):
+            lines.append(f"  {i + 1:>3}: {100 * utilization([s]):.1f}% " + ', '.join([f"{p.name} {p.length:g}x{p.width:g}@{p.x:g},{p.y:g}{' R' if p.rotated else ''}" for p in s.parts]))
+    return '\n'.join(lines)
+
+
+def _size(text):
+    length, width = text.lower().split('x')
+    return (float(length), float(width))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='nesting', description='Sheet layouts of the glass and panel parts')
+    parser.add_argument('configs', nargs='*', help='JSON or TOML configurations, one per tank model')
+    parser.add_argument('--glass', type=_size, default=SHEETS['Glass'], help='Glass sheet, LENGTHxWIDTH')
+    parser.add_argument('--board', type=_size, default=SHEETS['Panel'], help='Board sheet for panels and base, LENGTHxWIDTH')
+    parser.add_argument('--kerf', type=float, default=0, help='Space lost between two parts')
+    parser.add_argument('--tanks', type=int, default=1, help='Tanks built of each configuration')
+    parser.add_argument('--method', choices=('best', 'maxrects', 'guillotine'), default='best')
+    parser.add_argument('--no-rotate', dest='rotate', action='store_false', help='Keep the length of every part along the sheet length')
+    parser.add_argument('--format', choices=('text', 'json'), default='text')
+    args = parser.parse_args(argv)
+    rows = []
+    for path in args.configs or [None]:
+        rows.extend(bom.items(load_config(path) if path else dict()))
+    sizes = {'Glass': args.glass, 'Panel': args.board, 'Base': args.board}
+    plans = nesting_plan(rows, sizes, args.kerf, args.tanks, args.method, args.rotate)
+    if args.format == 'json':
+        json.dump({m: {'utilization': utilization(s), 'sheets': [[p._asdict() for p in sheet.parts] for sheet in s]} for m, s in plans.items()}, sys.stdout, indent=1)
+    else:
+        print(report(plans))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,110 @@
+#****************************************************************************
+# *                                                                          *
+# *   Aquarium                                                               *
+# *   Copyright (c) 2023 LGPL                                                *
+# *                                                                          *
+# *   This program is free software; you can redistribute it and/or modify   *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)     *
+# *   as published by the Free Software Foundation; either version 2 of      *
+# *   the License, or (at your option) any later version.                    *
+# *   for detail see the LICENCE text file.                                  *
+# *                                                                          *
+# *   This program is distributed in the hope that it will be useful,        *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+# *   GNU Library General Public License for more details.                   *
+# *                                                                          *
+# *   You should have received a copy of the GNU Library General Public      *
+# *   License along with this program; if not, write to the Free Software    *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+# *   USA                                                                    *
+# *                                                                          *
+#****************************************************************************
+
+# Panels as data: one table per panel set, each row gives the name, the origin
+# and the size of a box as spreadsheet formulas. A table is compiled once into
+# a single Python function evaluated against the sheet values it references.
+from computed import ComputedEvaluator
+
+FIELDS = ('x', 'y', 'z', 'length', 'width', 'height')
+
+_z_b = 'Computed.GlassLevel+Config.BottomGlassThickness'
+_z_t = _z_b + '+Computed.RealGlassHeight'
+_top_1 = _z_t + '- Config.SidesGlassThickness'
+_top_2 = _z_t + '- 2*Config.SidesGlassThickness'
+_stand_z = 'Config.Panel2FloorSpace'
+_stand_h = f'Config.StandVisibleHeight-{_stand_z}'
+_canopy_z = 'Computed.CanopyPanelLevel'
+_canopy_h = 'Computed.CanopyPanelHeight'
+
+TABLES = {
+    'SidesGlass': [
+        ('LeftGlass', 'Computed.LeftCornerX', 'Config.Length/-2+Config.SidesGlassThickness', _z_b, 'Config.SidesGlassThickness', 'Config.Length-2*Config.SidesGlassThickness', 'Computed.RealGlassHeight'),
+        ('RightGlass', 'Computed.RightCornerX-Config.SidesGlassThickness', 'Config.Length/-2+Config.SidesGlassThickness', _z_b, 'Config.SidesGlassThickness', 'Config.Length-2*Config.SidesGlassThickness', 'Computed.RealGlassHeight'),
+        ('BackGlass', 'Computed.LeftCornerX', 'Config.Length/2-Config.SidesGlassThickness', _z_b, 'Config.Width', 'Config.SidesGlassThickness', 'Computed.RealGlassHeight'),
+        ('FrontGlass', 'Computed.LeftCornerX', '-Config.Length/2', _z_b, 'Config.Width', 'Config.SidesGlassThickness', 'Computed.RealGlassHeight'),
+    ],
+    'GlassBracesBottom': [
+        ('LeftBottomBrace', 'Computed.LeftCornerX+Config.SidesGlassThickness', 'Config.Length/-2+Config.SidesGlassThickness', _z_b, 'Config.BraceWidth', 'Config.Length-2*Config.SidesGlassThickness', 'Config.SidesGlassThickness'),
+        ('RightBottomBrace', 'Computed.RightCornerX-Config.BraceWidth-Config.SidesGlassThickness', 'Config.Length/-2+Config.SidesGlassThickness', _z_b, 'Config.BraceWidth', 'Config.Length-2*Config.SidesGlassThickness', 'Config.SidesGlassThickness'),
+        ('FrontBottomBrace', 'Computed.LeftCornerX+Config.SidesGlassThickness+Config.BraceWidth', '-Config.Length/2+Config.SidesGlassThickness', _z_b, 'Config.Width-2*Config.BraceWidth-2*Config.SidesGlassThickness', 'Config.BraceWidth', 'Config.SidesGlassThickness'),
+        ('BackBottomBrace', 'Computed.LeftCornerX+2*Config.SidesGlassThickness+Config.BraceWidth', 'Config.Length/2-2*Config.SidesGlassThickness', _z_b, 'Config.Width-2*Config.BraceWidth-4*Config.SidesGlassThickness', 'Config.SidesGlassThickness', 'Config.BraceWidth'),
+        ('BackBottomWeirSupport', 'Computed.LeftCornerX+2*Config.SidesGlassThickness+Config.BraceWidth', 'Config.Length/2-Config.SidesGlassThickness-Computed.WeirDepth', _z_b, 'Config.Width-2*Config.BraceWidth-4*Config.SidesGlassThickness', 'Config.SidesGlassThickness', 'Config.BraceWidth'),
+    ],
+    'GlassBracesTop': [
+        ('LeftTopBrace', 'Computed.LeftCornerX+Config.SidesGlassThickness', 'Config.Length/-2+Config.SidesGlassThickness', _top_2, 'Config.BraceWidth', 'Config.Length-2*Config.SidesGlassThickness', 'Config.SidesGlassThickness'),
+        ('RightTopBrace', 'Computed.RightCornerX-Config.BraceWidth-Config.SidesGlassThickness', 'Config.Length/-2+Config.SidesGlassThickness', _top_2, 'Config.BraceWidth', 'Config.Length-2*Config.SidesGlassThickness', 'Config.SidesGlassThickness'),
+        ('FrontTopBrace', 'Computed.LeftCornerX+Config.SidesGlassThickness', '-Config.Length/2+Config.SidesGlassThickness', _top_1, 'Config.Width-2*Config.SidesGlassThickness', 'Config.BraceWidth', 'Config.SidesGlassThickness'),
+        ('BackTopBrace', 'Computed.LeftCornerX+Config.SidesGlassThickness', 'Config.Length/2-Config.SidesGlassThickness -Computed.WeirDepth', _top_1, 'Config.Width-2*Config.SidesGlassThickness', 'Computed.WeirDepth', 'Config.SidesGlassThickness'),
+    ],
+    'GlassBracesWeirFrame': [
+        ('WeirFrameLeftBrace', 'Computed.LeftCornerX+Config.SidesGlassThickness+Config.BraceWidth', 'Config.Length/2-Config.SidesGlassThickness -Computed.WeirDepth', _z_b, 'Config.SidesGlassThickness', 'Computed.WeirDepth', 'Computed.RealGlassHeight-Config.SidesGlassThickness'),
+        ('WeirFrameRightBrace', 'Computed.RightCornerX-2*Config.SidesGlassThickness-Config.BraceWidth', 'Config.Length/2-Config.SidesGlassThickness -Computed.WeirDepth', _z_b, 'Config.SidesGlassThickness', 'Computed.WeirDepth', 'Computed.RealGlassHeight-Config.SidesGlassThickness'),
+    ],
+    'StandCovers': [
+        ('LeftStandCover', 'Computed.LeftCornerX-Config.PanelThickness', 'Computed.FrontCornerY', _stand_z, 'Config.PanelThickness', 'Config.Length+Config.PanelThickness', _stand_h),
+        ('RightStandCover', 'Computed.RightCornerX', 'Computed.FrontCornerY', _stand_z, 'Config.PanelThickness', 'Config.Length+Config.PanelThickness', _stand_h),
+        ('BackStandCover', 'Computed.LeftCornerX', 'Computed.BackCornerY', _stand_z, 'Config.Width', 'Config.PanelThickness', _stand_h),
+        ('FrontStandCover', 'Computed.LeftCornerX-Config.PanelThickness', 'Computed.FrontCornerY-Config.PanelThickness', _stand_z, 'Config.Width+2*Config.PanelThickness', 'Config.PanelThickness', _stand_h),
+    ],
+    'CanopyPanels': [
+        ('LeftCanopyCover', 'Computed.LeftCornerX-Config.PanelThickness', 'Computed.FrontCornerY', _canopy_z, 'Config.PanelThickness', 'Config.Length+Config.PanelThickness', _canopy_h),
+        ('RightCanopyCover', 'Computed.RightCornerX', 'Computed.FrontCornerY', _canopy_z, 'Config.PanelThickness', 'Config.Length+Config.PanelThickness', _canopy_h),
+        ('BackCanopyCover', 'Computed.LeftCornerX', 'Computed.BackCornerY', _canopy_z, 'Config.Width', 'Config.PanelThickness', _canopy_h),
+        ('FrontCanopyCover', 'Computed.LeftCornerX-Config.PanelThickness', 'Computed.FrontCornerY-Config.PanelThickness', _canopy_z, 'Config.Width+2*Config.PanelThickness', 'Config.PanelThickness', _canopy_h),
+    ],
+}
+
+
+class PanelTable():
+    """Compiled table of panels, evaluated in one call."""
+
+    def __init__(self, name, rows):
+        self.name = name
+        self.names = [row[0] for row in rows]
+        definitions = []
+        for row in rows:
+            for field, formula in zip(FIELDS, row[1:]):
+                definitions.append((f'{row[0]}_{field}', '=' + formula, None))
+        self.__evaluator = ComputedEvaluator(definitions, sheet=name)
+        self.inputs = self.__evaluator.inputs
+
+    def __call__(self, values):
+        """[(name, (x, y, z), (length, width, height))] in table order for {sheet: {alias: value}}."""
+        result = self.__evaluator(values)
+        boxes = []
+        for name in self.names:
+            v = [result[f'{name}_{field}'] for field in FIELDS]
+            boxes.append((name, tuple(v[:3]), tuple(v[3:])))
+        return boxes
+
+
+_tables = dict()
+
+
+def panel_table(name):
+    table = _tables.get(name)
+    if table is None:
+        table = PanelTable(name, TABLES[name])
+        _tables[name] = table
+    return table
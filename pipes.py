@@ -26,84 +26,104 @@ from FreeCAD import Vector, Placement, Rotation
 import Sketcher
 import Part, Arch, ArchCommands, Draft
 import FreeCAD as App
-from holes import getHole
+from holes import getHole, add_holes
+from utils import set_view
+from config import flange_layout
+
+def XY_expressions(x=None, y=None):
+    if isinstance(x, int):
+        index = x
+        x = f'Computed.StartPipes+{index}*Computed.WeirFlangeOffset'
+    if not isinstance(y, str):
+        y = 'Computed.FlangesY'
+    return (x, y)
 
 def set_XYZ(obj, x=None, y=None, z=None):
+    x, y = XY_expressions(x, y)
     if isinstance(x, str):
         obj.setExpression('.Placement.Base.x', x)
-    elif isinstance(x, int):
-        index = x
-        obj.setExpression('.Placement.Base.x', f'Computed.StartPipes+{index}*Computed.WeirFlangeOffset')
-    if isinstance(y, str):
-        obj.setExpression('.Placement.Base.y', y)
-    else:
-        obj.setExpression('.Placement.Base.y', 'Computed.FlangesY')
+    obj.setExpression('.Placement.Base.y', y)
     if isinstance(z, str):
         obj.setExpression('.Placement.Base.z', z)
 
 
-def drill(doc, type, hole):
-    getHole(doc, type).Group = [hole] + getHole(doc, type).Group
+def drill(doc, type, x, y, radius, grid=()):
+    # grid: optional (NumberX, NumberY, SpacingX, SpacingY) expressions
+    hx, hy = XY_expressions(x, y)
+    return add_holes(getHole(doc, type), hx, hy, radius, *grid)
+
+def drill_flange(doc, flange, grid=()):
+    # Glass drilled for the neck, base for the free space of the tail
+    neck, head, tail = flange.Group[:3]
+    x = f'{flange.Name}.Placement.Base.x'
+    y = f'{flange.Name}.Placement.Base.y'
+    hole_glass = drill(doc, 'Glass', x, y, f'{neck.Name}.Radius', grid)
+    hole_base = drill(doc, 'Base', x, y, f'{tail.Name}.Radius', grid)
+    return (hole_glass, hole_base)
 
-def extend_hole(hole):
-    hole.setExpression('.Placement.Base.z', '0')
-    hole.setExpression('Height', 'Computed.RealGlassHeight+Config.StandVisibleHeight')
-    return hole
 
+def reserve_flanges(doc, count):
+    """First index of count new flanges, FlangeCount written once."""
+    index = int(doc.Computed.get('FlangeCount'))
+    doc.Computed.set('FlangeCount', str(index+count))
+    doc.Computed.recompute()
+    return index
 
-def make_flange(doc, grp, type, index=None, x=None, y=None):
+
+def make_flange(doc, grp, type, index=None, x=None, y=None, grid=(), drilled=True):
     if index==None:
-        index = int(doc.Computed.get('FlangeCount'))
-        doc.Computed.set('FlangeCount', str(index+1))
-        doc.Computed.recompute()
+        index = reserve_flanges(doc, 1)
     if x==None:
         x=index
     red_glass = (0.67, 0.00, 0.00, 0.61)
 
     def make_tail():
         FlangeTail = doc.addObject('Part::Cylinder', f'Flange{type}Tail_{index}')
-        set_XYZ(FlangeTail, x=x, y=y, z=f'-ConfigPipes{type}.FlangeFreeHeightBottom - Computed.FlangesNeckHeight')
+        FlangeTail.setExpression('.Placement.Base.z', f'-ConfigPipes{type}.FlangeFreeHeightBottom - Computed.FlangesNeckHeight')
         FlangeTail.setExpression('Height', f'ConfigPipes{type}.FlangeFreeHeightBottom')
         FlangeTail.setExpression('Radius', f'ConfigPipes{type}.FlangeFreeDiameterBottom / 2')
-        FlangeTail.ViewObject.ShapeColor = red_glass
-        FlangeTail.ViewObject.Transparency=90
+        set_view(FlangeTail, ShapeColor=red_glass, Transparency=90)
         return FlangeTail
     FlangeTail = make_tail()
     FlangeHead = doc.addObject('Part::Cylinder', f'Flange{type}Head_{index}')
-    set_XYZ(FlangeHead, x=x, y=y)
     FlangeHead.setExpression('Height', f'ConfigPipes{type}.FlangeFreeHeightTop')
     FlangeHead.setExpression('Radius', f'ConfigPipes{type}.FlangeFreeDiameterTop / 2')
-    FlangeHead.ViewObject.ShapeColor = red_glass
-    FlangeHead.ViewObject.Transparency=90
+    set_view(FlangeHead, ShapeColor=red_glass, Transparency=90)
     def make_neck():
         FlangeNeck = doc.addObject('Part::Cylinder', f'Flange{type}Neck_{index}')
-        set_XYZ(FlangeNeck, x=x, y=y, z='-Height')
+        FlangeNeck.Placement = Placement(Vector(0.00, 0.00, -14.00), Rotation (0.0, 0.0, 0.0, 1.0))
+        FlangeNeck.setExpression('.Placement.Base.z', '-Height')
         FlangeNeck.setExpression('Height', 'Computed.FlangesNeckHeight')
         FlangeNeck.setExpression('Radius', f'ConfigPipes{type}.FlangeDiameter / 2')
-        FlangeNeck.Placement = Placement(Vector(0.00, 0.00, -14.00), Rotation (0.0, 0.0, 0.0, 1.0))
         return FlangeNeck
     FlangeNeck = make_neck();
     flange = doc.addObject('App::Part', f'Flange{type}_{index}')
     flange.Group = [FlangeNeck, FlangeHead, FlangeTail]
     if grp:
         grp.addObject(flange)
-    flange.setExpression('.Placement.Base.z', 'Computed.FlangesZ')
-    hole_glass = extend_hole(make_neck())
-    hole_base = extend_hole(make_tail())
-    drill(doc, 'Glass', hole_glass)
-    drill(doc, 'Base', hole_base)
+    # The cylinders only carry their height, the holes read the flange position and radii
+    set_XYZ(flange, x=x, y=y, z='Computed.FlangesZ')
+    if not drilled:
+        return (flange, None, None)
+    hole_glass, hole_base = drill_flange(doc, flange, grid)
     return (flange, hole_glass, hole_base)
 
 
-def make_flanges(doc):
+def make_flanges(doc, layout=None):
+    if layout is None:
+        layout = flange_layout()
     grp = doc.addObject('App::DocumentObjectGroup','Flanges')
     grp.Visibility = False
-    make_flange(doc,grp,'Return')
-    make_flange(doc,grp,'Drain')
-    make_flange(doc,grp,'Drain')
-    make_flange(doc,grp,'Drain')
-    make_flange(doc,grp,'Drain')
-    make_flange(doc,grp,'Return')
+    first = reserve_flanges(doc, len(layout))
+    flanges = [make_flange(doc, grp, type, index=first+i, drilled=False)[0] for i, (type, level) in enumerate(layout)]
+    # Consecutive flanges of the same type are evenly spaced, one grid of holes each
+    start = 0
+    for i in range(1, len(layout)+1):
+        if i < len(layout) and layout[i][0] == layout[start][0]:
+            continue
+        grid = (str(i-start), '1', 'Computed.WeirFlangeOffset', '0')
+        drill_flange(doc, flanges[start], grid)
+        start = i
     return grp
 
 def make_pipe(doc, index, type, level, grp):
@@ -122,19 +142,18 @@ def make_pipe(doc, index, type, level, grp):
     p.setExpression('.Placement.Base.z', pipeBase)
     o.Group = [ p ] + o.Group
 
-def make_pipes(doc):
+def make_pipes(doc, layout=None):
+    if layout is None:
+        layout = flange_layout()
     g = doc.addObject('App::DocumentObjectGroup','Pipes')
-    make_pipe(doc,0,'Return','ReturnWaterLevel', g)
-    make_pipe(doc,1,'Drain','BeanAnimalMainDrainLevel',g)
-    make_pipe(doc,2,'Drain','BeanAnimalEmergencyDrainLevel',g)
-    make_pipe(doc,3,'Drain','BeanAnimalEmergencyDrainLevel',g)
-    make_pipe(doc,4,'Drain','BeanAnimalAuxiliaryDrainLevel',g)
-    make_pipe(doc,5,'Return','ReturnWaterLevel', g)
+    for index, (type, level) in enumerate(layout):
+        make_pipe(doc, index, type, level, g)
     return g
 
 def make_nozzles(doc):
     grp = doc.addObject('App::DocumentObjectGroup','ClosedLoop')
-    (nozzle, hole_glass, hole_base) = make_flange(doc,None,'NozzleClosedLoop', index=1, x=f'Computed.NozzlesBaseX', y=f'Computed.NozzlesBaseY')
+    grid = ('Computed.NozzlesNumberX', 'Computed.NozzlesNumberY', 'Computed.NozzlesSpacingX', 'Computed.NozzlesSpacingY')
+    (nozzle, hole_glass, hole_base) = make_flange(doc,None,'NozzleClosedLoop', index=1, x=f'Computed.NozzlesBaseX', y=f'Computed.NozzlesBaseY', grid=grid)
     def create_array(doc, obj):
         sb = Draft.make_ortho_array(obj, v_x=App.Vector(10, 0, 0), v_y=App.Vector(0, 10, 0), v_z=App.Vector(0, 0, 10), n_x=2, n_y=2, n_z=1, use_link=False)
         sb.setExpression('.IntervalY.y', 'Computed.NozzlesSpacingY')
@@ -145,8 +164,4 @@ def make_nozzles(doc):
         return sb
     sb = create_array(doc, nozzle)
     grp.addObject(sb)
-    holes_glass = create_array(doc, hole_glass)
-    drill(doc, 'Glass', holes_glass)
-    holes_base = create_array(doc, hole_base)
-    drill(doc, 'Base', holes_base)
     return grp
@@ -0,0 +1,142 @@
+#****************************************************************************
+# *                                                                          *
+# *   Aquarium                                                               *
+# *   Copyright (c) 2023 LGPL                                                *
+# *                                                                          *
+# *   This program is free software; you can redistribute it and/or modify   *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)     *
+# *   as published by the Free Software Foundation; either version 2 of      *
+# *   the License, or (at your option) any later version.                    *
+# *   for detail see the LICENCE text file.                                  *
+# *                                                                          *
+# *   This program is distributed in the hope that it will be useful,        *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+# *   GNU Library General Public License for more details.                   *
+# *                                                                          *
+# *   You should have received a copy of the GNU Library General Public      *
+# *   License along with this program; if not, write to the Free Software    *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+# *   USA                                                                    *
+# *                                                                          *
+#****************************************************************************
+
+# Wall time of every object recompute, summed by generator group.
+#
+#   with RecomputeProfiler('trace.jsonl') as p:
+#       doc.recompute()
+#   print(p.report())
+#
+# A document observer timestamps each slotRecomputedObject, the time of an
+# object is the time since the previous one (or since the recompute started).
+import json
+import time
+import FreeCAD as App
+
+
+def top_group(obj):
+    """Name of the outermost group or App::Part holding obj, through its users for loose objects."""
+    if obj.TypeId == 'Spreadsheet::Sheet':
+        return 'Configuration'
+    seen = set()
+    todo = [obj]
+    while todo:
+        o = todo.pop(0)
+        if o.Name in seen:
+            continue
+        seen.add(o.Name)
+        parent = o.getParentGroup() or o.getParentGeoFeatureGroup()
+        if parent is not None:
+            while True:
+                up = parent.getParentGroup() or parent.getParentGeoFeatureGroup()
+                if up is None:
+                    return parent.Name
+                parent = up
+        if o is not obj and o.hasExtension('App::GroupExtension'):
+            return o.Name
+        todo.extend(o.InList)
+    return obj.Name
+
+
+class RecomputeProfiler():
+    """Document observer recording the recompute time of each object."""
+
+    def __init__(self, trace=None):
+        self.trace = trace
+        self.events = []
+        self.groups = dict()
+        self.last = None
+        self.file = None
+
+    def start(self):
+        if self.trace is not None:
+            self.file = open(self.trace, 'a')
+        App.addDocumentObserver(self)
+        return self
+
+    def stop(self):
+        App.removeDocumentObserver(self)
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def slotBeforeRecomputeDocument(self, doc):
+        self.last = time.perf_counter()
+
+    def slotRecomputedObject(self, obj):
+        now = time.perf_counter()
+        if self.last is None:
+            self.last = now
+        key = (obj.Document.Name, obj.Name)
+        if key not in self.groups:
+            self.groups[key] = top_group(obj)
+        event = {
+            'document': obj.Document.Name,
+            'object': obj.Name,
+            'label': obj.Label,
+            'type': obj.TypeId,
+            'group': self.groups[key],
+            'seconds': now - self.last,
+            'time': now,
+            }
+        self.events.append(event)
+        if self.file is not None:
+            self.file.write(json.dumps(event) + '\n')
+        self.last = now
+
+    def slotRecomputedDocument(self, doc):
+        self.last = None
+
+    def totals(self, key='group'):
+        totals = dict()
+        for e in self.events:
+            totals[e[key]] = totals.get(e[key], 0) + e['seconds']
+        return sorted(totals.items(), key=lambda t: -t[1])
+
+    def report(self, top=10):
+        total = sum([e['seconds'] for e in self.events])
+        lines = [f"{'Group':<24} {'Objects':>8} {'Seconds':>9} {'%':>6}"]
+        for group, seconds in self.totals():
+            count = len([e for e in self.events if e['group'] == group])
+            lines.append(f"{group:<24} {count:>8} {seconds:>9.3f} {100 * seconds / max(total, 1e-9):>6.1f}")
+        lines.append(f"{'Total':<24} {len(self.events):>8} {total:>9.3f}")
+        lines.append('')
+        lines.append(f"{'Slowest objects':<40} {'Type':<28} {'Seconds':>9}")
+        for e in sorted(self.events, key=lambda e: -e['seconds'])[:top]:
+            lines.append(f"{e['group'] + '/' + e['label']:<40} {e['type']:<28} {e['seconds']:>9.3f}")
+        return '\n'.join(lines)
+
+
+def profile_recompute(doc, trace=None):
+    """Recompute every object of doc under the profiler."""
+    for o in doc.Objects:
+        o.touch()
+    with RecomputeProfiler(trace) as profiler:
+        doc.recompute()
+    return profiler
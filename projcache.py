@@ -0,0 +1,277 @@
+#****************************************************************************
+# *                                                                          *
+# *   Aquarium                                                               *
+# *   Copyright (c) 2023 LGPL                                                *
+# *                                                                          *
+# *   This program is free software; you can redistribute it and/or modify   *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)     *
+# *   as published by the Free Software Foundation; either version 2 of      *
+# *   the License, or (at your option) any later version.                    *
+# *   for detail see the LICENCE text file.                                  *
+# *                                                                          *
+# *   This program is distributed in the hope that it will be useful,        *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+# *   GNU Library General Public License for more details.                   *
+# *                                                                          *
+# *   You should have received a copy of the GNU Library General Public      *
+# *   License along with this program; if not, write to the Free Software    *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+# *   USA                                                                    *
+# *                                                                          *
+#****************************************************************************
+
+# Hidden line projections kept on disk, keyed by the source shapes and the view direction.
+#
+# The glass and brace blue prints are drawn by CachedView objects: a TechDraw
+# symbol view whose SVG is made from the edges returned by the cache, the
+# hidden line removal only runs when the sources or the direction changed.
+# The cache is shared by every document and FreeCAD session, it is capped in
+# size and the least recently used projections are removed first.
+import hashlib
+import os
+import FreeCAD as App
+import Part
+
+# Visible and hidden hard, smooth, seam, outline and iso lines, as TechDraw.projectEx
+EDGES = ('Visible', 'VisibleSmooth', 'VisibleSeam', 'VisibleOutline', 'VisibleIso',
+         'Hidden', 'HiddenSmooth', 'HiddenSeam', 'HiddenOutline', 'HiddenIso')
+# Edges drawn by default by TechDraw
+VISIBLE = ('Visible', 'VisibleOutline')
+HIDDEN = ('Hidden', 'HiddenOutline')
+
+# View name, direction, X direction and position on the template (fraction of its size), first angle
+VIEWS = [
+    ('Front', (0, -1, 0), (1, 0, 0), (1 / 2, 2 / 3)),
+    ('Top', (0, 0, 1), (1, 0, 0), (1 / 2, 1 / 4)),
+    ('Right', (1, 0, 0), (0, 1, 0), (1 / 6, 2 / 3)),
+    ('FrontTopRight', (1, -1, 1), (1, 1, 0), (5 / 6, 1 / 4)),
+    ]
+
+# Line widths and dashes on the page, in mm
+LINE_WIDTH = .5
+HIDDEN_WIDTH = .25
+HIDDEN_DASH = (3, 1.5)
+
+SVG_HEAD = '<svg xmlns="http://www.w3.org/2000/svg" version="1.1">\n'
+SVG_TAIL = '</svg>\n'
+
+
+def shape_hash(shape):
+    return hashlib.sha1(shape.exportBrepToString().encode()).hexdigest()
+
+
+def _compound(shape):
+    if shape is None or shape.isNull():
+        return Part.Compound([])
+    return shape
+
+
+def view_frame(direction, xdirection):
+    """Matrix turning the model so that the view looks down Z, with its X axis along X."""
+    d = App.Vector(direction)
+    d.normalize()
+    x = App.Vector(xdirection)
+    x = x - d * x.dot(d)
+    x.normalize()
+    y = d.cross(x)
+    return App.Matrix(x.x, x.y, x.z, 0, y.x, y.y, y.z, 0, d.x, d.y, d.z, 0, 0, 0, 0, 1)
+
+
+class ProjectionCache():
+    """LRU cache of projectEx results, in memory and as brep files in folder."""
+
+    def __init__(self, folder=None, max_bytes=256 * 1024 * 1024):
+        if folder is None:
+            folder = os.path.join(App.getUserCachePath(), 'AquariumProjections')
+        os.makedirs(folder, exist_ok=True)
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.memory = dict()
+        self.hashes = dict()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def source_hash(self, obj):
+        # The brep is only serialized when the shape of the object changed
+        shape = Part.getShape(obj)
+        points = sum([v.Point for v in shape.Vertexes], App.Vector())
+        memo = (obj.Name, shape.hashCode(), len(shape.Vertexes), f'{points.x:.6f} {points.y:.6f} {points.z:.6f}')
+        if memo not in self.hashes:
+            if len(self.hashes) > 1024:
+                self.hashes.clear()
+            self.hashes[memo] = shape_hash(shape)
+        return self.hashes[memo]
+
+    def key(self, objs, direction, xdirection):
+        m = view_frame(direction, xdirection)
+        frame = ' '.join([f'{v:.9f}' for v in m.A[:12]])
+        return hashlib.sha1(f"{' '.join([self.source_hash(o) for o in objs])} {frame}".encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.folder, key + '.brep')
+
+    def project(self, objs, direction, xdirection):
+        """Dict of EDGES name to compound, the objects seen along direction in the view plane."""
+        key = self.key(objs, direction, xdirection)
+        path = self.path(key)
+        if key in self.memory and os.path.exists(path):
+            self.stats['hits'] += 1
+            os.utime(path)
+            return self.memory[key]
+        if os.path.exists(path):
+            self.stats['hits'] += 1
+            os.utime(path)
+            stored = Part.Shape()
+            stored.importBrep(path)
+            result = dict(zip(EDGES, stored.childShapes()))
+        else:
+            import TechDraw
+            self.stats['misses'] += 1
+            shape = Part.makeCompound([Part.getShape(o) for o in objs]).transformed(view_frame(direction, xdirection))
+            result = dict(zip(EDGES, [_compound(s) for s in TechDraw.projectEx(shape, App.Vector(0, 0, 1))]))
+            # Export pages run in parallel processes, never leave a partial file
+            temp = f'{path}.{os.getpid()}'
+            Part.Compound([result[e] for e in EDGES]).exportBrep(temp)
+            os.replace(temp, path)
+            self.evict()
+        self.memory[key] = result
+        return result
+
+    def files(self):
+        return [os.path.join(self.folder, f) for f in os.listdir(self.folder) if f.endswith('.brep')]
+
+    def size(self):
+        return sum([os.path.getsize(f) for f in self.files()])
+
+    def evict(self):
+        files = self.files()
+        files.sort(key=os.path.getmtime)
+        total = sum([os.path.getsize(f) for f in files])
+        # Always keep the newest entry, even alone above the cap
+        for f in files[:-1]:
+            if total <= self.max_bytes:
+                break
+            total -= os.path.getsize(f)
+            os.remove(f)
+            self.memory.pop(os.path.basename(f)[:-5], None)
+            self.stats['evictions'] += 1
+
+    def clear(self):
+        for f in self.files():
+            os.remove(f)
+        self.memory.clear()
+
+    def report(self):
+        total = self.stats['hits'] + self.stats['misses']
+        rate = 100 * self.stats['hits'] / total if total else 0
+        return f"{self.stats['hits']} hits, {self.stats['misses']} misses ({rate:.0f}% hits), {self.stats['evictions']} evictions, {self.size() / 1024 / 1024:.1f} MB"
+
+
+_cache = None
+
+
+def cache():
+    global _cache
+    if _cache is None:
+        _cache = ProjectionCache()
+    return _cache
+
+
+def polylines(edges, hidden, deflection):
+    """List of (hidden, points) in the view plane, every edge as a polyline."""
+    lines = []
+    for is_hidden, names in [(False, VISIBLE), (True, HIDDEN)]:
+        if is_hidden and not hidden:
+            continue
+        for name in names:
+            for e in edges[name].Edges:
+                if isinstance(e.Curve, Part.Line):
+                    points = [e.Vertexes[0].Point, e.Vertexes[-1].Point]
+                else:
+                    points = e.discretize(Deflection=deflection)
+                lines.append((is_hidden, [(p.x, p.y) for p in points]))
+    return lines
+
+
+def view_polylines(view):
+    """Polylines of a CachedView, centered on the view position, in model units."""
+    edges = cache().project(view.Source, view.Direction, view.XDirection)
+    # A twentieth of a mm on the page
+    lines = polylines(edges, view.HardHidden, .05 / view.Scale)
+    points = [p for hidden, line in lines for p in line]
+    if len(points) == 0:
+        return []
+    cx = (min([x for x, y in points]) + max([x for x, y in points])) / 2
+    cy = (min([y for x, y in points]) + max([y for x, y in points])) / 2
+    return [(hidden, [(x - cx, y - cy) for x, y in line]) for hidden, line in lines]
+
+
+def svg_body(lines, scale):
+    # SVG Y goes down, the view is scaled by TechDraw so the widths are divided by the scale
+    paths = {False: [], True: []}
+    for hidden, line in lines:
+        paths[hidden].append('M ' + ' L '.join([f'{x:.3f},{-y:.3f}' for x, y in line]))
+    body = ''
+    if paths[False]:
+        body += f'<g fill="none" stroke="#000000" stroke-width="{LINE_WIDTH / scale:.3f}" stroke-linecap="round">\n'
+        body += ''.join([f'<path d="{d}"/>\n' for d in paths[False]]) + '</g>\n'
+    if paths[True]:
+        dash = ','.join([f'{d / scale:.3f}' for d in HIDDEN_DASH])
+        body += f'<g fill="none" stroke="#000000" stroke-width="{HIDDEN_WIDTH / scale:.3f}" stroke-dasharray="{dash}">\n'
+        body += ''.join([f'<path d="{d}"/>\n' for d in paths[True]]) + '</g>\n'
+    return body
+
+
+class CachedView():
+    """Blue print view drawn from the projection cache, for a TechDraw::DrawViewSymbolPython."""
+
+    def __init__(self, obj):
+        obj.addProperty('App::PropertyLinkList', 'Source', 'Projection', 'Objects shown in the view')
+        obj.addProperty('App::PropertyVector', 'Direction', 'Projection', 'Direction from the objects to the viewer')
+        obj.addProperty('App::PropertyVector', 'XDirection', 'Projection', 'Direction of the X axis of the view')
+        obj.addProperty('App::PropertyBool', 'HardHidden', 'Projection', 'Draw the hidden lines dashed')
+        obj.Proxy = self
+
+    def execute(self, obj):
+        obj.Symbol = SVG_HEAD + svg_body(view_polylines(obj), obj.Scale) + SVG_TAIL
+
+    def __getstate__(self):
+        return None
+
+    def __setstate__(self, state):
+        return None
+
+
+def is_cached_view(view):
+    return isinstance(getattr(view, 'Proxy', None), CachedView)
+
+
+def add_cached_views(doc, page, name, objs, HardHidden, scale):
+    """One CachedView per entry of VIEWS on page, placed on its template."""
+    views = []
+    for view_name, direction, xdirection, (fx, fy) in VIEWS:
+        view = doc.addObject('TechDraw::DrawViewSymbolPython', f'{name}{view_name}')
+        CachedView(view)
+        view.Label = f"{'Perspective' if view_name == 'FrontTopRight' else view_name} {name}"
+        view.Source = objs
+        view.Direction = App.Vector(direction)
+        view.XDirection = App.Vector(xdirection)
+        view.HardHidden = HardHidden
+        view.ScaleType = 'Custom'
+        view.Scale = scale
+        view.setExpression('X', f'{name}Template.Width*{fx:.4f}')
+        view.setExpression('Y', f'{name}Template.Height*{fy:.4f}')
+        page.addView(view)
+        views.append(view)
+    return views
+
+
+def recompute(doc):
+    """Recompute the document, the cached views reuse the projections of unchanged sources.
+
+    Returns the hits, misses and evictions of this recompute."""
+    before = dict(cache().stats)
+    doc.recompute()
+    delta = {k: cache().stats[k] - before[k] for k in before}
+    App.Console.PrintMessage(f"Projection cache: {delta['hits']} hits, {delta['misses']} misses, {delta['evictions']} evictions this update. {cache().report()}\n")
+    return delta
@@ -0,0 +1,112 @@
+#****************************************************************************
+# *                                                                          *
+# *   Aquarium                                                               *
+# *   Copyright (c) 2023 LGPL                                                *
+# *                                                                          *
+# *   This program is free software; you can redistribute it and/or modify   *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)     *
+# *   as published by the Free Software Foundation; either version 2 of      *
+# *   the License, or (at your option) any later version.                    *
+# *   for detail see the LICENCE text file.                                  *
+# *                                                                          *
+# *   This program is distributed in the hope that it will be useful,        *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+# *   GNU Library General Public License for more details.                   *
+# *                                                                          *
+# *   You should have received a copy of the GNU Library General Public      *
+# *   License along with this program; if not, write to the Free Software    *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+# *   USA                                                                    *
+# *                                                                          *
+#****************************************************************************
+
+# Recompute only the objects affected by a configuration change.
+import re
+import FreeCAD as App
+from computed import ComputedEvaluator, FormulaError
+
+_reference = re.compile(r'\b([A-Za-z_]\w*)\.([A-Za-z_]\w*)')
+
+
+def expression_references(obj, sheets):
+    refs = set()
+    for path, expr in obj.ExpressionEngine:
+        for sheet, alias in _reference.findall(expr):
+            if sheet in sheets:
+                refs.add((sheet, alias))
+    # Features evaluating their own formulas (PanelSet) list what they read
+    proxy = getattr(obj, 'Proxy', None)
+    if hasattr(proxy, 'references'):
+        refs.update([r for r in proxy.references(obj) if r[0] in sheets])
+    return refs
+
+
+def sheet_definitions(sheet):
+    definitions = []
+    for cell in sheet.getUsedCells():
+        if re.fullmatch(r'A\d+', cell) is None:
+            continue
+        alias = sheet.getAlias(cell)
+        if alias:
+            definitions.append((alias, sheet.getContents(cell), None))
+    return definitions
+
+
+def computed_dependents(doc, changed):
+    """Computed aliases affected by the changed (sheet, alias) pairs, read from the document sheet."""
+    sheet = doc.getObject('Computed')
+    if sheet is None:
+        return []
+    try:
+        evaluator = ComputedEvaluator(sheet_definitions(sheet))
+    except FormulaError as e:
+        App.Console.PrintWarning(f"Unable to parse Computed ({e}), treating every alias as changed\n")
+        return [d[0] for d in sheet_definitions(sheet)]
+    return evaluator.dependents(changed)
+
+
+def affected_objects(doc, changed):
+    """Objects whose expressions reference a changed value, directly, through Computed or through another object."""
+    changed = set(changed)
+    sheets = {type for type, _ in changed}
+    sheets.add('Computed')
+    dirty_refs = set(changed)
+    dirty_refs.update([('Computed', n) for n in computed_dependents(doc, changed)])
+    dirty = dict()
+    for o in doc.Objects:
+        if o.Name in sheets:
+            continue
+        if expression_references(o, sheets) & dirty_refs:
+            dirty[o.Name] = o
+            for d in o.InListRecursive:
+                dirty[d.Name] = d
+    return list(dirty.values())
+
+
+def touched_objects(doc):
+    """Names of the touched objects, taken before writing the sheets for partial_recompute."""
+    return {o.Name for o in doc.Objects if o.isTouched()}
+
+
+def partial_recompute(doc, changed, touched=None):
+    """Recompute what the changed (sheet, alias) pairs affect.
+
+    touched is touched_objects(doc) before the sheets were written: skipped
+    objects touched only by the writes are purged, the others stay touched."""
+    if touched is None:
+        touched = set()
+    sheets = [doc.getObject(type) for type in {type for type, _ in changed}]
+    sheets.append(doc.getObject('Computed'))
+    sheets = [s for s in sheets if s is not None]
+    dirty = affected_objects(doc, changed)
+    names = {o.Name for o in dirty + sheets}
+    skipped = [o for o in doc.Objects if o.Name not in names]
+    doc.recompute(sheets + dirty)
+    # Nothing they reference has changed, so their shapes are still valid
+    for o in skipped:
+        if o.isTouched() and o.Name not in touched:
+            o.purgeTouched()
+    App.Console.PrintMessage(f"Recomputed {len(dirty)} objects, skipped {len(skipped)}\n")
+    App.Console.PrintLog(f"Skipped {', '.join([o.Name for o in skipped])}\n")
+    return (dirty, skipped)
@@ -26,10 +26,11 @@ from FreeCAD import Vector, Placement, Rotation
 import Sketcher
 import Part, Arch, ArchCommands, Draft
 import FreeCAD as App
-from utils import make_supports
+from utils import make_supports, make_instance, set_position
+from miter import make_miter_bar
 
 
-def makeStandStructure(doc, cut45 = True):
+def makeStandStructure(doc, cut45 = True, links = True):
     grp = doc.addObject('App::DocumentObjectGroup', 'StandStructure')
     grp_sup = doc.addObject('App::DocumentObjectGroup', 'PanelSupports')
     grp.addObject(grp_sup)
@@ -40,157 +41,70 @@ def makeStandStructure(doc, cut45 = True):
     profile.setExpression('Width', 'Config.MetalProfileWidth')
     profile.setExpression('Height', 'Config.MetalProfileHeight')
     profile.setExpression('Thickness', 'Config.MetalProfileWallThickness')
-    s = Arch.makeStructure(profile, height=1)
-    s.Placement = Placement(Vector(0, 1, 0), Rotation(0, 90, 0))
-    if cut45:
-        s.setExpression('Height', 'Computed.BeamsSizeWidth45')
-        s.setExpression('.Placement.Base.x', 'Computed.LeftCornerX')
-        cut = App.ActiveDocument.addObject("Part::Box", "CutTool")
-        cut.setExpression('.Placement.Base.x', 'Computed.LeftCornerX')
-        cut.setExpression('.Placement.Base.y', 'Computed.FrontCornerY')
-        cut.setExpression('.Placement.Base.z', 'Computed.BeamsLevel-Config.MetalProfileWidth/2')
-        cut.setExpression('Width', 'Config.MetalProfileWidth')
-        cut.setExpression('Length', 'Computed.BeamsSizeWidth45/sqrt(2)')
-        cut.setExpression('Height', 'Computed.BeamsSizeWidth45/sqrt(2)')
-        cut.Placement.Rotation = Rotation(45, 0, 90)
-        s_cut = App.ActiveDocument.addObject("Part::MultiCommon", "beam45cut")
-        s_cut.Shapes = [s, cut]
-        grp.addObject(s_cut)
-    else:
-        s.setExpression('Height', 'Computed.BeamsSizeWidth')
-        s.setExpression('.Placement.Base.x', 'Computed.LeftCornerX+Config.MetalProfileWidth/2')
+    # Each distinct member is built once, its repeats only carry a placement
+    def repeat(source, name, x, y, z=None, yaw=None):
+        s = make_instance(doc, source, name, links)
+        if yaw is not None:
+            s.Placement = Placement(s.Placement.Base, Rotation(yaw, 0, 0))
+        set_position(s, x, y, z)
         grp.addObject(s)
-    s.setExpression('.Placement.Base.y', 'Computed.FrontCornerY+Config.MetalProfileHeight/2')
-    s.setExpression('.Placement.Base.z', 'Computed.BeamsLevel')
-    s.IfcType = "Beam"
-    s = Arch.makeStructure(profile, height=1)
-    s.Placement = Placement(Vector(0, 1, 0), Rotation(0, 90, 0))
+        return s
     if cut45:
-        s.setExpression('Height', 'Computed.BeamsSizeWidth45')
-        s.setExpression('.Placement.Base.x', 'Computed.LeftCornerX')
-        cut = App.ActiveDocument.addObject("Part::Box", "CutTool")
-        cut.setExpression('.Placement.Base.x', 'Computed.LeftCornerX')
-        cut.setExpression('.Placement.Base.y', 'Computed.BackCornerY')
-        cut.setExpression('.Placement.Base.z', 'Computed.BeamsLevel-Config.MetalProfileWidth/2')
-        cut.setExpression('Width', 'Config.MetalProfileWidth')
-        cut.setExpression('Length', 'Computed.BeamsSizeWidth45/sqrt(2)')
-        cut.setExpression('Height', 'Computed.BeamsSizeWidth45/sqrt(2)')
-        cut.Placement.Rotation = Rotation(45, 0, 90)
-        s_cut = App.ActiveDocument.addObject("Part::MultiCommon", "beam45cut")
-        s_cut.Shapes = [s, cut]
-        grp.addObject(s_cut)
+        top = 'Computed.BeamsLevel-Config.MetalProfileWidth/2'
+        def make_top_beam(x, y, length, outside, yaw):
+            s = make_miter_bar(doc, 'beam45cut', 'Config.MetalProfileHeight', 'Config.MetalProfileWidth', 'Config.MetalProfileWallThickness', outside)
+            s.Placement = Placement(Vector(0, 0, 0), Rotation(yaw, 0, 0))
+            set_position(s, x, y, top)
+            s.setExpression('Length', length)
+            grp.addObject(s)
+            return s
+        # The back and right beams are the front and left ones turned half a turn
+        s = make_top_beam('Computed.LeftCornerX', 'Computed.FrontCornerY', 'Computed.BeamsSizeWidth45', 'Front', 0)
+        repeat(s, 'beam45cut', 'Computed.RightCornerX', 'Computed.BackCornerY', top, 180)
+        s = make_top_beam('Computed.LeftCornerX+Config.MetalProfileHeight', 'Computed.FrontCornerY', 'Computed.BeamsSizeLength', 'Back', 90)
+        repeat(s, 'beam45cut', 'Computed.RightCornerX-Config.MetalProfileHeight', 'Computed.BackCornerY', top, 270)
     else:
+        s = Arch.makeStructure(profile, height=1)
+        s.Placement = Placement(Vector(0, 1, 0), Rotation(0, 90, 0))
         s.setExpression('Height', 'Computed.BeamsSizeWidth')
-        s.setExpression('.Placement.Base.x', 'Computed.LeftCornerX+Config.MetalProfileWidth/2')
-        grp.addObject(s)
-    s.setExpression('.Placement.Base.y', 'Computed.BackCornerY-Config.MetalProfileHeight/2')
-    s.setExpression('.Placement.Base.z', 'Computed.BeamsLevel')
-    s.IfcType = "Beam"
-    s = Arch.makeStructure(profile, height=1)
-    s.Placement = Placement(Vector(0, 1, 0), Rotation(0, 90, -90))
-    s.setExpression('.Placement.Base.x', 'Computed.LeftCornerX+Config.MetalProfileHeight/2')
-    s.setExpression('.Placement.Base.y', 'Computed.FrontCornerY')
-    s.setExpression('.Placement.Base.z', 'Computed.BeamsLevel')
-    s.setExpression('Height', 'Computed.BeamsSizeLength')
-    if cut45:
-        cut = App.ActiveDocument.addObject("Part::Box", "CutTool")
-        cut.setExpression('.Placement.Base.x', 'Computed.LeftCornerX')
-        cut.setExpression('.Placement.Base.y', 'Computed.BackCornerY')
-        cut.setExpression('.Placement.Base.z', 'Computed.BeamsLevel-Config.MetalProfileWidth/2')
-        cut.setExpression('Width', 'Config.MetalProfileWidth')
-        cut.setExpression('Length', 'Computed.BeamsSizeLength/sqrt(2)')
-        cut.setExpression('Height', 'Computed.BeamsSizeLength/sqrt(2)')
-        cut.Placement.Rotation = Rotation(-45, 0, 90)
-        s_cut = App.ActiveDocument.addObject("Part::MultiCommon", "beam45cut")
-        s_cut.Shapes = [s, cut]
-        grp.addObject(s_cut)
-    else:
+        set_position(s, 'Computed.LeftCornerX+Config.MetalProfileWidth/2', 'Computed.FrontCornerY+Config.MetalProfileHeight/2', 'Computed.BeamsLevel')
+        s.IfcType = "Beam"
         grp.addObject(s)
-    s.IfcType = "Beam"
-    s = Arch.makeStructure(profile, height=1)
-    s.Placement = Placement(Vector(0, 1, 0), Rotation(0, 90, -90))
-    s.setExpression('.Placement.Base.x', 'Computed.RightCornerX-Config.MetalProfileHeight/2')
-    s.setExpression('.Placement.Base.y', 'Computed.FrontCornerY')
-    s.setExpression('.Placement.Base.z', 'Computed.BeamsLevel')
-    s.setExpression('Height', 'Computed.BeamsSizeLength')
-    if cut45:
-        cut = App.ActiveDocument.addObject("Part::Box", "CutTool")
-        cut.setExpression('.Placement.Base.x', 'Computed.RightCornerX')
-        cut.setExpression('.Placement.Base.y', 'Computed.BackCornerY')
-        cut.setExpression('.Placement.Base.z', 'Computed.BeamsLevel-Config.MetalProfileWidth/2')
-        cut.setExpression('Width', 'Config.MetalProfileWidth')
-        cut.setExpression('Length', 'Computed.BeamsSizeLength/sqrt(2)')
-        cut.setExpression('Height', 'Computed.BeamsSizeLength/sqrt(2)')
-        cut.Placement.Rotation = Rotation(-45, 0, 90)
-        s_cut = App.ActiveDocument.addObject("Part::MultiCommon", "beam45cut")
-        s_cut.Shapes = [s, cut]
-        grp.addObject(s_cut)
-    else:
+        repeat(s, 'Structure', 'Computed.LeftCornerX+Config.MetalProfileWidth/2', 'Computed.BackCornerY-Config.MetalProfileHeight/2', 'Computed.BeamsLevel')
+        s = Arch.makeStructure(profile, height=1)
+        s.Placement = Placement(Vector(0, 1, 0), Rotation(0, 90, -90))
+        set_position(s, 'Computed.LeftCornerX+Config.MetalProfileHeight/2', 'Computed.FrontCornerY', 'Computed.BeamsLevel')
+        s.setExpression('Height', 'Computed.BeamsSizeLength')
+        s.IfcType = "Beam"
         grp.addObject(s)
-    s.IfcType = "Beam"
+        repeat(s, 'Structure', 'Computed.RightCornerX-Config.MetalProfileHeight/2', 'Computed.FrontCornerY', 'Computed.BeamsLevel')
 
     s = Arch.makeStructure(profile, height=1)
     s.Placement = Placement(Vector(0, 0, 0), Rotation(0, 0, 0))
-    s.setExpression('.Placement.Base.x', 'Computed.LeftCornerX+Config.MetalProfileWidth/2')
-    s.setExpression('.Placement.Base.y', 'Computed.FrontCornerY+Config.MetalProfileHeight/2')
+    set_position(s, 'Computed.LeftCornerX+Config.MetalProfileWidth/2', 'Computed.FrontCornerY+Config.MetalProfileHeight/2')
     s.setExpression('Height', 'Computed.ColumnsSizeHeight')
     s.IfcType = "Column"
     grp.addObject(s)
     # Fasteners
     make_supports(doc, False, grp_sup, 'Fastener')
-    s = Arch.makeStructure(profile, height=1)
-    s.Placement = Placement(Vector(0, 0, 0), Rotation(0, 0, 0))
-    s.setExpression('.Placement.Base.x', 'Computed.RightCornerX-Config.MetalProfileWidth/2')
-    s.setExpression('.Placement.Base.y', 'Computed.FrontCornerY+Config.MetalProfileHeight/2')
-    s.setExpression('Height', 'Computed.ColumnsSizeHeight')
-    s.IfcType = "Column"
-    grp.addObject(s)
-    s = Arch.makeStructure(profile, height=1)
-    s.Placement = Placement(Vector(0, 0, 0), Rotation(0, 0, 0))
-    s.setExpression('.Placement.Base.x', 'Computed.LeftCornerX+Config.MetalProfileWidth/2')
-    s.setExpression('.Placement.Base.y', 'Computed.BackCornerY-Config.MetalProfileHeight/2')
-    s.setExpression('Height', 'Computed.ColumnsSizeHeight')
-    s.IfcType = "Column"
-    grp.addObject(s)
-    s = Arch.makeStructure(profile, height=1)
-    s.Placement = Placement(Vector(0, 0, 0), Rotation(0, 0, 0))
-    s.setExpression('.Placement.Base.x', 'Computed.RightCornerX-Config.MetalProfileWidth/2')
-    s.setExpression('.Placement.Base.y', 'Computed.BackCornerY-Config.MetalProfileHeight/2')
-    s.setExpression('Height', 'Computed.ColumnsSizeHeight')
-    s.IfcType = "Column"
-    grp.addObject(s)
+    repeat(s, 'Structure', 'Computed.RightCornerX-Config.MetalProfileWidth/2', 'Computed.FrontCornerY+Config.MetalProfileHeight/2')
+    repeat(s, 'Structure', 'Computed.LeftCornerX+Config.MetalProfileWidth/2', 'Computed.BackCornerY-Config.MetalProfileHeight/2')
+    repeat(s, 'Structure', 'Computed.RightCornerX-Config.MetalProfileWidth/2', 'Computed.BackCornerY-Config.MetalProfileHeight/2')
     s = Arch.makeStructure(profile, height=1)
     s.Placement = Placement(Vector(0, 1, 0), Rotation(0, 90, 0))
-    s.setExpression('.Placement.Base.x', 'Computed.LeftCornerX+Config.MetalProfileWidth')
-    s.setExpression('.Placement.Base.y', 'Computed.FrontCornerY+Config.MetalProfileHeight/2')
-    s.setExpression('.Placement.Base.z', 'Computed.SumpBeamsLevel')
+    set_position(s, 'Computed.LeftCornerX+Config.MetalProfileWidth', 'Computed.FrontCornerY+Config.MetalProfileHeight/2', 'Computed.SumpBeamsLevel')
     s.setExpression('Height', 'Computed.BeamsSumpSizeWidth')
     s.IfcType = "Beam"
     grp.addObject(s)
+    sump_width = s
     s = Arch.makeStructure(profile, height=1)
     s.Placement = Placement(Vector(0, 1, 0), Rotation(0, 90, -90))
-    s.setExpression('.Placement.Base.x', 'Computed.LeftCornerX+Config.MetalProfileHeight/2')
-    s.setExpression('.Placement.Base.y', 'Computed.FrontCornerY+Config.MetalProfileHeight')
-    s.setExpression('.Placement.Base.z', 'Computed.SumpBeamsLevel')
-    s.setExpression('Height', 'Computed.BeamsSumpSizeLength')
-    s.IfcType = "Beam"
-    grp.addObject(s)
-    s = Arch.makeStructure(profile, height=1)
-    s.Placement = Placement(Vector(0, 1, 0), Rotation(0, 90, -90))
-    s.setExpression('.Placement.Base.x', 'Computed.RightCornerX-Config.MetalProfileHeight/2')
-    s.setExpression('.Placement.Base.y', 'Computed.FrontCornerY+Config.MetalProfileHeight')
-    s.setExpression('.Placement.Base.z', 'Computed.SumpBeamsLevel')
+    set_position(s, 'Computed.LeftCornerX+Config.MetalProfileHeight/2', 'Computed.FrontCornerY+Config.MetalProfileHeight', 'Computed.SumpBeamsLevel')
     s.setExpression('Height', 'Computed.BeamsSumpSizeLength')
     s.IfcType = "Beam"
     grp.addObject(s)
-    s = Arch.makeStructure(profile, height=1)
-    s.Placement = Placement(Vector(0, 1, 0), Rotation(0, 90, 0))
-    s.setExpression('.Placement.Base.x', 'Computed.LeftCornerX+Config.MetalProfileWidth')
-    s.setExpression('.Placement.Base.y', 'Computed.BackCornerY-Config.MetalProfileHeight/2')
-    s.setExpression('.Placement.Base.z', 'Computed.SumpBeamsLevel')
-    s.setExpression('Height', 'Computed.BeamsSumpSizeWidth')
-    s.IfcType = "Beam"
-    grp.addObject(s)
+    repeat(s, 'Structure', 'Computed.RightCornerX-Config.MetalProfileHeight/2', 'Computed.FrontCornerY+Config.MetalProfileHeight', 'Computed.SumpBeamsLevel')
+    repeat(sump_width, 'Structure', 'Computed.LeftCornerX+Config.MetalProfileWidth', 'Computed.BackCornerY-Config.MetalProfileHeight/2', 'Computed.SumpBeamsLevel')
     def make_beam_support(name, posZ):
         s = Arch.makeStructure(profile, height=1, name=name)
         s.Placement = Placement(Vector(0, 1, 0), Rotation(0, 90, 0))
@@ -202,12 +116,13 @@ def makeStandStructure(doc, cut45 = True):
         s.setExpression('.Placement.Rotation.Roll', '0')
         s.setExpression('Height', 'Computed.BeamsSizeMiddle')
         s.IfcType = "Beam"
-        sb = Draft.make_ortho_array(s, v_x=App.Vector(10, 0, 0), v_y=App.Vector(0, 10, 0), v_z=App.Vector(0, 0, 10), n_x=1, n_y=2, n_z=1, use_link=False)
+        sb = Draft.make_ortho_array(s, v_x=App.Vector(10, 0, 0), v_y=App.Vector(0, 10, 0), v_z=App.Vector(0, 0, 10), n_x=1, n_y=2, n_z=1, use_link=links)
         sb.setExpression('.IntervalX.x', 'Computed.BeamsDir>0?0:Computed.StandBeamSpacing')
         sb.setExpression('.IntervalY.y', 'Computed.BeamsDir>0?Computed.StandBeamSpacing:0')
         sb.setExpression('NumberX', 'Computed.BeamsDir>0?1:Config.BeamsStandCount')
         sb.setExpression('NumberY', 'Computed.BeamsDir>0?Config.BeamsStandCount:1')
-        sb.ViewObject.ShapeColor = s.ViewObject.ShapeColor
+        if App.GuiUp and hasattr(sb.ViewObject, 'ShapeColor'):
+            sb.ViewObject.ShapeColor = s.ViewObject.ShapeColor
         grp.addObject(sb)
     make_beam_support('BaseReinforcement', 'Computed.BeamsLevel')
     make_beam_support('SumpReinforcement', 'Computed.SumpBeamsLevel')
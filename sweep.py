@@ -0,0 +1,166 @@
+#****************************************************************************
+# *                                                                          *
+# *   Aquarium                                                               *
+# *   Copyright (c) 2023 LGPL                                                *
+# *                                                                          *
+# *   This program is free software; you can redistribute it and/or modify   *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)     *
+# *   as published by the Free Software Foundation; either version 2 of      *
+# *   the License, or (at your option) any later version.                    *
+# *   for detail see the LICENCE text file.                                  *
+# *                                                                          *
+# *   This program is distributed in the hope that it will be useful,        *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+# *   GNU Library General Public License for more details.                   *
+# *                                                                          *
+# *   You should have received a copy of the GNU Library General Public      *
+# *   License along with this program; if not, write to the Free Software    *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+# *   USA                                                                    *
+# *                                                                          *
+#****************************************************************************
+
+# Evaluates the Computed formulas column-wise over many candidate configurations.
+#
+#   sweep({'Config.Width': range(800, 2010, 100), 'Config.BeamsStandCount': None})
+#
+# returns a structured array with one row per combination, the swept parameters
+# and every Computed alias as fields.
+from functools import reduce
+import numpy as np
+from config import DefaultsConfig, DefaultsPipesDrain, DefautsPipesReturn, DefaultsClosedLoop, DefaultValues, InvalidConfigException, ConfigValueNumeric
+from computed import ComputedEvaluator, Dialect
+
+
+def _max(*args):
+    return reduce(np.maximum, args)
+
+
+def _min(*args):
+    return reduce(np.minimum, args)
+
+
+NUMPY = Dialect(
+    '_where({0}, {1}, {2})',
+    {
+        'abs': '_abs',
+        'min': '_min',
+        'max': '_max',
+        'sqrt': '_sqrt',
+        'floor': '_floor',
+        'ceil': '_ceil',
+        'round': '_round',
+        'trunc': '_trunc',
+        'mod': '_fmod',
+        'pow': '_power',
+    },
+    {
+        '_where': np.where,
+        '_abs': np.abs,
+        '_min': _min,
+        '_max': _max,
+        '_sqrt': np.sqrt,
+        '_floor': np.floor,
+        '_ceil': np.ceil,
+        '_round': np.round,
+        '_trunc': np.trunc,
+        '_fmod': np.fmod,
+        '_power': np.power,
+    })
+
+
+def Definitions():
+    defs = dict()
+    for x in [ DefaultsConfig(dict()), DefaultsPipesDrain(dict()), DefautsPipesReturn(dict()), DefaultsClosedLoop(dict()) ]:
+        defs[x.type()] = x
+    return defs
+
+
+def _definition(defs, parameter):
+    type, _, name = parameter.rpartition('.')
+    if type == '':
+        type = 'Config'
+    try:
+        return type, name, defs[type][name]
+    except KeyError:
+        raise InvalidConfigException(f'Unknown parameter {parameter}')
+
+
+def parameter_range(definition, start=None, stop=None):
+    """Every value allowed by a ConfigValueNumeric between start and stop (inclusive)."""
+    if start is None:
+        start = definition.min
+    if stop is None:
+        stop = definition.max
+    first = np.ceil((max(start, definition.min) - definition.min) / definition.step - 1e-9)
+    last = np.floor((min(stop, definition.max) - definition.min) / definition.step + 1e-9)
+    return definition.min + np.arange(first, last + 1) * definition.step
+
+
+def check_values(definition, values):
+    values = np.asarray(values, dtype=float)
+    if np.any(values < definition.min) or np.any(values > definition.max):
+        raise InvalidConfigException(f'{definition.name} outside [{definition.min}, {definition.max}]')
+    steps = (values - definition.min) / definition.step
+    if np.any(np.abs(steps - np.round(steps)) > 1e-6):
+        raise InvalidConfigException(f'{definition.name} not a multiple of {definition.step} from {definition.min}')
+    return values
+
+
+_evaluator = None
+# Rows evaluated and written at once, small enough for the cache
+CHUNK = 4096
+
+
+def sweep(parameters, base=None, product=True):
+    """Derived dimensions for every combination of the given parameter values.
+
+    parameters maps 'Sheet.Alias' (or just the Config alias) to the values to try,
+    None meaning every value allowed by its min/max/step. With product=False the
+    value lists are zipped instead of combined. base holds the {sheet: {alias: value}}
+    used for the other parameters, the defaults otherwise.
+    """
+    global _evaluator
+    if _evaluator is None:
+        _evaluator = ComputedEvaluator(dialect=NUMPY)
+    defs = Definitions()
+    values = DefaultValues()
+    for type, v in (base or dict()).items():
+        if type not in defs:
+            raise InvalidConfigException(f'Unknown sheet {type}')
+        for name, value in v.items():
+            _, _, definition = _definition(defs, f'{type}.{name}')
+            if isinstance(definition, ConfigValueNumeric):
+                check_values(definition, [value])
+        values[type].update(v)
+    columns = []
+    for parameter, candidates in parameters.items():
+        type, name, definition = _definition(defs, parameter)
+        if candidates is None:
+            candidates = parameter_range(definition)
+        columns.append((type, name, check_values(definition, list(candidates))))
+    if product:
+        grids = np.meshgrid(*[c[2] for c in columns], indexing='ij')
+        arrays = [g.ravel() for g in grids]
+    else:
+        arrays = [c[2] for c in columns]
+        if len({len(a) for a in arrays}) > 1:
+            raise InvalidConfigException('zipped parameters must have the same length')
+    count = len(arrays[0]) if len(arrays) > 0 else 1
+    fields = [f'{type}.{name}' for type, name, _ in columns] + list(_evaluator.order)
+    result = np.empty(count, dtype=[(f, 'f8') for f in fields])
+    # Each chunk is filled column by column then copied row-wise into the records
+    table = result.view(np.float64).reshape(count, len(fields))
+    block = np.empty((len(fields), min(count, CHUNK)))
+    chunk = {type: dict(v) for type, v in values.items()}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for start in range(0, count, CHUNK):
+            stop = min(count, start + CHUNK)
+            for (type, name, _), a in zip(columns, arrays):
+                chunk[type][name] = a[start:stop]
+            rows = [a[start:stop] for a in arrays] + list(_evaluator(chunk).values())
+            for index, v in enumerate(rows):
+                block[index, :stop - start] = v
+            table[start:stop] = block[:, :stop - start].T
+    return result
@@ -21,11 +21,16 @@
 # *                                                                          *
 #****************************************************************************
 
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from math import pi, sqrt
 from FreeCAD import Vector, Placement, Rotation
 import Sketcher
 import Part, Arch, ArchCommands, Draft
 import FreeCAD as App
+from detail import full_detail
+import projcache
 
 
 def measure(doc, page, type, name, proj, *geoms):
@@ -39,20 +44,28 @@ def measure(doc, page, type, name, proj, *geoms):
     return m
 
 
-def add_tech_draw(doc, name, HardHidden, *objs):
+def add_tech_draw(doc, name, HardHidden, *objs, recompute=True):
     print(f"add_tech_draw: {objs}")
+    # Blue prints always show every hole and slot
+    full_detail(doc)
     page = doc.addObject('TechDraw::DrawPage', f'{name}BluePrint')
     tpl = doc.addObject('TechDraw::DrawSVGTemplate', f'{name}Template')
     tpl.Template = App.getResourceDir() + '/Mod/TechDraw/Templates/A4_Landscape_blank.svg'
     page.Template = tpl
     page.Visibility = False
     page.Visibility = True
-    group = doc.addObject("TechDraw::DrawProjGroup", f'{name}Projection')
-    page.addView(group)
     source_grp = []
     for o in objs:
         obj = doc.getObject(o)
         source_grp.append(obj)
+    if HardHidden:
+        # The hidden line removal is the slow part, these views read it from the projection cache
+        projcache.add_cached_views(doc, page, name, source_grp, HardHidden, .05)
+        if recompute:
+            doc.recompute()
+        return page
+    group = doc.addObject("TechDraw::DrawProjGroup", f'{name}Projection')
+    page.addView(group)
     group.Source = source_grp
     group.ProjectionType = "First Angle"
     group.ScaleType = 'Custom'
@@ -75,8 +88,10 @@ def add_tech_draw(doc, name, HardHidden, *objs):
     ftr_view = group.addProjection("FrontTopRight")
     ftr_view.Label = f"Perspective {name}"
     ftr_view.HardHidden = HardHidden
-    group.recompute()
-    doc.recompute()
+    if recompute:
+        group.recompute()
+        doc.recompute()
+    return page
     # measure(doc,group, 'Angle', 'cut45', top_view, 'Edge9', 'Edge0')
     # measure(doc,page, 'DistanceY', 'sump_bottom_space', front_view, 'Edge8', 'Edge15')
 
@@ -88,17 +103,174 @@ def clear_log():
     r=mw.findChild(QtGui.QTextEdit, "Report view")
     r.clear()
 
+# Page name, hard hidden lines and source objects of every blue print,
+# the pages with hidden lines are drawn from the projection cache
+BLUEPRINTS = [
+    ('Base', False, ('StandStructure',)),
+    ('LevelingBase', False, ('LevelingBase',)),
+    ('GlassPanelBase', True, ('BottomGlassDrilled',)),
+    ('GlassPanelsSides', True, ('SidesGlass',)),
+    ('GlassEuroBraceWeirBase', True, ('GlassBracesWeirFrame',)),
+    ('GlassEuroBraceSuperior', True, ('GlassBracesTop',)),
+    ('GlassEuroBraceInferior', True, ('GlassBracesBottom',)),
+    ]
+
+
+def draw(doc, name):
+    for n, HardHidden, objs in BLUEPRINTS:
+        if n == name:
+            return add_tech_draw(doc, n, HardHidden, *objs)
+    raise KeyError(name)
+
+
+def draw_all(doc):
+    """Add every missing blue print page and recompute the document once for all of them."""
+    full_detail(doc)
+    pages = []
+    for name, HardHidden, objs in BLUEPRINTS:
+        if doc.getObject(f'{name}BluePrint') is not None:
+            continue
+        if None in [doc.getObject(o) for o in objs]:
+            print(f"Skipping {name} blue print, {', '.join(objs)} not generated")
+            continue
+        pages.append(add_tech_draw(doc, name, HardHidden, *objs, recompute=False))
+    projcache.recompute(doc)
+    return pages
+
+
+def blueprint_pages(doc):
+    return [o for o in doc.Objects if o.TypeId == 'TechDraw::DrawPage']
+
+
+def template_svg(page, width, height):
+    # The filled in template nested at the page size, empty when it cannot be read
+    import xml.etree.ElementTree as ET
+    template = page.Template
+    if template is None:
+        return ''
+    path = getattr(template, 'PageResult', '') or getattr(template, 'Template', '')
+    if not path or not os.path.isfile(path):
+        return ''
+    ET.register_namespace('', 'http://www.w3.org/2000/svg')
+    ET.register_namespace('xlink', 'http://www.w3.org/1999/xlink')
+    try:
+        root = ET.parse(path).getroot()
+    except ET.ParseError:
+        return ''
+    root.set('width', f'{width:g}')
+    root.set('height', f'{height:g}')
+    return ET.tostring(root, encoding='unicode') + '\n'
+
+
+def page_svg(page):
+    """SVG of a page without the GUI: the template and the projected views.
+
+    Dimensions and annotations are only drawn by the TechDraw GUI, they are
+    in the PDF of export_pdf but not here."""
+    import TechDraw
+    width = page.Template.Width.Value if page.Template else 297
+    height = page.Template.Height.Value if page.Template else 210
+    groups = []
+    for v in page.OutListRecursive:
+        if projcache.is_cached_view(v):
+            body = v.Symbol[len(projcache.SVG_HEAD):-len(projcache.SVG_TAIL)]
+            groups.append(f'<g id="{v.Name}" transform="translate({v.X.Value:.3f},{height - v.Y.Value:.3f}) scale({v.Scale:g})">\n{body}</g>')
+            continue
+        if not v.isDerivedFrom('TechDraw::DrawViewPart'):
+            continue
+        x, y = v.X.Value, v.Y.Value
+        # Views of a projection group are placed relative to the group
+        for parent in v.InList:
+            if parent.isDerivedFrom('TechDraw::DrawProjGroup'):
+                x += parent.X.Value
+                y += parent.Y.Value
+        # Page Y goes up, the view geometry is already mirrored for SVG
+        groups.append(f'<g id="{v.Name}" transform="translate({x:.3f},{height - y:.3f})">\n{TechDraw.viewPartAsSvg(v)}\n</g>')
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:g}mm" height="{height:g}mm" viewBox="0 0 {width:g} {height:g}">\n'
+            + template_svg(page, width, height) + '\n'.join(groups) + '\n</svg>\n')
+
+
+def cached_dxf(page, path):
+    """DXF of the cached views of a page, writeDXFPage only knows the TechDraw part views."""
+    entities = []
+    for v in page.OutListRecursive:
+        if not projcache.is_cached_view(v):
+            continue
+        for hidden, line in projcache.view_polylines(v):
+            points = [(v.X.Value + x * v.Scale, v.Y.Value + y * v.Scale) for x, y in line]
+            for (x1, y1), (x2, y2) in zip(points, points[1:]):
+                entities.append(f"0\nLINE\n8\n{'Hidden' if hidden else 'Visible'}\n"
+                                f"10\n{x1:.4f}\n20\n{y1:.4f}\n30\n0.0\n11\n{x2:.4f}\n21\n{y2:.4f}\n31\n0.0\n")
+    with open(path, 'w') as f:
+        f.write('0\nSECTION\n2\nENTITIES\n' + ''.join(entities) + '0\nENDSEC\n0\nEOF\n')
+
+
+def export_worker(path, pages, folder, formats):
+    # Runs in FreeCADCmd: the model shapes are read from the file, only the views are computed
+    import TechDraw
+    doc = App.openDocument(path)
+    for name in pages:
+        page = doc.getObject(name)
+        views = [v for v in page.OutListRecursive if v.isDerivedFrom('TechDraw::DrawView')]
+        for v in views:
+            v.touch()
+        doc.recompute(views + [page])
+        base = os.path.join(folder, page.Label)
+        if 'svg' in formats:
+            with open(base + '.svg', 'w') as f:
+                f.write(page_svg(page))
+        if 'dxf' in formats:
+            if any([projcache.is_cached_view(v) for v in views]):
+                cached_dxf(page, base + '.dxf')
+            else:
+                TechDraw.writeDXFPage(page, base + '.dxf')
+    App.closeDocument(doc.Name)
+
+
+def export_pages(doc, folder, workers=None, formats=('svg', 'dxf'), freecad='FreeCADCmd', timeout=None):
+    """Export the blue print pages to SVG/DXF, one FreeCADCmd process per page, at most workers at once.
+
+    The SVG has no dimensions or annotations, see page_svg. PDF export needs
+    the GUI and is not done here, see export_pdf."""
+    from batch import run_freecad
+    os.makedirs(folder, exist_ok=True)
+    pages = [p.Name for p in blueprint_pages(doc)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory(prefix='aquarium') as temp:
+        path = os.path.join(temp, 'blueprints.FCStd')
+        doc.saveCopy(path)
+
+        def export(name):
+            call = f'import techdraw; techdraw.export_worker({path!r}, {[name]!r}, {folder!r}, {list(formats)!r})'
+            result = run_freecad(call, os.path.join(folder, name + '.log'), freecad, timeout)
+            result['page'] = name
+            print(f"{name}: {result['status']} in {result['seconds']:.1f}s")
+            return result
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(export, pages))
+
+
+def export_pdf(doc, folder):
+    """Complete pages as PDF, one after the other in the GUI: FreeCADCmd cannot print them."""
+    import TechDrawGui
+    os.makedirs(folder, exist_ok=True)
+    for page in blueprint_pages(doc):
+        TechDrawGui.exportPageAsPdf(page, os.path.join(folder, page.Label + '.pdf'))
+
+
 def draw_structure(doc):
-    add_tech_draw(doc, 'Base', False, 'StandStructure')
+    draw(doc, 'Base')
 def draw_base(doc):
-    add_tech_draw(doc, 'LevelingBase', False, 'LevelingBase')
+    draw(doc, 'LevelingBase')
 def draw_bottom_glass(doc):
-    add_tech_draw(doc, 'GlassPanelBase', True, 'BottomGlassDrilled')
+    draw(doc, 'GlassPanelBase')
 def draw_side_glass(doc):
-    add_tech_draw(doc, 'GlassPanelsSides', True,'SidesGlass') # 'LeftGlass', 'RightGlass', 'BackGlass', 'FrontGlass')
+    draw(doc, 'GlassPanelsSides')
 def draw_braces_base(doc):
-    add_tech_draw(doc, 'GlassEuroBraceWeirBase', True, 'GlassBracesWeirFrame')
+    draw(doc, 'GlassEuroBraceWeirBase')
 def draw_braces_top(doc):
-    add_tech_draw(doc, 'GlassEuroBraceSuperior', True, 'GlassBracesTop')
+    draw(doc, 'GlassEuroBraceSuperior')
 def draw_braces_bottom(doc):
-    add_tech_draw(doc, 'GlassEuroBraceInferior', True, 'GlassBracesBottom')
+    draw(doc, 'GlassEuroBraceInferior')
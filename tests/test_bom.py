@@ -0,0 +1,89 @@
+#****************************************************************************
+# *                                                                          *
+# *   Aquarium                                                               *
+# *   Copyright (c) 2023 LGPL                                                *
+# *                                                                          *
+# *   This program is free software; you can redistribute it and/or modify   *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)     *
+# *   as published by the Free Software Foundation; either version 2 of      *
+# *   the License, or (at your option) any later version.                    *
+# *   for detail see the LICENCE text file.                                  *
+# *                                                                          *
+# *   This program is distributed in the hope that it will be useful,        *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+# *   GNU Library General Public License for more details.                   *
+# *                                                                          *
+# *   You should have received a copy of the GNU Library General Public      *
+# *   License along with this program; if not, write to the Free Software    *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+# *   USA                                                                    *
+# *                                                                          *
+#****************************************************************************
+
+import pytest
+from bom import document_options, items
+from clearance import flange_positions, nozzle_positions
+from computed import evaluate
+from config import DefaultValues, InvalidConfigException, flange_layout
+
+
+def test_every_group():
+    rows = list(items())
+    assert {i.group for i in rows} == {'StandStructure', 'StandPanels', 'LevelingBase', 'Glasses', 'Weir', 'Flanges', 'Pipes', 'ClosedLoop', 'CanopyStructure', 'CanopyPanels'}
+    assert all(i.quantity > 0 for i in rows)
+
+
+def test_holes():
+    values = DefaultValues()
+    cmp = evaluate(values)
+    layout = flange_layout()
+    rows = list(items(steps={'Flanges', 'Glasses'}))
+    flanges = [i for i in rows if i.group == 'Flanges']
+    holes = [i for i in rows if i.source == ('HolesGlass', None)]
+    assert [(i.x, i.y) for i in flanges] == [(x, y) for _, _, x, y in flange_positions(values['Config'], cmp, [t for t, _ in layout])]
+    assert len(holes) == len(layout) + len(nozzle_positions(cmp))
+
+
+def test_values():
+    rows = list(items({'Config': {'Width': 1800, 'BeamsStandCount': 3}}, steps={'StandStructure'}))
+    by_name = {i.name: i for i in rows}
+    assert by_name['TopBeamWidth45'].length == 1800
+    assert by_name['BaseReinforcement'].quantity == 3
+
+
+def test_unknown_parameter():
+    with pytest.raises(InvalidConfigException):
+        list(items({'Config': {'Widht': 1800}}))
+    with pytest.raises(InvalidConfigException):
+        list(items({'Conifg': {'Width': 1800}}))
+
+
+class FakeObject:
+
+    def __init__(self, name, group=(), expressions=()):
+        self.Name = name
+        self.Group = list(group)
+        self.ExpressionEngine = list(expressions)
+
+
+class FakeDocument:
+
+    def __init__(self, objects):
+        self.Objects = objects
+
+    def getObject(self, name):
+        return next((o for o in self.Objects if o.Name == name), None)
+
+
+def test_document_options():
+    layout = [('Return', 'ReturnWaterLevel'), ('Drain', 'BeanAnimalMainDrainLevel'), ('Drain', 'BeanAnimalEmergencyDrainLevel')]
+    flanges = [FakeObject(f'Flange{type}_{i + 2}') for i, (type, level) in enumerate(layout)]
+    pipes = [FakeObject(f'PipesWeir{type}_{i}', [FakeObject(f'Pipe{i}', expressions=[('Length', f'Config.{level}+Computed.WaterLevelDeepest')])])
+             for i, (type, level) in enumerate(layout)]
+    doc = FakeDocument([FakeObject('Flanges', reversed(flanges))] + flanges + pipes + [FakeObject('LeftGlass')])
+    options = document_options(doc)
+    assert options == {'layout': layout, 'cut45': False, 'glass_cut45': True}
+    rows = list(items(steps={'Flanges'}, **options))
+    assert len(rows) == 3
+    assert document_options(FakeDocument([]))['layout'] == flange_layout()
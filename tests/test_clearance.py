@@ -0,0 +1,54 @@
+#****************************************************************************
+# *                                                                          *
+# *   Aquarium                                                               *
+# *   Copyright (c) 2023 LGPL                                                *
+# *                                                                          *
+# *   This program is free software; you can redistribute it and/or modify   *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)     *
+# *   as published by the Free Software Foundation; either version 2 of      *
+# *   the License, or (at your option) any later version.                    *
+# *   for detail see the LICENCE text file.                                  *
+# *                                                                          *
+# *   This program is distributed in the hope that it will be useful,        *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+# *   GNU Library General Public License for more details.                   *
+# *                                                                          *
+# *   You should have received a copy of the GNU Library General Public      *
+# *   License along with this program; if not, write to the Free Software    *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+# *   USA                                                                    *
+# *                                                                          *
+#****************************************************************************
+
+from clearance import Circle, Rect, check, circle_inside_rect, circle_rect_overlap, circles_overlap, errors
+from config import flange_layout
+
+
+def test_shapes():
+    r = Rect('r', 0, 0, 10, 10)
+    assert circle_inside_rect(Circle('c', 5, 5, 5), r)
+    assert not circle_inside_rect(Circle('c', 5, 5, 6), r)
+    assert circle_rect_overlap(Circle('c', 12, 5, 3), r)
+    assert not circle_rect_overlap(Circle('c', 13, 5, 3), r)
+    # Touching is not a clash
+    assert not circles_overlap(Circle('a', 0, 0, 1), Circle('b', 2, 0, 1))
+    assert circles_overlap(Circle('a', 0, 0, 1), Circle('b', 1.9, 0, 1))
+
+
+def test_layout():
+    assert [t for t, _ in flange_layout()] == ['Return', 'Drain', 'Drain', 'Drain', 'Drain', 'Return']
+    assert [t for t, _ in flange_layout(returns=3)] == ['Return', 'Return', 'Drain', 'Drain', 'Drain', 'Drain', 'Return']
+
+
+def test_defaults_fit():
+    assert errors(check(dict())) == []
+
+
+def test_flange_outside_weir():
+    clashes = errors(check({'ConfigPipesDrain': {'FlangeDiameter': 400}}))
+    assert any(c.second == 'Weir' and c.first.startswith('FlangeDrain') for c in clashes)
+
+
+def test_flanges_argument():
+    assert len(check(dict(), flanges=['Drain'] * 20)) > len(check(dict()))
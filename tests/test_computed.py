@@ -0,0 +1,77 @@
+#****************************************************************************
+# *                                                                          *
+# *   Aquarium                                                               *
+# *   Copyright (c) 2023 LGPL                                                *
+# *                                                                          *
+# *   This program is free software; you can redistribute it and/or modify   *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)     *
+# *   as published by the Free Software Foundation; either version 2 of      *
+# *   the License, or (at your option) any later version.                    *
+# *   for detail see the LICENCE text file.                                  *
+# *                                                                          *
+# *   This program is distributed in the hope that it will be useful,        *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+# *   GNU Library General Public License for more details.                   *
+# *                                                                          *
+# *   You should have received a copy of the GNU Library General Public      *
+# *   License along with this program; if not, write to the Free Software    *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+# *   USA                                                                    *
+# *                                                                          *
+#****************************************************************************
+
+import pytest
+from config import DefaultValues
+from computed import ComputedEvaluator, FormulaError, evaluate
+
+
+def test_operators():
+    e = ComputedEvaluator([
+        ('A', '=2+3*4^2', None),
+        ('B', '=-A/2', None),
+        ('C', '=A>B?1:0', None),
+        ('D', '=max(1;min(A;3);2) + mod(7;3)', None),
+        ('E', '=Config.Width*2', None),
+        ('F', '12', None),
+        ])
+    v = e({'Config': {'Width': 5}})
+    assert v == {'A': 50, 'B': -25, 'C': 1, 'D': 4, 'E': 10, 'F': 12}
+
+
+def test_order_and_dependents():
+    e = ComputedEvaluator([('C', '=B+1', None), ('B', '=A*2', None), ('A', '=Config.Width', None), ('D', '=Config.Length', None)])
+    assert e.order.index('A') < e.order.index('B') < e.order.index('C')
+    assert e.dependents([('Config', 'Width')]) == ['A', 'B', 'C']
+
+
+def test_errors():
+    with pytest.raises(FormulaError):
+        ComputedEvaluator([('A', '=B', None), ('B', '=A', None)])
+    with pytest.raises(FormulaError):
+        ComputedEvaluator([('A', '=Missing+1', None)])
+    with pytest.raises(FormulaError):
+        ComputedEvaluator([('A', '=Config.Width', None)])({'Config': dict()})
+
+
+@pytest.mark.parametrize('width,length', [(1200, 600), (500, 900)])
+def test_defaults(width, length):
+    values = DefaultValues()
+    values['Config'].update({'Width': width, 'Length': length})
+    cfg = values['Config']
+    drain, ret = values['ConfigPipesDrain'], values['ConfigPipesReturn']
+    v = evaluate(values)
+    beams_dir = 0 if width > length else 1
+    spacing = ((length if beams_dir else width) - cfg['MetalProfileHeight']) / (cfg['BeamsStandCount'] + 1)
+    weir_center = max(drain['FlangeFreeDiameterTop'] / 2 + cfg['SidesGlassThickness'], drain['PipeDiameter'] / 2 + cfg['MetalProfileHeight'],
+                      drain['FlangeFreeDiameterBottom'] / 2, ret['FlangeFreeDiameterTop'] / 2 + cfg['SidesGlassThickness'],
+                      ret['PipeDiameter'] / 2 + cfg['MetalProfileHeight'], ret['FlangeFreeDiameterBottom'] / 2)
+    water = cfg['StandVisibleHeight'] - cfg['HideExtraBottom'] - cfg['SidesGlassThickness']
+    assert v['BeamsDir'] == beams_dir
+    assert v['LeftCornerX'] == -width / 2
+    assert v['BeamsSizeMiddle'] == min(width, length) - cfg['MetalProfileWidth']
+    assert v['StandBeamSpacing'] == pytest.approx(spacing)
+    assert v['WeirDepth'] == pytest.approx(2 * weir_center)
+    assert v['FlangesY'] == pytest.approx(length / 2 - weir_center - cfg['SidesGlassThickness'])
+    assert v['ColumnsSizeHeight'] == pytest.approx(water - cfg['BottomGlassThickness'] - cfg['UnderGlassLevelingBaseThickness'] - cfg['MetalProfileWidth'])
+    assert v['WeirInsideWidth'] == pytest.approx(width - 2 * (cfg['BraceWidth'] + cfg['SidesGlassThickness']) - 2 * cfg['SidesGlassThickness'])
@@ -0,0 +1,80 @@
+#****************************************************************************
+# *                                                                          *
+# *   Aquarium                                                               *
+# *   Copyright (c) 2023 LGPL                                                *
+# *                                                                          *
+# *   This program is free software; you can redistribute it and/or modify   *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)     *
+# *   as published by the Free Software Foundation; either version 2 of      *
+# *   the License, or (at your option) any later version.                    *
+# *   for detail see the LICENCE text file.                                  *
+# *                                                                          *
+# *   This program is distributed in the hope that it will be useful,        *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+# *   GNU Library General Public License for more details.                   *
+# *                                                                          *
+# *   You should have received a copy of the GNU Library General Public      *
+# *   License along with this program; if not, write to the Free Software    *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+# *   USA                                                                    *
+# *                                                                          *
+#****************************************************************************
+
+import random
+import pytest
+from cutting import best_fit_decreasing, exact, first_fit_decreasing, lower_bound
+
+
+def brute_force(lengths, stock, kerf):
+    # Fewest bars over every assignment, a piece only opens the next new bar
+    best = [len(lengths)]
+
+    def place(i, free):
+        if len(free) >= best[0]:
+            return
+        if i == len(lengths):
+            best[0] = len(free)
+            return
+        need = lengths[i] + kerf
+        for b in range(len(free)):
+            if free[b] >= need - 1e-9:
+                free[b] -= need
+                place(i + 1, free)
+                free[b] += need
+        free.append(stock + kerf - need)
+        place(i + 1, free)
+        free.pop()
+
+    place(0, [])
+    return best[0]
+
+
+def valid(bars, pieces, stock, kerf):
+    assert sorted([p for b in bars for p in b.pieces]) == sorted(pieces)
+    for b in bars:
+        assert b.used == pytest.approx(sum([l for _, l in b.pieces]) + kerf * (len(b.pieces) - 1))
+        assert b.used <= stock + 1e-9
+        assert b.waste == pytest.approx(stock - b.used)
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_exact_is_optimal(seed):
+    rng = random.Random(seed)
+    stock, kerf = 1000, rng.choice([0, 3])
+    pieces = [(f'P{i}', rng.randint(150, 700)) for i in range(rng.randint(3, 9))]
+    optimum = brute_force([l for _, l in pieces], stock, kerf)
+    bars, proven = exact(pieces, stock, kerf)
+    valid(bars, pieces, stock, kerf)
+    assert proven
+    assert len(bars) == optimum
+    for heuristic in (first_fit_decreasing, best_fit_decreasing):
+        bars = heuristic(pieces, stock, kerf)
+        valid(bars, pieces, stock, kerf)
+        assert len(bars) >= optimum
+    assert lower_bound(pieces, stock, kerf) <= optimum
+
+
+def test_too_long():
+    with pytest.raises(ValueError):
+        best_fit_decreasing([('A', 1200)], 1000)
@@ -0,0 +1,59 @@
+#****************************************************************************
+# *                                                                          *
+# *   Aquarium                                                               *
+# *   Copyright (c) 2023 LGPL                                                *
+# *                                                                          *
+# *   This program is free software; you can redistribute it and/or modify   *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)     *
+# *   as published by the Free Software Foundation; either version 2 of      *
+# *   the License, or (at your option) any later version.                    *
+# *   for detail see the LICENCE text file.                                  *
+# *                                                                          *
+# *   This program is distributed in the hope that it will be useful,        *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+# *   GNU Library General Public License for more details.                   *
+# *                                                                          *
+# *   You should have received a copy of the GNU Library General Public      *
+# *   License along with this program; if not, write to the Free Software    *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+# *   USA                                                                    *
+# *                                                                          *
+#****************************************************************************
+
+import random
+import pytest
+from nesting import METHODS, nest, utilization
+
+
+def overlap(a, b, kerf):
+    return a.x < b.x + b.length + kerf and b.x < a.x + a.length + kerf and a.y < b.y + b.width + kerf and b.y < a.y + a.width + kerf
+
+
+@pytest.mark.parametrize('method', list(METHODS))
+@pytest.mark.parametrize('seed', range(10))
+def test_no_overlap(method, seed):
+    rng = random.Random(seed)
+    length, width, kerf = 2000, 1000, rng.choice([0, 4])
+    parts = [(f'P{i}', rng.randint(50, 900), rng.randint(50, 900)) for i in range(rng.randint(5, 40))]
+    sheets = nest(parts, length, width, kerf, method)
+    placed = [p for s in sheets for p in s.parts]
+    assert sorted([p.name for p in placed]) == sorted([n for n, _, _ in parts])
+    sizes = {n: (l, w) for n, l, w in parts}
+    for s in sheets:
+        for p in s.parts:
+            size = (p.width, p.length) if p.rotated else (p.length, p.width)
+            assert size == sizes[p.name]
+            assert p.x >= 0 and p.y >= 0
+            assert p.x + p.length <= length + 1e-9 and p.y + p.width <= width + 1e-9
+        for i in range(len(s.parts)):
+            for j in range(i + 1, len(s.parts)):
+                assert not overlap(s.parts[i], s.parts[j], kerf - 1e-9)
+    assert 0 < utilization(sheets) <= 1
+
+
+def test_no_rotation():
+    sheets = nest([('A', 900, 100)], 1000, 500, rotate=False)
+    assert not sheets[0].parts[0].rotated
+    with pytest.raises(ValueError):
+        nest([('A', 100, 900)], 1000, 500, rotate=False)
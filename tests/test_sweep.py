@@ -0,0 +1,69 @@
+#****************************************************************************
+# *                                                                          *
+# *   Aquarium                                                               *
+# *   Copyright (c) 2023 LGPL                                                *
+# *                                                                          *
+# *   This program is free software; you can redistribute it and/or modify   *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)     *
+# *   as published by the Free Software Foundation; either version 2 of      *
+# *   the License, or (at your option) any later version.                    *
+# *   for detail see the LICENCE text file.                                  *
+# *                                                                          *
+# *   This program is distributed in the hope that it will be useful,        *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of         *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the          *
+# *   GNU Library General Public License for more details.                   *
+# *                                                                          *
+# *   You should have received a copy of the GNU Library General Public      *
+# *   License along with this program; if not, write to the Free Software    *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307   *
+# *   USA                                                                    *
+# *                                                                          *
+#****************************************************************************
+
+import numpy as np
+import pytest
+from computed import evaluate
+from config import InvalidConfigException
+from sweep import CHUNK, sweep
+
+
+def test_matches_scalar():
+    widths = [600, 1200, 2400]
+    counts = [0, 3, 10]
+    result = sweep({'Config.Width': widths, 'BeamsStandCount': counts})
+    assert len(result) == len(widths) * len(counts)
+    for row in result:
+        expected = evaluate({'Config': {'Width': row['Config.Width'], 'BeamsStandCount': row['Config.BeamsStandCount']}})
+        for name, value in expected.items():
+            assert row[name] == pytest.approx(value), name
+
+
+def test_zip():
+    result = sweep({'Width': [800, 1000], 'Length': [500, 700]}, product=False)
+    assert list(result['Config.Width']) == [800, 1000]
+    assert list(result['Config.Length']) == [500, 700]
+    assert np.allclose(result['BeamsSizeLength'], [500, 700])
+    with pytest.raises(InvalidConfigException):
+        sweep({'Width': [800, 1000], 'Length': [500]}, product=False)
+
+
+def test_base():
+    result = sweep({'Width': [800, 1000]}, base={'Config': {'Length': 700}})
+    assert np.allclose(result['BeamsSizeLength'], 700)
+    with pytest.raises(InvalidConfigException):
+        sweep({'Width': [800]}, base={'Conifg': {'Length': 700}})
+    with pytest.raises(InvalidConfigException):
+        sweep({'Width': [800]}, base={'Config': {'Lenght': 700}})
+    with pytest.raises(InvalidConfigException):
+        sweep({'Width': [800]}, base={'Config': {'Length': 10 ** 6}})
+
+
+def test_chunks():
+    # More rows than one chunk, each row checked against the scalar evaluator at the chunk edges
+    result = sweep({'Width': None, 'BeamsStandCount': None})
+    assert len(result) > CHUNK
+    for index in (0, CHUNK - 1, CHUNK, len(result) - 1):
+        row = result[index]
+        expected = evaluate({'Config': {'Width': row['Config.Width'], 'BeamsStandCount': row['Config.BeamsStandCount']}})
+        assert row['StandBeamSpacing'] == pytest.approx(expected['StandBeamSpacing'])
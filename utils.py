@@ -23,12 +23,18 @@
 from FreeCAD import Vector, Placement, Rotation
 import Part, Draft
 import FreeCAD as App
+from panels import panel_table
 
-def glass_color(obj):
-    obj.ViewObject.ShapeColor=(0.0, 1/3, 0.0)
-    obj.ViewObject.Transparency=80
+def set_view(obj, **properties):
+    # View properties only exist with the GUI, FreeCADCmd has no ViewObject
+    if App.GuiUp:
+        for name, value in properties.items():
+            setattr(obj.ViewObject, name, value)
     return obj
 
+def glass_color(obj):
+    return set_view(obj, ShapeColor=(0.0, 1/3, 0.0), Transparency=80)
+
 def make_panel(doc, grp, name, px, py, pz, l, w, h):
     g = doc.addObject('Part::Box', name)
     g.setExpression('.Placement.Base.x', px)
@@ -42,57 +48,24 @@ def make_panel(doc, grp, name, px, py, pz, l, w, h):
         grp.addObject(g)
     return g
 
-def make_fastener(doc, baseOrPanel, grp, name, x, y, direction, upcorner=False):
+PROTOTYPES = 'FastenerPrototypes'
+
+def prototype_group(doc):
+    # Kept out of the generated groups so exports and blue prints skip them
+    grp = doc.getObject(PROTOTYPES)
+    if grp is None:
+        grp = doc.addObject('App::DocumentObjectGroup', PROTOTYPES)
+        grp.Visibility = False
+    return grp
+
+def make_fastener_prototype(doc, baseOrPanel, name, inner=True, upcorner=False):
+    # Built once at the origin, every fastener of the same variant links to it
+    base = doc.addObject('App::Part', name)
+    prototype_group(doc).addObject(base)
     if baseOrPanel:
         screwBase = 'Config.PanelMountThickness'
-        if direction <= 3:
+        if inner:
             screwBase += '+Config.PanelMountThickness*10'
-    elif direction==0:
-        y+='+Config.PanelMountInset'
-    elif direction==1:
-        x+='-Config.PanelMountInset'
-    elif direction==2:
-        y+='-Config.PanelMountInset'
-    elif direction==3:
-        x+='+Config.PanelMountInset'
-    elif direction==4:
-        y+='-Config.PanelMountInset'
-    elif direction==5:
-        x+='+Config.PanelMountInset'
-    elif direction==6:
-        y+='+Config.PanelMountInset'
-    else:
-        x+='-Config.PanelMountInset'
-    direction = direction % 4
-    base = doc.addObject('App::Part', name)
-    if direction==0:
-        x+='+Config.MetalProfileWidth'
-    elif direction==1:
-        y+='+Config.MetalProfileHeight'
-    elif direction==2:
-        x+='-Config.MetalProfileWidth'
-    else:
-        y+='-Config.MetalProfileHeight'
-    if upcorner:
-        z = 'Computed.ColumnsSizeHeight-Computed.PanelFastenerSizeVertical'
-        edge = 8
-    else:
-        z= 'Computed.SumpBeamsLevel+Config.MetalProfileWidth/2'
-        edge = 6
-    calcX = grp.evalExpression(x)
-    calcY = grp.evalExpression(y)
-    calcZ = grp.evalExpression(z)
-    pos = Vector(calcX, calcY, calcZ)
-    angle = direction*90
-    rot = Rotation(angle, 0, 0)
-    halfThick = grp.evalExpression('Config.PanelMountThickness') / 2
-    pivot = Vector(0, halfThick, 0)
-    base.Placement = Placement(pos, rot, pivot)
-    base.setExpression('.Placement.Base.x', x)
-    base.setExpression('.Placement.Base.y', y)
-    base.setExpression('.Placement.Base.z', z)
-    grp.addObject(base)
-    if baseOrPanel:
         b = doc.addObject('Part::Box', f'{name}Square')
         b.setExpression('Length', 'Computed.PanelFastenerSizeHorizontal')
         b.setExpression('Width', 'Config.PanelBlockThickness')
@@ -119,21 +92,18 @@ def make_fastener(doc, baseOrPanel, grp, name, x, y, direction, upcorner=False):
         screws.setExpression('NumberX', 'Config.PanelMountHoleCountHorizontal')
         base.addObject(c)
         base.addObject(screws)
-        #grp.addObject(screws)
     else:
+        edge = 8 if upcorner else 6
         b = doc.addObject('Part::Box', f'{name}Square')
         b.setExpression('Length', 'Computed.PanelFastenerSizeHorizontal')
         b.setExpression('Width', 'Config.PanelMountThickness')
         b.setExpression('Height', 'Computed.PanelFastenerSizeVertical')
-        #grp.addObject(b)
         chamfsize = 10
         edges = [(edge, chamfsize, chamfsize)]
         c = doc.addObject('Part::Chamfer', f'{name}Chamfered')
         c.Base = b
         c.Edges = edges
-        #grp.addObject(c)
         hole = doc.addObject('Part::Cylinder', f'{name}IndexHole')
-        #holes = doc.addObject('App::Part', f'{name}Holes')
         holerot = Rotation(Vector(1,0,0), 90)
         holecenter = hole.Placement.Base
         hole.Placement = Placement(holecenter, holerot)
@@ -142,38 +112,141 @@ def make_fastener(doc, baseOrPanel, grp, name, x, y, direction, upcorner=False):
         hole.setExpression('.Placement.Base.z', 'Config.PanelMountHoleBorderSpacing')
         hole.setExpression('Radius', 'Config.PanelMountHoleDiameter/2')
         hole.setExpression('Height', 'Config.PanelMountThickness*3')
-        #grp.addObject(hole)
         holes = Draft.make_ortho_array(hole, v_x=App.Vector(10, 0, 0), v_y=App.Vector(0, 10, 0), v_z=App.Vector(0, 0, 10), n_x=1, n_y=1, n_z=1, use_link=False)
         holes.setExpression('.IntervalX.x', 'Config.PanelMountHoleSpacing')
         holes.setExpression('.IntervalZ.z', 'Config.PanelMountHoleSpacing')
         holes.setExpression('NumberZ', 'Config.PanelMountHoleCountVertical')
         holes.setExpression('NumberX', 'Config.PanelMountHoleCountHorizontal')
-        #grp.addObject(holes)
         drilled = doc.addObject("Part::Cut", f'{name}Drilled')
         drilled.Base = c
         drilled.Tool = holes
-        grp.addObject(drilled)
         base.Group = [ drilled ]
         b.Visibility = False
         c.Visibility = False
         holes.Visibility = False
+    base.Visibility = False
     return base
 
-def make_fasteners(doc, baseOrPanel, grp, name, x, y, direction):
-    make_fastener(doc, baseOrPanel, grp, f'{name}{direction}Top', x, y, direction, True)
-    make_fastener(doc, baseOrPanel, grp, f'{name}{direction}Bottom', x, y, direction, False)
+def fastener_variant(baseOrPanel, direction, upcorner):
+    # Panel blocks only differ by the screw depth, mount plates by the chamfered edge
+    if baseOrPanel:
+        return ('Inner' if direction <= 3 else 'Outer')
+    return ('Top' if upcorner else 'Bottom')
+
+def make_fastener(doc, baseOrPanel, grp, name, x, y, direction, upcorner=False, prototypes=None):
+    if prototypes is None:
+        prototypes = dict()
+    variant = fastener_variant(baseOrPanel, direction, upcorner)
+    if variant not in prototypes:
+        prototypes[variant] = make_fastener_prototype(doc, baseOrPanel, f'{name}Prototype{variant}', variant == 'Inner', variant == 'Top')
+    if not baseOrPanel:
+        if direction==0:
+            y+='+Config.PanelMountInset'
+        elif direction==1:
+            x+='-Config.PanelMountInset'
+        elif direction==2:
+            y+='-Config.PanelMountInset'
+        elif direction==3:
+            x+='+Config.PanelMountInset'
+        elif direction==4:
+            y+='-Config.PanelMountInset'
+        elif direction==5:
+            x+='+Config.PanelMountInset'
+        elif direction==6:
+            y+='+Config.PanelMountInset'
+        else:
+            x+='-Config.PanelMountInset'
+    direction = direction % 4
+    if direction==0:
+        x+='+Config.MetalProfileWidth'
+    elif direction==1:
+        y+='+Config.MetalProfileHeight'
+    elif direction==2:
+        x+='-Config.MetalProfileWidth'
+    else:
+        y+='-Config.MetalProfileHeight'
+    if upcorner:
+        z = 'Computed.ColumnsSizeHeight-Computed.PanelFastenerSizeVertical'
+    else:
+        z= 'Computed.SumpBeamsLevel+Config.MetalProfileWidth/2'
+    base = make_instance(doc, prototypes[variant], name)
+    base.Placement = Placement(Vector(0, 0, 0), Rotation(direction*90, 0, 0))
+    set_position(base, x, y, z)
+    grp.addObject(base)
+    return base
+
+def make_fasteners(doc, baseOrPanel, grp, name, x, y, direction, prototypes=None):
+    make_fastener(doc, baseOrPanel, grp, f'{name}{direction}Top', x, y, direction, True, prototypes)
+    make_fastener(doc, baseOrPanel, grp, f'{name}{direction}Bottom', x, y, direction, False, prototypes)
 
 def make_supports(doc, baseOrPanel, grp_sup, name):
-    make_fasteners(doc, baseOrPanel, grp_sup, name, 'Computed.LeftCornerX', 'Computed.FrontCornerY', 0)
-    make_fasteners(doc, baseOrPanel, grp_sup, name, 'Computed.RightCornerX', 'Computed.FrontCornerY', 1)
-    make_fasteners(doc, baseOrPanel, grp_sup, name, 'Computed.RightCornerX', 'Computed.BackCornerY', 2)
-    make_fasteners(doc, baseOrPanel, grp_sup, name, 'Computed.LeftCornerX', 'Computed.BackCornerY', 3)
+    prototypes = dict()
+    make_fasteners(doc, baseOrPanel, grp_sup, name, 'Computed.LeftCornerX', 'Computed.FrontCornerY', 0, prototypes)
+    make_fasteners(doc, baseOrPanel, grp_sup, name, 'Computed.RightCornerX', 'Computed.FrontCornerY', 1, prototypes)
+    make_fasteners(doc, baseOrPanel, grp_sup, name, 'Computed.RightCornerX', 'Computed.BackCornerY', 2, prototypes)
+    make_fasteners(doc, baseOrPanel, grp_sup, name, 'Computed.LeftCornerX', 'Computed.BackCornerY', 3, prototypes)
     if baseOrPanel:
         pt = 'Config.PanelBlockThickness'
     else:
         pt = 'Config.PanelMountThickness'
-    make_fasteners(doc, baseOrPanel, grp_sup, name, 'Computed.LeftCornerX', f'Computed.BackCornerY-{pt}', 4)
-    make_fasteners(doc, baseOrPanel, grp_sup, name, f'Computed.LeftCornerX+{pt}', 'Computed.FrontCornerY', 5)
-    make_fasteners(doc, baseOrPanel, grp_sup, name, 'Computed.RightCornerX', f'Computed.FrontCornerY+{pt}', 6)
-    make_fasteners(doc, baseOrPanel, grp_sup, name, f'Computed.RightCornerX-{pt}', 'Computed.BackCornerY', 7)
+    make_fasteners(doc, baseOrPanel, grp_sup, name, 'Computed.LeftCornerX', f'Computed.BackCornerY-{pt}', 4, prototypes)
+    make_fasteners(doc, baseOrPanel, grp_sup, name, f'Computed.LeftCornerX+{pt}', 'Computed.FrontCornerY', 5, prototypes)
+    make_fasteners(doc, baseOrPanel, grp_sup, name, 'Computed.RightCornerX', f'Computed.FrontCornerY+{pt}', 6, prototypes)
+    make_fasteners(doc, baseOrPanel, grp_sup, name, f'Computed.RightCornerX-{pt}', 'Computed.BackCornerY', 7, prototypes)
+
+def make_instance(doc, source, name, use_link=True):
+    """Repeat of source: an App::Link sharing its shape, or a full copy when use_link is False."""
+    if use_link:
+        obj = doc.addObject('App::Link', name)
+        obj.setLink(source)
+    else:
+        obj = doc.copyObject(source)
+        obj.Label = name
+    obj.Placement = source.Placement
+    return obj
+
+def set_position(obj, x, y, z=None):
+    obj.setExpression('.Placement.Base.x', x)
+    obj.setExpression('.Placement.Base.y', y)
+    if z is not None:
+        obj.setExpression('.Placement.Base.z', z)
+
+class PanelSet():
+    """Boxes of a panels.TABLES table, all evaluated in one pass, as a compound in table order."""
+
+    def __init__(self, obj, table):
+        obj.addProperty('App::PropertyString', 'Table', 'Panels', 'Name of the table in panels.TABLES')
+        obj.addProperty('App::PropertyStringList', 'Panels', 'Panels', 'Name of each panel, in the order of the compound')
+        obj.addProperty('App::PropertyLinkList', 'Sheets', 'Panels', 'Sheets read by the table')
+        obj.setEditorMode('Panels', 1)
+        obj.Table = table
+        obj.Panels = panel_table(table).names
+        obj.Proxy = self
 
+    def references(self, obj):
+        return panel_table(obj.Table).inputs
+
+    def execute(self, obj):
+        table = panel_table(obj.Table)
+        values = dict()
+        for sheet, alias in table.inputs:
+            v = obj.Document.getObject(sheet).get(alias)
+            values.setdefault(sheet, dict())[alias] = getattr(v, 'Value', v)
+        boxes = [Part.makeBox(l, w, h, Vector(x, y, z)) for name, (x, y, z), (l, w, h) in table(values)]
+        obj.Shape = Part.makeCompound(boxes)
+
+    def __getstate__(self):
+        return None
+
+    def __setstate__(self, state):
+        return None
+
+def make_panel_set(doc, grp, table):
+    obj = doc.addObject('Part::FeaturePython', table)
+    PanelSet(obj, table)
+    obj.Sheets = [doc.getObject(sheet) for sheet in sorted({sheet for sheet, _ in obj.Proxy.references(obj)})]
+    if App.GuiUp:
+        obj.ViewObject.Proxy = 0
+    if grp:
+        grp.addObject(obj)
+    return obj
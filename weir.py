@@ -26,211 +26,154 @@ from FreeCAD import Vector, Placement, Rotation
 import Sketcher
 import Part, Arch, ArchCommands, Draft
 import FreeCAD as App
+from detail import add_detail_property
+from utils import set_view
+
+
+COLOR = (0.20, 0.20, 0.20, 0.00)
+RING = 5.0
+KERF = 1.0
+BRIDGE = 1.0
+
+
+def _point(x, z):
+    # Plate drawn in the XZ plane, thickness toward -Y
+    return Vector(x, 0, z)
+
+
+def slot_wire(x, z0, z1, r):
+    """Vertical obround, arcs centered at z0 (bottom) and z1 (top)."""
+    edges = [
+        Part.LineSegment(_point(x - r, z1), _point(x - r, z0)).toShape(),
+        Part.Arc(_point(x - r, z0), _point(x, z0 - r), _point(x + r, z0)).toShape(),
+        Part.LineSegment(_point(x + r, z0), _point(x + r, z1)).toShape(),
+        Part.Arc(_point(x + r, z1), _point(x, z1 + r), _point(x - r, z1)).toShape(),
+    ]
+    return Part.Wire(edges)
+
+
+def circle_wire(x, z, r):
+    return Part.Wire(Part.Circle(_point(x, z), Vector(0, 1, 0), r).toShape())
+
+
+def kerf_wires(x, z, r):
+    """The two C shaped cuts around a bulk head, leaving a bridge at the top and the bottom."""
+    b = BRIDGE / 2
+    h = sqrt(r * r - b * b)
+    ri = sqrt(b * b + (h - KERF) * (h - KERF))
+    wires = []
+    for side in (-1, 1):
+        top = _point(x + side * b, z + h)
+        bottom = _point(x + side * b, z - h)
+        inner_top = _point(x + side * b, z + h - KERF)
+        inner_bottom = _point(x + side * b, z - h + KERF)
+        wires.append(Part.Wire([
+            Part.Arc(top, _point(x + side * r, z), bottom).toShape(),
+            Part.LineSegment(bottom, inner_bottom).toShape(),
+            Part.Arc(inner_bottom, _point(x + side * ri, z), inner_top).toShape(),
+            Part.LineSegment(inner_top, top).toShape(),
+        ]))
+    return wires
+
+
+def slot_positions(start, length, count):
+    if count < 2:
+        return [start]
+    return [start + i * length / (count - 1) for i in range(count)]
+
+
+def weir_plate(margin, width, height, thickness, slot_width, slot_bottom, slot_top, slot_start, slot_length, slot_count,
+               bulkhead_diameter, bulkhead_count, bulkhead_spacing, bulkhead_x, bulkhead_z, detail=True):
+    """Perforated weir panel as a single extrusion of a face with holes.
+
+    Slots crossing the reinforcement ring of a bulk head are clipped by the ring,
+    the only booleans left are those 2D cuts. Without detail only the plate is built.
+    """
+    r = slot_width / 2
+    outer = Part.makePolygon([_point(margin, 0), _point(margin + width, 0), _point(margin + width, height), _point(margin, height), _point(margin, 0)])
+    if not detail:
+        return Part.Face(outer).extrude(Vector(0, -thickness, 0))
+    bulkheads = [(bulkhead_x + i * bulkhead_spacing, bulkhead_z) for i in range(bulkhead_count)]
+    ring_out = bulkhead_diameter / 2 + RING / 2
+    ring_in = bulkhead_diameter / 2 - RING / 2
+    rings = [(x, z, Part.Face([circle_wire(x, z, ring_out), circle_wire(x, z, ring_in)], 'Part::FaceMakerBullseye')) for x, z in bulkheads]
+    holes = []
+    for x in slot_positions(slot_start, slot_length, slot_count):
+        wire = slot_wire(x, slot_bottom, slot_top, r)
+        crossing = [ring for cx, cz, ring in rings
+                    if abs(cx - x) < ring_out + r and slot_bottom - r < cz + ring_out and cz - ring_out < slot_top + r]
+        if len(crossing) == 0:
+            holes.append(wire)
+            continue
+        piece = Part.Face(wire)
+        for ring in crossing:
+            piece = piece.cut(ring)
+        holes.extend([f.OuterWire for f in piece.Faces])
+    for x, z in bulkheads:
+        holes.extend(kerf_wires(x, z, bulkhead_diameter / 2))
+    face = Part.Face([outer] + holes, 'Part::FaceMakerBullseye')
+    return face.extrude(Vector(0, -thickness, 0))
+
+
+class WeirPlate():
+    """Weir panel with the water slots and the detachable bulk head holes."""
+
+    def __init__(self, obj):
+        obj.addProperty('App::PropertyLength', 'Margin', 'Weir', 'Distance from the left corner to the panel')
+        obj.addProperty('App::PropertyLength', 'Width', 'Weir', 'Width of the panel')
+        obj.addProperty('App::PropertyLength', 'Height', 'Weir', 'Height of the panel')
+        obj.addProperty('App::PropertyLength', 'Thickness', 'Weir', 'Thickness of the panel')
+        obj.addProperty('App::PropertyLength', 'SlotWidth', 'Slots', 'Width of one slot')
+        obj.addProperty('App::PropertyDistance', 'SlotBottom', 'Slots', 'Height of the center of the lower end of the slots')
+        obj.addProperty('App::PropertyDistance', 'SlotTop', 'Slots', 'Height of the center of the upper end of the slots')
+        obj.addProperty('App::PropertyDistance', 'SlotStart', 'Slots', 'Position of the first slot')
+        obj.addProperty('App::PropertyLength', 'SlotLength', 'Slots', 'Distance from the first to the last slot')
+        obj.addProperty('App::PropertyInteger', 'SlotCount', 'Slots', 'Number of slots')
+        obj.addProperty('App::PropertyLength', 'BulkHeadDiameter', 'BulkHeads', 'Diameter of the bulk head hole')
+        obj.addProperty('App::PropertyInteger', 'BulkHeadCount', 'BulkHeads', 'Number of bulk heads')
+        obj.addProperty('App::PropertyLength', 'BulkHeadSpacing', 'BulkHeads', 'Distance between two bulk heads')
+        obj.addProperty('App::PropertyDistance', 'BulkHeadX', 'BulkHeads', 'Position of the first bulk head')
+        obj.addProperty('App::PropertyDistance', 'BulkHeadZ', 'BulkHeads', 'Height of the bulk heads')
+        add_detail_property(obj)
+        obj.Proxy = self
+
+    def execute(self, obj):
+        placement = obj.Placement
+        obj.Shape = weir_plate(obj.Margin.Value, obj.Width.Value, obj.Height.Value, obj.Thickness.Value,
+                               obj.SlotWidth.Value, obj.SlotBottom.Value, obj.SlotTop.Value, obj.SlotStart.Value, obj.SlotLength.Value, obj.SlotCount,
+                               obj.BulkHeadDiameter.Value, obj.BulkHeadCount, obj.BulkHeadSpacing.Value, obj.BulkHeadX.Value, obj.BulkHeadZ.Value, obj.Detail)
+        obj.Placement = placement
+
+    def __getstate__(self):
+        return None
+
+    def __setstate__(self, state):
+        return None
 
 
 def create_weir(doc):
-    placemnt = Placement(Vector(0, 0, 0), Rotation (0.7071067811865476, 0, 0, 0.7071067811865475))
-    Weir = doc.addObject('PartDesign::Body', 'Weir')
-    Weir.Group = []
-    Weir.setExpression('.Placement.Base.x', 'Computed.LeftCornerX')
-    Weir.setExpression('.Placement.Base.y', 'Config.Length/2-Config.SidesGlassThickness-Computed.WeirDepth')
-    Weir.setExpression('.Placement.Base.z', '(Computed.GlassLevel+Config.BottomGlassThickness)*1 mm')
-    main_face_profile = doc.addObject('Sketcher::SketchObject', 'main_face_profile')
-    b = main_face_profile.addGeometry(Part.LineSegment(Vector (100.0, 0.0, 0.0), Vector (700.0, 0.0, 0.0)))
-    r = main_face_profile.addGeometry(Part.LineSegment(Vector (700.0, 0.0, 0.0), Vector (700.0, 400.0, 0.0)))
-    t = main_face_profile.addGeometry(Part.LineSegment(Vector (700.0, 400.0, 0.0), Vector (100.0, 400.0, 0.0)))
-    l = main_face_profile.addGeometry(Part.LineSegment(Vector (100.0, 400.0, 0.0), Vector (100.0, 0.0, 0.0)))
-    main_face_profile.addConstraint(Sketcher.Constraint('DistanceX', -2, 1, l, 1, 100.00))
-    main_face_profile.setExpression('Constraints[0]', 'Computed.WeirMargin')
-    main_face_profile.addConstraint(Sketcher.Constraint('DistanceX', -2, 1, r, 2, 700.00))
-    main_face_profile.setExpression('Constraints[1]', 'Computed.WeirWidth+Computed.WeirMargin')
-    main_face_profile.addConstraint(Sketcher.Constraint('DistanceY', -1, 1, r, 2, 400.00))
-    main_face_profile.setExpression('Constraints[2]', 'Computed.RealGlassHeight')
-    main_face_profile.addConstraint(Sketcher.Constraint('Coincident', b, 2, r, 1))
-    main_face_profile.addConstraint(Sketcher.Constraint('Coincident', r, 2, t, 1))
-    main_face_profile.addConstraint(Sketcher.Constraint('Coincident', t, 2, l, 1))
-    main_face_profile.addConstraint(Sketcher.Constraint('Coincident', l, 2, b, 1))
-    main_face_profile.addConstraint(Sketcher.Constraint('Horizontal', b))
-    main_face_profile.addConstraint(Sketcher.Constraint('Horizontal', t))
-    main_face_profile.addConstraint(Sketcher.Constraint('Vertical', l))
-    main_face_profile.addConstraint(Sketcher.Constraint('Vertical', r))
-    main_face_profile.addConstraint(Sketcher.Constraint('PointOnObject', b, 1, -1))
-    main_face_profile.MapMode = 'FlatFace'
-    main_face_profile.Placement = placemnt
-    main_face_profile.Visibility = False
-    main_face_profile.ViewObject.Visibility = False
-    Weir.addObject(main_face_profile)
-    main_face = doc.addObject('PartDesign::Pad', 'main_face')
-    main_face.Direction = Vector(0.00, -1.00, -0.00)
-    main_face.setExpression('Length', 'Config.WeirWallThickness')
-    main_face.Length = 4.0
-    main_face.Placement = placemnt
-    main_face.Profile = (main_face_profile, [])
-    main_face.ReferenceAxis = (main_face_profile, ['N_Axis'])
-    main_face.Visibility = False
-    Weir.addObject(main_face)
-    main_face.ViewObject.ShapeColor = (0.20, 0.20, 0.20, 0.00)
-    main_face.ViewObject.Visibility = False
-    slot_profile = doc.addObject('Sketcher::SketchObject', 'slot_profile')
-    geo0 = slot_profile.addGeometry(Part.ArcOfCircle(Part.Circle(Vector(12.50, 445.00, 0.00), Vector (0.0, 0.0, 1.0), 1.50), 0, pi))
-    geo1 = slot_profile.addGeometry(Part.ArcOfCircle(Part.Circle(Vector(12.50, 400.00, 0.00), Vector (0.0, 0.0, 1.0), 1.50), pi, 2 * pi))
-    geo2 = slot_profile.addGeometry(Part.LineSegment(Vector (11.0, 445.0, 0.0), Vector (11.0, 400.0, 0.0)))
-    geo3 = slot_profile.addGeometry(Part.LineSegment(Vector (14.0, 400.0, 0.0), Vector (14.0, 445.0, 0.0)))
-    slot_profile.addConstraint(Sketcher.Constraint('Tangent', geo0, 2, geo2, 1))
-    slot_profile.addConstraint(Sketcher.Constraint('Tangent', geo2, 2, geo1, 1))
-    slot_profile.addConstraint(Sketcher.Constraint('Tangent', geo1, 2, geo3, 1))
-    slot_profile.addConstraint(Sketcher.Constraint('Tangent', geo3, 2, geo0, 1))
-    slot_profile.addConstraint(Sketcher.Constraint('Equal', geo0, geo1))
-    slot_profile.addConstraint(Sketcher.Constraint('Vertical', geo2))
-    slot_profile.addConstraint(Sketcher.Constraint('Diameter', geo0, 3.0))
-    slot_profile.addConstraint(Sketcher.Constraint('DistanceY', geo1, 3, 400.00))
-    slot_profile.addConstraint(Sketcher.Constraint('DistanceY', geo0, 3, 445.00))
-    slot_profile.addConstraint(Sketcher.Constraint('DistanceX', geo0, 3, 12.50))
-    slot_profile.setExpression('Constraints[6]', 'Config.WeirSlotWidth')
-    slot_profile.setExpression('Constraints[7]', 'Config.WaterHeightWeir')
-    slot_profile.setExpression('Constraints[8]', 'Computed.RealGlassHeight-Config.SidesGlassThickness-Config.WeirSlotWidth*0.5')
-    slot_profile.setExpression('Constraints[9]', '2*Config.SidesGlassThickness+Config.BraceWidth+Config.WeirSlotWidth*0.5')
-    slot_profile.MapMode = 'FlatFace'
-    slot_profile.Placement = placemnt
-    slot_profile.Visibility = False
-    slot_profile.ViewObject.Visibility = False
-    Weir.addObject(slot_profile)
-    one_slot = doc.addObject('PartDesign::Pocket', 'one_slot')
-    one_slot.BaseFeature = main_face
-    one_slot.Direction = Vector(-0.00, 1.00, 0.00)
-    one_slot.Midplane = True
-    one_slot.Placement = placemnt
-    one_slot.Profile = (slot_profile, [])
-    one_slot.ReferenceAxis = (slot_profile, ['N_Axis'])
-    one_slot.Type = 'ThroughAll'
-    one_slot.Visibility = False
-    one_slot.ViewObject.ShapeColor = (0.20, 0.20, 0.20, 0.00)
-    one_slot.ViewObject.Visibility = False
-    Weir.addObject(one_slot)
-    all_slots = doc.addObject('PartDesign::LinearPattern', 'all_slots')
-    all_slots.BaseFeature = one_slot
-    all_slots.Direction = (slot_profile, ['H_Axis'])
+    weir = doc.addObject('Part::FeaturePython', 'Weir')
+    WeirPlate(weir)
+    if App.GuiUp:
+        weir.ViewObject.Proxy = 0
+        weir.ViewObject.ShapeColor = COLOR
+    weir.setExpression('.Placement.Base.x', 'Computed.LeftCornerX')
+    weir.setExpression('.Placement.Base.y', 'Config.Length/2-Config.SidesGlassThickness-Computed.WeirDepth')
+    weir.setExpression('.Placement.Base.z', '(Computed.GlassLevel+Config.BottomGlassThickness)*1 mm')
+    weir.setExpression('Margin', 'Computed.WeirMargin')
+    weir.setExpression('Width', 'Computed.WeirWidth')
+    weir.setExpression('Height', 'Computed.RealGlassHeight')
+    weir.setExpression('Thickness', 'Config.WeirWallThickness')
+    weir.setExpression('SlotWidth', 'Config.WeirSlotWidth')
+    weir.setExpression('SlotBottom', 'Config.WaterHeightWeir')
+    weir.setExpression('SlotTop', 'Computed.RealGlassHeight-Config.SidesGlassThickness-Config.WeirSlotWidth*0.5')
+    weir.setExpression('SlotStart', '2*Config.SidesGlassThickness+Config.BraceWidth+Config.WeirSlotWidth*0.5')
     all_len = 'Computed.WeirInsideWidth-Config.WeirSlotWidth'
-    all_slots.setExpression('Length', all_len)
-    all_slots.setExpression('Occurrences', '(' + all_len + ')/(2*Config.WeirSlotWidth)')
-    all_slots.Length = 781.0
-    all_slots.Occurrences = 130
-    all_slots.Originals = [one_slot]
-    all_slots.Placement = placemnt
-    all_slots.Visibility = False
-    all_slots.ViewObject.ShapeColor = (0.20, 0.20, 0.20, 0.00)
-    all_slots.ViewObject.Visibility = False
-    Weir.addObject(all_slots)
-    hole_reinforcement = doc.addObject('Sketcher::SketchObject', 'hole_reinforcement')
-    geo0 = hole_reinforcement.addGeometry(Part.Circle(Vector(112.00, 428.50, 0.00), Vector (0.0, 0.0, 1.0), 19.00))
-    geo1 = hole_reinforcement.addGeometry(Part.Circle(Vector(112.00, 428.50, 0.00), Vector (0.0, 0.0, 1.0), 14.00))
-    hole_reinforcement.addConstraint(Sketcher.Constraint('Diameter', geo0, 38.0))
-    hole_reinforcement.addConstraint(Sketcher.Constraint('DistanceY', -1, 1, geo0, 3, 428.50))
-    hole_reinforcement.addConstraint(Sketcher.Constraint('DistanceX', geo0, 3, 112.00))
-    hole_reinforcement.addConstraint(Sketcher.Constraint('Coincident', geo1, 3, geo0, 3))
-    hole_reinforcement.addConstraint(Sketcher.Constraint('Diameter', geo1, 28.0))
-    hole_reinforcement.setExpression('Constraints[0]', 'Config.BulkHeadDiameter+5')
-    center_bh = 'Computed.RealGlassHeight-Config.BulkHeadDiameter/2-Config.SidesGlassThickness-Config.WeirSlotWidth*1.5'
-    hole_reinforcement.setExpression('Constraints[1]', center_bh)
-    hole_reinforcement.setExpression('Constraints[2]', 'Computed.BulkHeadSpace/2+Config.BraceWidth+2*Config.SidesGlassThickness')
-    hole_reinforcement.setExpression('Constraints[4]', 'Config.BulkHeadDiameter-5')
-    hole_reinforcement.MapMode = 'FlatFace'
-    hole_reinforcement.Placement = placemnt
-    hole_reinforcement.Visibility = False
-    hole_reinforcement.ViewObject.Visibility = False
-    Weir.addObject(hole_reinforcement)
-    Bulk_Head_Reinforced = doc.addObject('PartDesign::Pad', 'Bulk_Head_Reinforced')
-    Bulk_Head_Reinforced.BaseFeature = all_slots
-    Bulk_Head_Reinforced.Direction = Vector(0.00, -1.00, -0.00)
-    Bulk_Head_Reinforced.setExpression('Length', 'Config.WeirWallThickness')
-    Bulk_Head_Reinforced.Length = 4.0
-    Bulk_Head_Reinforced.Placement = placemnt
-    Bulk_Head_Reinforced.Profile = (hole_reinforcement, [])
-    Bulk_Head_Reinforced.ReferenceAxis = (hole_reinforcement, ['N_Axis'])
-    Bulk_Head_Reinforced.Visibility = False
-    Bulk_Head_Reinforced.ViewObject.ShapeColor = (0.20, 0.20, 0.20, 0.00)
-    Bulk_Head_Reinforced.ViewObject.Visibility = False
-    Weir.addObject(Bulk_Head_Reinforced)
-    all_holes_reinforced = doc.addObject('PartDesign::LinearPattern', 'all_holes_reinforced')
-    all_holes_reinforced.BaseFeature = Bulk_Head_Reinforced
-    all_holes_reinforced.Direction = (hole_reinforcement, ['H_Axis'])
-    all_holes_reinforced.setExpression('Length', '(Config.BulkHeadNumber-1)*Computed.BulkHeadSpace')
-    all_holes_reinforced.setExpression('Occurrences', 'Config.BulkHeadNumber')
-    all_holes_reinforced.Length = 428.57142857142856
-    all_holes_reinforced.Occurrences = 6
-    all_holes_reinforced.Originals = [Bulk_Head_Reinforced]
-    all_holes_reinforced.Placement = placemnt
-    all_holes_reinforced.Visibility = False
-    all_holes_reinforced.ViewObject.ShapeColor = (0.20, 0.20, 0.20, 0.00)
-    all_holes_reinforced.ViewObject.Visibility = False
-    Weir.addObject(all_holes_reinforced)
-    bulk_head_hole = doc.addObject('Sketcher::SketchObject', 'bulk_head_hole')
-    geo0 = bulk_head_hole.addGeometry(Part.ArcOfCircle(Part.Circle(Vector(112.00, 428.50, 0.00), Vector (0.0, 0.0, 1.0), 16.50), 4.742696650350782, 7.823673964008179))
-    geo1 = bulk_head_hole.addGeometry(Part.ArcOfCircle(Part.Circle(Vector(112.00, 428.50, 0.00), Vector (0.0, 0.0, 1.0), 15.50), 4.744651624150203, 7.821718990208744))
-    geo2 = bulk_head_hole.addGeometry(Part.LineSegment(Vector (112.5, 412.0075774975293, 0.0), Vector (112.5, 413.00757749752927, 0.0)))
-    geo3 = bulk_head_hole.addGeometry(Part.LineSegment(Vector (111.5, 444.99242250247073, 0.0), Vector (111.5, 443.99242250247073, 0.0)))
-    geo4 = bulk_head_hole.addGeometry(Part.Point(Vector(112.00, 428.50, 0.00)))
-    bulk_head_hole.toggleConstruction(geo4)
-    geo5 = bulk_head_hole.addGeometry(Part.LineSegment(Vector (112.5, 443.99242250247056, 0.0), Vector (112.5, 444.99242250247056, 0.0)))
-    geo6 = bulk_head_hole.addGeometry(Part.LineSegment(Vector (111.49999999999845, 413.0075774975294, 0.0), Vector (111.49999999999845, 412.0075774975294, 0.0)))
-    geo7 = bulk_head_hole.addGeometry(Part.ArcOfCircle(Part.Circle(Vector(112.00, 428.50, 0.00), Vector (0.0, 0.0, 1.0), 16.50), 1.601103996761398, 4.682081310418408))
-    geo8 = bulk_head_hole.addGeometry(Part.ArcOfCircle(Part.Circle(Vector(112.00, 428.50, 0.00), Vector (0.0, 0.0, 1.0), 15.50), 1.6030589705603855, 4.680126336618976))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('Diameter', geo0, 33.0))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('Vertical', geo2))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('Vertical', geo3))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('Symmetric', geo3, 1, geo2, 1, geo4, 1))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('DistanceX', geo3, 1, geo5, 2, 1.00))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('PointOnObject', geo7, 2, geo3))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('Coincident', geo2, 2, geo1, 1))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('Coincident', geo6, 1, geo8, 2))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('Equal', geo0, geo7))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('Coincident', geo0, 3, geo7, 3))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('PointOnObject', geo7, 1, geo3))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('Equal', geo1, geo8))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('Coincident', geo1, 2, geo5, 1))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('Coincident', geo8, 1, geo3, 2))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('Coincident', geo1, 3, geo8, 3))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('Vertical', geo5))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('Vertical', geo6))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('Coincident', geo7, 2, geo6, 2))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('DistanceX', geo6, 1, geo1, 1, 1.00))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('Coincident', geo0, 1, geo2, 1))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('DistanceX', geo0, 3, 112.00))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('Coincident', geo5, 2, geo0, 2))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('DistanceY', geo5, 1, geo5, 2, 1.00))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('Coincident', geo4, 1, geo1, 3))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('Coincident', geo1, 3, geo0, 3))
-    bulk_head_hole.addConstraint(Sketcher.Constraint('DistanceY', -1, 1, geo4, 1, 428.50))
-    bulk_head_hole.setExpression('Constraints[0]', 'Config.BulkHeadDiameter')
-    bulk_head_hole.setExpression('Constraints[20]', 'Computed.BulkHeadSpace/2+Config.BraceWidth+2*Config.SidesGlassThickness')
-    bulk_head_hole.setExpression('Constraints[25]', center_bh)
-    bulk_head_hole.MapMode = 'FlatFace'
-    bulk_head_hole.Placement = placemnt
-    bulk_head_hole.Visibility = False
-    bulk_head_hole.ViewObject.Visibility = False
-    Weir.addObject(bulk_head_hole)
-    detachable_hole = doc.addObject('PartDesign::Pocket', 'detachable_hole')
-    detachable_hole.BaseFeature = all_holes_reinforced
-    detachable_hole.Direction = Vector(-0.00, 1.00, 0.00)
-    detachable_hole.Midplane = True
-    detachable_hole.Placement = placemnt
-    detachable_hole.Profile = (bulk_head_hole, [])
-    detachable_hole.ReferenceAxis = (bulk_head_hole, ['N_Axis'])
-    detachable_hole.Type = 'ThroughAll'
-    detachable_hole.Visibility = False
-    detachable_hole.ViewObject.ShapeColor = (0.20, 0.20, 0.20, 0.00)
-    detachable_hole.ViewObject.Visibility = False
-    Weir.addObject(detachable_hole)
-    bulk_heads_detachable = doc.addObject('PartDesign::LinearPattern', 'bulk_heads_detachable')
-    bulk_heads_detachable.BaseFeature = detachable_hole
-    bulk_heads_detachable.Direction = (bulk_head_hole, ['H_Axis'])
-    bulk_heads_detachable.setExpression('Length', '(Config.BulkHeadNumber-1)*Computed.BulkHeadSpace')
-    bulk_heads_detachable.setExpression('Occurrences', 'Config.BulkHeadNumber')
-    bulk_heads_detachable.Length = 428
-    bulk_heads_detachable.Occurrences = 6
-    bulk_heads_detachable.Originals = [detachable_hole]
-    bulk_heads_detachable.Placement = placemnt
-    bulk_heads_detachable.Refine = True
-    bulk_heads_detachable.ViewObject.ShapeColor = (0.20, 0.20, 0.20, 0.00)
-    Weir.addObject(bulk_heads_detachable)
-    return Weir
+    weir.setExpression('SlotLength', all_len)
+    weir.setExpression('SlotCount', '(' + all_len + ')/(2*Config.WeirSlotWidth)')
+    weir.setExpression('BulkHeadDiameter', 'Config.BulkHeadDiameter')
+    weir.setExpression('BulkHeadCount', 'Config.BulkHeadNumber')
+    weir.setExpression('BulkHeadSpacing', 'Computed.BulkHeadSpace')
+    weir.setExpression('BulkHeadX', 'Computed.BulkHeadSpace/2+Config.BraceWidth+2*Config.SidesGlassThickness')
+    weir.setExpression('BulkHeadZ', 'Computed.RealGlassHeight-Config.BulkHeadDiameter/2-Config.SidesGlassThickness-Config.WeirSlotWidth*1.5')
+    return weir